@@ -0,0 +1,2 @@
+# Permite importar el módulo
+
@@ -0,0 +1,455 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from aiohttp import web, WSMsgType
+
+from config import API_HOST, API_PORT, API_MAX_CONCURRENT_TURNS, API_MAX_TURNS_PER_SESSION
+from core.chat_manager import (
+    analyze_message, build_turn_prompt, cache_reply, finish_turn, get_cached_reply,
+    is_opening_turn, offer_starter, pick_starter, response_cache, sessions
+)
+from core.metrics import metrics, PROMETHEUS_CONTENT_TYPE
+from core.model_monitor import ModelMonitor
+from core.prefetcher import prefetcher
+from core.ollama_client import (
+    GenerationHandle, aclose_http_session, astream_ai_response, prefix_tracker, scheduler
+)
+from core.session import LearnerProfile
+from core.spaced_repetition import VocabularyManager
+from core.tracing import tracer
+
+# Seconds between sweeps for idle sessions
+IDLE_SWEEP_INTERVAL = 60
+
+class SessionBusy(Exception):
+    """The session already has the maximum number of turns in progress"""
+
+
+def analysis_payload(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert the result of analyze_message into JSON-friendly data.
+
+    Args:
+        analysis: Result of analyze_message
+
+    Returns:
+        Dict: Correction data sent to clients
+    """
+    return {
+        "message": analysis["message"],
+        "corrected": analysis["corrected"],
+        "issues": analysis["issues"],
+        "categorized_issues": analysis["categorized_issues"],
+        "expression_suggestions": [list(pair) for pair in analysis["expression_suggestions"]],
+        "learning_feedback": analysis["learning_feedback"],
+        "topic_to_avoid": analysis["topic_to_avoid"]
+    }
+
+
+class TutorServer:
+    """
+    Exposes the tutor pipeline (corrections, AI replies, vocabulary review and
+    stats) over HTTP and WebSocket so many thin clients can share one backend.
+
+    Blocking work from `core` runs in the default thread pool. Turns are limited
+    per session and across the whole server. Each turn runs as its own task so
+    a reset, or a newer WebSocket message, can cancel it.
+    """
+
+    def __init__(
+        self,
+        registry=sessions,
+        vocab_manager: VocabularyManager = None,
+        max_concurrent_turns: int = API_MAX_CONCURRENT_TURNS,
+        max_turns_per_session: int = API_MAX_TURNS_PER_SESSION
+    ):
+        self.registry = registry
+        self.vocab_manager = vocab_manager or VocabularyManager()
+        self.model_monitor = ModelMonitor()
+        self.max_turns_per_session = max_turns_per_session
+        self._turn_slots = asyncio.Semaphore(max_concurrent_turns)
+        self._session_slots: Dict[str, asyncio.Semaphore] = {}
+        self._turns: Dict[str, List[Tuple[asyncio.Task, GenerationHandle]]] = {}
+        self.active_turns = 0
+        self.completed_turns = 0
+        self.started_at = time.time()
+
+    def create_app(self) -> web.Application:
+        """Build the aiohttp application with all routes"""
+        app = web.Application()
+        app.add_routes([
+            web.get("/health", self.handle_health),
+            web.get("/stats", self.handle_stats),
+            web.get("/metrics", self.handle_metrics),
+            web.post("/sessions", self.handle_create_session),
+            web.get("/sessions/{session_id}", self.handle_get_session),
+            web.delete("/sessions/{session_id}", self.handle_delete_session),
+            web.post("/sessions/{session_id}/reset", self.handle_reset_session),
+            web.post("/sessions/{session_id}/starter", self.handle_starter),
+            web.post("/sessions/{session_id}/turns", self.handle_turn),
+            web.get("/sessions/{session_id}/ws", self.handle_websocket),
+            web.get("/vocabulary/review", self.handle_get_review),
+            web.post("/vocabulary/review", self.handle_post_review),
+        ])
+        app.cleanup_ctx.append(self._idle_sweeper)
+        app.cleanup_ctx.append(self._model_warmup)
+        return app
+
+    # Turn pipeline
+
+    async def run_turn(
+        self,
+        session,
+        message: str,
+        emit: Callable[[Dict[str, Any]], Awaitable[None]],
+        handle: GenerationHandle = None
+    ) -> str:
+        """
+        Run one turn: grammar analysis, then the streamed AI reply.
+
+        Args:
+            session: ConversationSession the turn belongs to
+            message: The learner's message
+            emit: Coroutine called with each event ("analysis", "chunk", "done")
+            handle: Cancelled together with the turn's task; a cancelled turn is not stored
+
+        Returns:
+            str: The full AI reply
+
+        Raises:
+            SessionBusy: If the session already has its maximum of turns running
+        """
+        slot = self._session_slots.setdefault(session.session_id, asyncio.Semaphore(self.max_turns_per_session))
+        if slot.locked():
+            raise SessionBusy(session.session_id)
+
+        async with slot, self._turn_slots:
+            self.active_turns += 1
+            try:
+                loop = asyncio.get_running_loop()
+                analysis = await loop.run_in_executor(None, analyze_message, message)
+                await emit({"type": "analysis", **analysis_payload(analysis)})
+
+                opening, prompt, cached = await loop.run_in_executor(None, self._prepare_turn, session, analysis)
+                response_start = time.time()
+                chunks = []
+                if cached:
+                    chunks.append(cached)
+                    await emit({"type": "chunk", "text": cached})
+                else:
+                    async for chunk in astream_ai_response(prompt, session.session_id, template=analysis["template"]):
+                        if not chunks:
+                            tracer.record("turn.first_chunk", time.time() - response_start, cached=False)
+                        chunks.append(chunk)
+                        await emit({"type": "chunk", "text": chunk})
+
+                ai_response = "".join(chunks).strip()
+                tracer.record("turn.reply", time.time() - response_start, cached=bool(cached))
+                await loop.run_in_executor(
+                    None, self._complete_turn, session, analysis, ai_response,
+                    time.time() - response_start, opening and not cached, handle
+                )
+                await emit({"type": "done", "response": ai_response})
+                self.completed_turns += 1
+                return ai_response
+            finally:
+                self.active_turns -= 1
+
+    def _prepare_turn(self, session, analysis):
+        # Same locking as the desktop path: the summarizer and the prefetcher also use the history
+        with session.lock:
+            opening = is_opening_turn(session)
+            prompt = build_turn_prompt(session, analysis)
+            cached = get_cached_reply(session, analysis)
+        return opening, prompt, cached
+
+    def _complete_turn(self, session, analysis, ai_response, response_seconds, cache, handle):
+        with session.lock:
+            # A turn cancelled by a reset must not reach the fresh history
+            if handle is not None and handle.cancelled:
+                return
+            finish_turn(session, analysis, ai_response, response_seconds)
+            if cache:
+                cache_reply(analysis, ai_response)
+
+    def _start_turn(self, session, run: Callable[[GenerationHandle], Awaitable[Any]]) -> asyncio.Task:
+        # Run a turn as a task registered for its session, so it can be cancelled
+        handle = GenerationHandle()
+        task = asyncio.create_task(run(handle))
+        entry = (task, handle)
+        self._turns.setdefault(session.session_id, []).append(entry)
+
+        def unregister(_):
+            turns = self._turns.get(session.session_id)
+            if turns and entry in turns:
+                turns.remove(entry)
+                if not turns:
+                    del self._turns[session.session_id]
+
+        task.add_done_callback(unregister)
+        return task
+
+    def _cancel_turns_now(self, session_id: str) -> List[asyncio.Task]:
+        tasks = []
+        for task, handle in self._turns.pop(session_id, []):
+            handle.cancel()
+            task.cancel()
+            tasks.append(task)
+        return tasks
+
+    async def cancel_turns(self, session_id: str) -> int:
+        """
+        Cancel the turns in progress for a session and wait until they stop.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            int: Number of turns cancelled
+        """
+        tasks = self._cancel_turns_now(session_id)
+        if tasks:
+            await asyncio.wait(tasks)
+        return len(tasks)
+
+    # Handlers
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "status": "ok",
+            "sessions": len(self.registry),
+            "model": self.model_monitor.get_status()
+        })
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        # The vocabulary stats scan the whole deck: keep them off the event loop
+        vocabulary = await asyncio.get_running_loop().run_in_executor(None, self.vocab_manager.get_learning_stats)
+        return web.json_response({
+            "server": {
+                "uptime": time.time() - self.started_at,
+                "sessions": len(self.registry),
+                "active_turns": self.active_turns,
+                "completed_turns": self.completed_turns
+            },
+            "ollama_scheduler": scheduler.get_metrics(),
+            "prompt_prefix": prefix_tracker.get_metrics(),
+            "response_cache": response_cache.get_stats() if response_cache is not None else None,
+            "prefetcher": prefetcher.get_stats() if prefetcher else None,
+            "latency": tracer.get_stats(),
+            "vocabulary": vocabulary
+        })
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(
+            body=metrics.render_prometheus().encode("utf-8"),
+            headers={"Content-Type": PROMETHEUS_CONTENT_TYPE}
+        )
+
+    async def handle_create_session(self, request: web.Request) -> web.Response:
+        body = await self._read_json(request, required=False)
+        profile = LearnerProfile()
+        if body.get("level"):
+            profile.level = body["level"]
+        if body.get("grammar_focus"):
+            profile.grammar_focus = body["grammar_focus"]
+
+        session = self.registry.create(body.get("session_id"), profile)
+        # Creating a session can evict the least recently used ones
+        self._forget_evicted_sessions()
+        return web.json_response(session.to_dict(), status=201)
+
+    async def handle_get_session(self, request: web.Request) -> web.Response:
+        return web.json_response(self._get_session(request).to_dict())
+
+    async def handle_delete_session(self, request: web.Request) -> web.Response:
+        session_id = request.match_info["session_id"]
+        if not self.registry.remove(session_id):
+            raise web.HTTPNotFound(text=f"Unknown session: {session_id}")
+        await self.cancel_turns(session_id)
+        self._session_slots.pop(session_id, None)
+        return web.json_response({"deleted": session_id})
+
+    async def handle_reset_session(self, request: web.Request) -> web.Response:
+        session = self._get_session(request)
+        await self.cancel_turns(session.session_id)
+        session.reset()
+        return web.json_response(session.to_dict())
+
+    async def handle_starter(self, request: web.Request) -> web.Response:
+        session = self._get_session(request)
+        body = await self._read_json(request, required=False)
+        starter = pick_starter(body.get("avoid_topic"))
+        if starter:
+            offer_starter(session, starter)
+        return web.json_response({"starter": starter})
+
+    async def handle_turn(self, request: web.Request) -> web.Response:
+        session = self._get_session(request)
+        body = await self._read_json(request)
+        message = str(body.get("message", "")).strip()
+        if not message:
+            raise web.HTTPBadRequest(text="Field 'message' is required")
+
+        events = []
+
+        async def collect(event):
+            if event["type"] != "chunk":
+                events.append(event)
+
+        task = self._start_turn(session, lambda handle: self.run_turn(session, message, collect, handle))
+        await asyncio.wait([task])
+        if task.cancelled():
+            raise web.HTTPConflict(text="The turn was cancelled by a reset of the session")
+        try:
+            ai_response = task.result()
+        except SessionBusy:
+            raise web.HTTPTooManyRequests(text="A turn is already in progress for this session")
+
+        analysis = {key: value for key, value in events[0].items() if key != "type"}
+        return web.json_response({"analysis": analysis, "response": ai_response})
+
+    async def handle_websocket(self, request: web.Request) -> web.WebSocketResponse:
+        session = self._get_session(request)
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+
+        async def ws_turn(message, handle):
+            try:
+                await self.run_turn(session, message, ws.send_json, handle)
+            except SessionBusy:
+                await ws.send_json({"type": "error", "error": "A turn is already in progress for this session"})
+            except ConnectionResetError:
+                pass  # The client closed the socket mid-reply
+
+        turn = None
+        try:
+            # Turns run in their own task, so this loop keeps reading and a
+            # reset or a newer message stops the reply being streamed
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                try:
+                    data = msg.json()
+                except ValueError:
+                    await ws.send_json({"type": "error", "error": "Invalid JSON"})
+                    continue
+
+                if data.get("type") == "reset":
+                    if await self.cancel_turns(session.session_id):
+                        await ws.send_json({"type": "cancelled"})
+                    session.reset()
+                    await ws.send_json({"type": "reset"})
+                    continue
+
+                message = str(data.get("message", "")).strip()
+                if not message:
+                    await ws.send_json({"type": "error", "error": "Field 'message' is required"})
+                    continue
+
+                if await self.cancel_turns(session.session_id):
+                    await ws.send_json({"type": "cancelled"})
+                turn = self._start_turn(session, lambda handle: ws_turn(message, handle))
+        finally:
+            # The client is gone: stop its reply
+            if turn is not None and not turn.done():
+                await self.cancel_turns(session.session_id)
+
+        return ws
+
+    async def handle_get_review(self, request: web.Request) -> web.Response:
+        try:
+            n = int(request.query.get("n", 10))
+        except ValueError:
+            raise web.HTTPBadRequest(text="Parameter 'n' must be an integer")
+
+        items = await asyncio.get_running_loop().run_in_executor(None, self._review_session, n)
+        return web.json_response({"items": items})
+
+    async def handle_post_review(self, request: web.Request) -> web.Response:
+        body = await self._read_json(request)
+        results = body.get("results", [])
+        if not isinstance(results, list) or not all(isinstance(result, dict) for result in results):
+            raise web.HTTPBadRequest(text="Field 'results' must be a list of objects")
+
+        # Validate every result before updating any item
+        reviews = []
+        for result in results:
+            try:
+                quality = int(result.get("quality", 0))
+            except (TypeError, ValueError):
+                raise web.HTTPBadRequest(text="Field 'quality' must be an integer from 0 to 5")
+            if not 0 <= quality <= 5:
+                raise web.HTTPBadRequest(text="Field 'quality' must be an integer from 0 to 5")
+            reviews.append((str(result.get("word", "")), quality))
+
+        updated = []
+        for word, quality in reviews:
+            item = self.vocab_manager.get_vocabulary_item(word)
+            if item is None:
+                continue
+            item.update_review_schedule(quality)
+            updated.append(item.to_dict())
+
+        if updated:
+            await asyncio.get_running_loop().run_in_executor(None, self.vocab_manager.save_vocabulary)
+        return web.json_response({"updated": updated})
+
+    # Helpers
+
+    def _review_session(self, n: int):
+        # Picking the review items scans the whole deck
+        return [item.to_dict() for item in self.vocab_manager.get_review_session(n=n)]
+
+    def _get_session(self, request: web.Request):
+        session_id = request.match_info["session_id"]
+        session = self.registry.get(session_id)
+        if session is None:
+            raise web.HTTPNotFound(text=f"Unknown session: {session_id}")
+        return session
+
+    async def _read_json(self, request: web.Request, required: bool = True) -> Dict[str, Any]:
+        if not request.can_read_body:
+            if required:
+                raise web.HTTPBadRequest(text="A JSON body is required")
+            return {}
+        try:
+            body = await request.json()
+        except ValueError:
+            raise web.HTTPBadRequest(text="Invalid JSON body")
+        if not isinstance(body, dict):
+            raise web.HTTPBadRequest(text="The JSON body must be an object")
+        return body
+
+    def _forget_evicted_sessions(self) -> None:
+        # Drop the per-session state of sessions the registry no longer holds
+        active = {session.session_id for session in self.registry.list_sessions()}
+        for session_id in list(self._session_slots):
+            if session_id not in active:
+                del self._session_slots[session_id]
+        for session_id in list(self._turns):
+            if session_id not in active:
+                self._cancel_turns_now(session_id)
+
+    async def _idle_sweeper(self, app: web.Application):
+        async def sweep():
+            while True:
+                await asyncio.sleep(IDLE_SWEEP_INTERVAL)
+                self.registry.evict_idle()
+                self._forget_evicted_sessions()
+
+        task = asyncio.create_task(sweep())
+        yield
+        task.cancel()
+        await aclose_http_session()
+
+    async def _model_warmup(self, app: web.Application):
+        # Preload the model while the first clients connect
+        self.model_monitor.start()
+        yield
+        self.model_monitor.stop()
+
+
+def run_server(host: str = API_HOST, port: int = API_PORT) -> None:
+    """Start the tutor API server and block until it is stopped"""
+    web.run_app(TutorServer().create_app(), host=host, port=port)
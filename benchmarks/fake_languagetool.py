@@ -0,0 +1,100 @@
+"""
+In-process stand-in for language_tool_python used by the benchmarks.
+
+The real LanguageTool needs Java and downloads its server on first use, which
+is not possible on an offline benchmark box. The stub flags a handful of
+common learner mistakes with regular expressions, returns match objects with
+the attributes grammar_checker reads, and waits a configurable time per
+check to imitate the server round trip.
+"""
+import re
+import sys
+import time
+import types
+from typing import List
+
+# (pattern, replacement, rule id, issue type, message)
+RULES = [
+    (r"\b(I|you|we|they) (likes|goes|wants|has|does)\b", None, "PERS_PRONOUN_AGREEMENT", "grammar",
+     "The verb does not agree with the subject."),
+    (r"\b(he|she|it) (like|go|want|have|do)\b", None, "HE_VERB_AGR", "grammar",
+     "Use the third person singular form of the verb."),
+    (r"\byesterday I (go|eat|see|buy)\b", None, "PAST_TENSE", "grammar",
+     "Use the past tense for finished actions."),
+    (r"\bteh\b", "the", "MORFOLOGIK_RULE_EN_US", "misspelling", "Possible spelling mistake found."),
+    (r"\s+,", ",", "COMMA_WHITESPACE", "whitespace", "Remove the space before the comma."),
+]
+
+_AGREEMENT = {
+    "likes": "like", "goes": "go", "wants": "want", "has": "have", "does": "do",
+    "like": "likes", "go": "goes", "want": "wants", "have": "has", "do": "does",
+}
+_PAST = {"go": "went", "eat": "ate", "see": "saw", "buy": "bought"}
+
+_COMPILED = [(re.compile(pattern, re.IGNORECASE), *rest) for pattern, *rest in RULES]
+
+
+class FakeMatch:
+    def __init__(self, text: str, offset: int, length: int, replacement: str, rule_id: str, issue_type: str, message: str):
+        self.offset = offset
+        self.errorLength = length
+        self.replacements = [replacement]
+        self.ruleId = rule_id
+        self.ruleIssueType = issue_type
+        self.category = issue_type.upper()
+        self.message = message
+        self.context = text[max(0, offset - 20):offset + length + 20]
+
+
+class FakeLanguageTool:
+    """Offline replacement for language_tool_python.LanguageTool"""
+
+    latency = 0.02  # Seconds waited per check, set by install()
+
+    def __init__(self, language: str = "en-US", *args, **kwargs):
+        self.language = language
+
+    def check(self, text: str) -> List[FakeMatch]:
+        time.sleep(self.latency)
+        matches = []
+        for pattern, replacement, rule_id, issue_type, message in _COMPILED:
+            for found in pattern.finditer(text):
+                if replacement is None:
+                    # Fix the verb, the last word of the match
+                    verb = found.group(2) if found.lastindex and found.lastindex >= 2 else found.group(1)
+                    lookup = _PAST if rule_id == "PAST_TENSE" else _AGREEMENT
+                    start = found.start(found.lastindex)
+                    fixed = lookup.get(verb.lower(), verb)
+                    matches.append(FakeMatch(text, start, len(verb), fixed, rule_id, issue_type, message))
+                else:
+                    matches.append(FakeMatch(
+                        text, found.start(), found.end() - found.start(), replacement, rule_id, issue_type, message
+                    ))
+        return sorted(matches, key=lambda match: match.offset)
+
+    def close(self) -> None:
+        pass
+
+
+def correct(text: str, matches: List[FakeMatch]) -> str:
+    """Apply the first replacement of every match, like language_tool_python.utils.correct"""
+    for match in sorted(matches, key=lambda match: match.offset, reverse=True):
+        if match.replacements:
+            text = text[:match.offset] + match.replacements[0] + text[match.offset + match.errorLength:]
+    return text
+
+
+def install(latency: float = 0.02) -> None:
+    """
+    Register the stub as the language_tool_python module.
+
+    Must run before core.grammar_checker is imported.
+
+    Args:
+        latency: Seconds each check takes
+    """
+    FakeLanguageTool.latency = latency
+    module = types.ModuleType("language_tool_python")
+    module.LanguageTool = FakeLanguageTool
+    module.utils = types.SimpleNamespace(correct=correct)
+    sys.modules["language_tool_python"] = module
@@ -0,0 +1,200 @@
+"""
+Local stand-in for the Ollama HTTP API used by the benchmarks.
+
+Serves POST /api/generate (streamed or not), GET /api/ps and GET /api/tags
+with a configurable first-token latency, prompt processing speed and token
+rate, and reports the same timing fields as Ollama so the tracer and the
+metrics see realistic numbers. Nothing is sent over the network.
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+REPLY_WORDS = (
+    "that sounds really interesting what do you enjoy most about it I think "
+    "practicing every day is a great idea could you tell me more about your "
+    "weekend plans and the places you would like to visit"
+).split()
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients closing keep-alive connections are expected, not errors
+        pass
+
+
+class FakeOllamaServer:
+    """
+    Threaded HTTP server that imitates Ollama's generate endpoint.
+
+    Args:
+        host: Interface to bind
+        port: Port to listen on (0 picks a free one)
+        first_token_latency: Seconds before the first token, on top of prompt processing
+        tokens_per_second: Generation speed of the streamed reply
+        prefill_tokens_per_second: Prompt processing speed
+        reply_tokens: Tokens per reply (fewer if the request sets a lower num_predict)
+        load_seconds: Model load time reported (and waited) on the first request
+        seed: Seed for the reply text, so runs are reproducible
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        first_token_latency: float = 0.05,
+        tokens_per_second: float = 40.0,
+        prefill_tokens_per_second: float = 2000.0,
+        reply_tokens: int = 40,
+        load_seconds: float = 0.0,
+        seed: int = 0
+    ):
+        self.first_token_latency = first_token_latency
+        self.tokens_per_second = tokens_per_second
+        self.prefill_tokens_per_second = prefill_tokens_per_second
+        self.reply_tokens = reply_tokens
+        self.load_seconds = load_seconds
+        self.requests = 0
+        self._loaded = load_seconds <= 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = _QuietHTTPServer((host, port), self._make_handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeOllamaServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _reply_tokens(self, payload: Dict[str, Any]) -> list:
+        # num_predict only caps the reply, as it does for a real model
+        count = min(self.reply_tokens, payload.get("options", {}).get("num_predict") or self.reply_tokens)
+        with self._lock:
+            self.requests += 1
+            words = [self._random.choice(REPLY_WORDS) for _ in range(max(1, count))]
+        return [word + " " for word in words[:-1]] + [words[-1] + "?"]
+
+    def _timings(self, payload: Dict[str, Any]) -> Dict[str, float]:
+        # Seconds spent loading and processing the prompt before the first token
+        with self._lock:
+            load = 0.0 if self._loaded else self.load_seconds
+            self._loaded = True
+        prompt_tokens = max(1, len(payload.get("prompt", "").split()))
+        return {
+            "load": load,
+            "prompt_tokens": prompt_tokens,
+            "prefill": prompt_tokens / self.prefill_tokens_per_second
+        }
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                if self.path == "/api/ps":
+                    loaded = [{"name": "benchmark", "model": "benchmark"}] if server._loaded else []
+                    self._send_json({"models": loaded})
+                elif self.path == "/api/tags":
+                    self._send_json({"models": [{"name": "benchmark", "model": "benchmark"}]})
+                else:
+                    self.send_error(404)
+
+            def do_POST(self):
+                if self.path != "/api/generate":
+                    self.send_error(404)
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+
+                timings = server._timings(payload)
+                tokens = server._reply_tokens(payload)
+                time.sleep(timings["load"] + timings["prefill"] + server.first_token_latency)
+
+                start = time.perf_counter()
+                if payload.get("stream", True):
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                    for i, token in enumerate(tokens):
+                        if i:
+                            time.sleep(1 / server.tokens_per_second)
+                        if not self._write_chunk({"response": token, "done": False}):
+                            return
+                    self._write_chunk(self._final(payload, timings, len(tokens), time.perf_counter() - start))
+                    self.wfile.write(b"0\r\n\r\n")
+                else:
+                    time.sleep(max(0, len(tokens) - 1) / server.tokens_per_second)
+                    data = self._final(payload, timings, len(tokens), time.perf_counter() - start)
+                    data["response"] = "".join(tokens)
+                    self._send_json(data)
+
+            def _final(self, payload, timings, eval_count, eval_seconds):
+                return {
+                    "model": payload.get("model", "benchmark"),
+                    "response": "",
+                    "done": True,
+                    "load_duration": int(timings["load"] * 1e9),
+                    "prompt_eval_count": timings["prompt_tokens"],
+                    "prompt_eval_duration": int(timings["prefill"] * 1e9),
+                    "eval_count": eval_count,
+                    "eval_duration": int(eval_seconds * 1e9)
+                }
+
+            def _write_chunk(self, data) -> bool:
+                line = (json.dumps(data) + "\n").encode("utf-8")
+                try:
+                    self.wfile.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+                    self.wfile.flush()
+                    return True
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client stopped the generation
+                    return False
+
+            def _send_json(self, data):
+                body = json.dumps(data).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the fake Ollama server on its own")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--first-token-latency", type=float, default=0.05)
+    parser.add_argument("--token-rate", type=float, default=40.0)
+    args = parser.parse_args()
+
+    fake = FakeOllamaServer(port=args.port, first_token_latency=args.first_token_latency, tokens_per_second=args.token_rate)
+    print(f"Fake Ollama listening on {fake.url}")
+    fake.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.stop()
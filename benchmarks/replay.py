@@ -0,0 +1,230 @@
+"""
+Replay recorded conversations through the desktop turn pipeline, headlessly.
+
+Starts the fake Ollama server, swaps LanguageTool for the offline stub (or
+uses a real LanguageTool server), and sends every message through
+chat_manager.handle_user_input with a headless chat area. Reports turn
+throughput, end-to-end turn latency and the per-stage tracer histograms.
+
+Runs offline from a temporary working directory, so the data files of the
+repository are never modified.
+
+Usage:
+    python benchmarks/replay.py
+    python benchmarks/replay.py --repeat 5 --concurrency 2 --output bench.json
+"""
+import argparse
+import heapq
+import itertools
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCHMARK_DIR)
+
+from fake_ollama import FakeOllamaServer
+import fake_languagetool
+
+
+class HeadlessChatArea:
+    """
+    The parts of the Tk Text widget used by chat_manager, without a display.
+
+    Text is appended to a list. Callbacks scheduled with `after` run from
+    run_until() at their due time, like the Tk event loop would run them.
+    """
+
+    def __init__(self):
+        self.text: List[str] = []
+        self._callbacks = []
+        self._order = itertools.count()
+
+    def insert(self, index, text, *tags):
+        self.text.append(text)
+
+    def delete(self, *args):
+        pass
+
+    def config(self, **kwargs):
+        pass
+
+    configure = config
+
+    def yview(self, *args):
+        pass
+
+    def update(self):
+        pass
+
+    def mark_set(self, *args):
+        pass
+
+    def mark_gravity(self, *args):
+        pass
+
+    def mark_unset(self, *args):
+        pass
+
+    def after(self, ms, callback=None, *args):
+        if callback:
+            heapq.heappush(self._callbacks, (time.perf_counter() + ms / 1000, next(self._order), callback, args))
+
+    def after_idle(self, callback, *args):
+        self.after(0, callback, *args)
+
+    def run_until(self, done: Callable[[], bool], timeout: float) -> bool:
+        """Run scheduled callbacks until done() is true; False on timeout"""
+        deadline = time.perf_counter() + timeout
+        while not done():
+            if not self._callbacks or time.perf_counter() > deadline:
+                return False
+            due, _, callback, args = heapq.heappop(self._callbacks)
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            callback(*args)
+        return True
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"count": 0, "avg_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(values)
+    pick = lambda fraction: ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+    return {
+        "count": len(ordered),
+        "avg_ms": sum(ordered) / len(ordered),
+        "p50_ms": pick(0.5),
+        "p95_ms": pick(0.95),
+        "max_ms": ordered[-1]
+    }
+
+
+def prepare_workdir() -> str:
+    # The pipeline reads and writes relative "data/" and "assets/" paths
+    workdir = tempfile.mkdtemp(prefix="english_ai_bench_")
+    os.makedirs(os.path.join(workdir, "data"))
+    shutil.copytree(os.path.join(REPO_DIR, "assets"), os.path.join(workdir, "assets"))
+    common_words = os.path.join(REPO_DIR, "data", "common_words.txt")
+    if os.path.exists(common_words):
+        shutil.copy(common_words, os.path.join(workdir, "data"))
+    return workdir
+
+
+def replay_conversation(chat_manager, messages: List[str], turn_timeout: float) -> List[float]:
+    """Send each message of a conversation in a new session; returns turn latencies in ms"""
+    session = chat_manager.sessions.create()
+    area = HeadlessChatArea()
+    latencies = []
+    try:
+        for message in messages:
+            start = time.perf_counter()
+            reply = chat_manager.handle_user_input(message, area, session)
+            if not area.run_until(lambda: reply.finished, turn_timeout):
+                reply.stop(notice=None)
+                print(f"Turn timed out: {message!r}")
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+    finally:
+        chat_manager.sessions.remove(session.session_id)
+    return latencies
+
+
+def run(args) -> Dict[str, Any]:
+    with open(args.conversations, "r", encoding="utf-8") as f:
+        conversations = json.load(f)["conversations"]
+
+    fake_ollama = FakeOllamaServer(
+        first_token_latency=args.first_token_latency,
+        tokens_per_second=args.token_rate,
+        prefill_tokens_per_second=args.prefill_rate,
+        reply_tokens=args.reply_tokens,
+        load_seconds=args.load_seconds
+    ).start()
+
+    workdir = prepare_workdir()
+    os.chdir(workdir)
+
+    # Configure before importing core, which reads config at import time
+    import config
+    config.OLLAMA_API_URL = f"{fake_ollama.url}/api/generate"
+    if args.languagetool_server:
+        config.LANGUAGE_TOOL_SERVER = args.languagetool_server
+    else:
+        fake_languagetool.install(args.languagetool_latency)
+
+    from core import chat_manager
+    from core.ollama_client import scheduler, prefix_tracker
+    from core.tracing import tracer
+
+    jobs = [conversation["messages"] for _ in range(args.repeat) for conversation in conversations]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(lambda messages: replay_conversation(chat_manager, messages, args.turn_timeout), jobs))
+    wall = time.perf_counter() - start
+
+    latencies = [latency for result in results for latency in result]
+    fake_ollama.stop()
+    os.chdir(REPO_DIR)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "settings": vars(args),
+        "turns": len(latencies),
+        "wall_seconds": wall,
+        "turns_per_second": len(latencies) / wall if wall else 0.0,
+        "ollama_requests": fake_ollama.requests,
+        "turn_latency": percentiles(latencies),
+        "stages": tracer.get_stats(),
+        "stage_report": tracer.format_report(),
+        "ollama_scheduler": scheduler.get_metrics(),
+        "prompt_prefix": prefix_tracker.get_metrics(),
+        "response_cache": chat_manager.response_cache.get_stats() if chat_manager.response_cache is not None else None
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded conversations and report turn latency")
+    parser.add_argument("--conversations", default=os.path.join(BENCHMARK_DIR, "conversations.json"),
+                        help="JSON file with {\"conversations\": [{\"name\", \"messages\"}]}")
+    parser.add_argument("--repeat", type=int, default=1, help="Times each conversation is replayed")
+    parser.add_argument("--concurrency", type=int, default=1, help="Conversations replayed at the same time")
+    parser.add_argument("--first-token-latency", type=float, default=0.05, help="Fake Ollama delay before the first token (s)")
+    parser.add_argument("--token-rate", type=float, default=40.0, help="Fake Ollama generation speed (tokens/s)")
+    parser.add_argument("--prefill-rate", type=float, default=2000.0, help="Fake Ollama prompt processing speed (tokens/s)")
+    parser.add_argument("--reply-tokens", type=int, default=40, help="Tokens per fake reply")
+    parser.add_argument("--load-seconds", type=float, default=0.0, help="Fake model load time on the first request (s)")
+    parser.add_argument("--languagetool-latency", type=float, default=0.02, help="Stub LanguageTool time per check (s)")
+    parser.add_argument("--languagetool-server", help="URL of a real LanguageTool server instead of the stub")
+    parser.add_argument("--turn-timeout", type=float, default=60.0, help="Seconds before a turn is abandoned")
+    parser.add_argument("--output", help="Write the full report as JSON to this file")
+    args = parser.parse_args()
+    # run() works in a temporary directory: resolve the paths given relative to the caller's
+    if args.output:
+        args.output = os.path.abspath(args.output)
+
+    report = run(args)
+    latency = report["turn_latency"]
+    print(f"Turns: {report['turns']} in {report['wall_seconds']:.2f}s ({report['turns_per_second']:.2f} turns/s)")
+    print(f"Turn latency: avg {latency['avg_ms']:.1f} ms, p50 {latency['p50_ms']:.1f} ms, "
+          f"p95 {latency['p95_ms']:.1f} ms, max {latency['max_ms']:.1f} ms")
+    print(f"Ollama requests: {report['ollama_requests']}")
+    print()
+    print(report["stage_report"])
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
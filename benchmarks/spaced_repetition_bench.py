@@ -0,0 +1,215 @@
+"""
+Microbenchmarks for core.spaced_repetition on large vocabulary decks.
+
+Synthesizes decks of VocabularyItems (1k to 1M words) with a realistic mix
+of new, due and scheduled words, and times the VocabularyManager operations
+the app uses. Each operation is timed over several runs (min and median),
+then run once more under tracemalloc to measure the peak memory it
+allocates. Results can be written to JSON and compared with a previous run.
+
+Usage:
+    python benchmarks/spaced_repetition_bench.py
+    python benchmarks/spaced_repetition_bench.py --sizes 1000,100000,1000000 --repeat 3 --output sr.json
+    python benchmarks/spaced_repetition_bench.py --compare sr.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+from core.spaced_repetition import VocabularyItem, VocabularyManager
+from core.tracing import tracer
+
+TAGS = ["noun", "verb", "adjective", "adverb", "phrasal_verb", "idiom", "travel", "work", "food", "uncommon_word"]
+
+
+def synthesize_deck(size: int, seed: int = 0, due_fraction: float = 0.2) -> Dict[str, VocabularyItem]:
+    """
+    Build a deck of `size` items.
+
+    About `due_fraction` of the items are due (some overdue), a tenth are
+    new, and the rest are scheduled up to 60 days ahead with matching SM-2
+    state.
+    """
+    rng = random.Random(seed)
+    today = datetime.date.today()
+    now = datetime.datetime.now()
+    deck = {}
+    for i in range(size):
+        word = f"word{i:07d}"
+        item = VocabularyItem(
+            word,
+            f"Definition of {word}, a word used in everyday English.",
+            f"This is an example sentence that uses {word} in context.",
+            date_added=now - datetime.timedelta(days=rng.randint(0, 365)),
+            tags=rng.sample(TAGS, rng.randint(1, 3))
+        )
+        roll = rng.random()
+        if roll < 0.1:
+            item.next_review_date = item.date_added.date()
+        else:
+            item.repetition_number = rng.randint(1, 8)
+            item.easiness_factor = round(rng.uniform(1.3, 2.8), 2)
+            item.interval = rng.randint(1, 60)
+            item.last_review_date = today - datetime.timedelta(days=rng.randint(1, 30))
+            if roll < 0.1 + due_fraction:
+                item.next_review_date = today - datetime.timedelta(days=rng.randint(0, 10))
+            else:
+                item.next_review_date = today + datetime.timedelta(days=rng.randint(1, 60))
+        deck[word] = item
+    return deck
+
+
+def measure(operation: Callable[[], Any], repeat: int, setup: Callable[[], None] = None) -> Dict[str, float]:
+    """Time an operation `repeat` times, then measure its peak allocation once"""
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        operation()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    operation()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "min_ms": min(timings),
+        "median_ms": statistics.median(timings),
+        "peak_alloc_kb": peak / 1024
+    }
+
+
+def deck_memory_kb(size: int, seed: int) -> float:
+    tracemalloc.start()
+    deck = synthesize_deck(size, seed)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del deck
+    return current / 1024
+
+
+def bench_size(size: int, repeat: int, seed: int, workdir: str) -> Dict[str, Any]:
+    storage_file = os.path.join(workdir, f"vocabulary_{size}.json")
+    manager = VocabularyManager(storage_file)
+    deck = synthesize_deck(size, seed)
+    manager.vocabulary_items = dict(deck)
+
+    results: Dict[str, Any] = {"deck_memory_kb": deck_memory_kb(size, seed)}
+
+    results["save_vocabulary"] = measure(manager.save_vocabulary, repeat)
+    results["file_size_kb"] = os.path.getsize(storage_file) / 1024
+
+    def clear():
+        manager.vocabulary_items = {}
+
+    results["load_vocabulary"] = measure(manager.load_vocabulary, repeat, setup=clear)
+    manager.vocabulary_items = dict(deck)
+
+    results["get_due_for_review"] = measure(manager.get_due_for_review, repeat)
+    results["due_items"] = len(manager.get_due_for_review())
+    results["get_review_session"] = measure(lambda: manager.get_review_session(10), repeat)
+    results["get_learning_stats"] = measure(manager.get_learning_stats, repeat)
+
+    # Review every item once; the deck is rebuilt before each run so every run reviews the same state
+    rng = random.Random(seed)
+    qualities = [rng.randint(0, 5) for _ in range(size)]
+
+    def reset_deck():
+        manager.vocabulary_items = synthesize_deck(size, seed)
+
+    def review_all():
+        for item, quality in zip(manager.vocabulary_items.values(), qualities):
+            item.update_review_schedule(quality)
+
+    results["bulk_update_review_schedule"] = measure(review_all, repeat, setup=reset_deck)
+    results["bulk_update_review_schedule"]["per_item_us"] = results["bulk_update_review_schedule"]["min_ms"] * 1000 / size
+
+    os.remove(storage_file)
+    return results
+
+
+OPERATIONS = [
+    "load_vocabulary", "save_vocabulary", "get_due_for_review", "get_review_session",
+    "get_learning_stats", "bulk_update_review_schedule"
+]
+
+
+def print_results(report: Dict[str, Any], baseline: Dict[str, Any] = None) -> None:
+    header = f"{'operation':<30}{'size':>10}{'min ms':>12}{'median ms':>12}{'peak KB':>12}"
+    if baseline:
+        header += f"{'vs base':>10}"
+    print(header)
+    for size, results in report["results"].items():
+        for operation in OPERATIONS:
+            stats = results[operation]
+            line = (
+                f"{operation:<30}{size:>10}{stats['min_ms']:>12.2f}"
+                f"{stats['median_ms']:>12.2f}{stats['peak_alloc_kb']:>12.0f}"
+            )
+            if baseline:
+                base = baseline.get("results", {}).get(size, {}).get(operation)
+                line += f"{base['min_ms'] / stats['min_ms']:>9.2f}x" if base and stats["min_ms"] else f"{'-':>10}"
+            print(line)
+        print(
+            f"{'  deck / file':<30}{size:>10}  deck {results['deck_memory_kb'] / 1024:.1f} MB, "
+            f"file {results['file_size_kb'] / 1024:.1f} MB, {results['due_items']} due"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark spaced-repetition operations on large decks")
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="Comma-separated deck sizes (1000000 takes a few minutes)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per operation")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic decks")
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    parser.add_argument("--compare", help="Previous JSON report; prints the speedup against it (>1x is faster)")
+    args = parser.parse_args()
+
+    # Measure the operations themselves, not the latency tracer
+    tracer.enabled = False
+
+    sizes: List[int] = [int(size) for size in args.sizes.split(",") if size.strip()]
+    report = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "seed": args.seed,
+        "results": {}
+    }
+    with tempfile.TemporaryDirectory(prefix="english_ai_sr_bench_") as workdir:
+        for size in sizes:
+            print(f"Benchmarking {size} items...", file=sys.stderr)
+            report["results"][str(size)] = bench_size(size, args.repeat, args.seed, workdir)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_results(report, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,10 +16,80 @@ SYSTEM_COLOR = "#FFD700"  # Dorado para mensajes del sistema
 ERROR_COLOR = "#FF4500"  # Naranja-rojo para errores
 TIP_COLOR = "#00FFAA"  # Menta brillante para consejos de aprendizaje
 
+# Área de conversación
+TRANSCRIPT_MAX_LINES = 1500  # Líneas en el widget como máximo; las anteriores se archivan en memoria
+TRANSCRIPT_PAGE_LINES = 300  # Líneas que se archivan o se recuperan de una vez al desplazarse
+
 # IA local
 # alt: tinyllama / gemma:2b / llama2:7b etc.
 OLLAMA_MODEL = "gemma:2b"  # Puede cambiarse a cualquier modelo compatible con Ollama
 OLLAMA_API_URL = "http://localhost:11434/api/generate"
+OLLAMA_NUM_CTX = 2048  # Ventana de contexto del modelo en tokens (debe coincidir con el modelo)
+OLLAMA_NUM_PREDICT = 350  # Máximo de tokens generados por respuesta
+OLLAMA_KEEP_ALIVE = "30m"  # Tiempo que Ollama mantiene el modelo en memoria tras cada petición ("2h", segundos, -1 = siempre, 0 = descargar)
+OLLAMA_WARMUP_ON_START = True  # Precargar el modelo en segundo plano al iniciar la aplicación
+OLLAMA_WARMUP_TIMEOUT = 300  # Segundos máximos que puede tardar la carga del modelo
+OLLAMA_HEALTH_CHECK_INTERVAL = 30  # Segundos entre comprobaciones del estado del modelo
+# Colocación de la plantilla de instrucciones en el prompt:
+#   "random"  - plantilla aleatoria al principio en cada turno (el prefijo cambia siempre)
+#   "session" - una plantilla fija por sesión al principio (prefijo estable)
+#   "suffix"  - plantilla aleatoria tras el historial (prefijo estable y respuestas variadas)
+INSTRUCTION_TEMPLATE_MODE = "suffix"
+HISTORY_EVICTION_LOW_WATERMARK = 0.75  # Al superar el presupuesto, el historial se recorta hasta esta fracción
+PROMPT_TURN_TOKEN_RESERVE = 200  # Tokens reservados para el mensaje del turno y sus instrucciones (uno más largo acorta el historial del prompt)
+
+# Planificador de peticiones a Ollama
+OLLAMA_MAX_CONCURRENCY = 1  # Generaciones simultáneas enviadas a Ollama (igual a OLLAMA_NUM_PARALLEL)
+OLLAMA_MAX_QUEUE_DEPTH = 16  # Peticiones en espera antes de rechazar nuevas
+OLLAMA_QUEUE_TIMEOUT = 120  # Segundos máximos que una petición espera en la cola
+
+# Resumen de conversaciones largas
+ENABLE_HISTORY_SUMMARY = True  # Resumir en segundo plano los turnos que salen del historial
+SUMMARY_MODEL = OLLAMA_MODEL  # Modelo usado para los resúmenes (puede ser uno más pequeño)
+SUMMARY_MAX_TOKENS = 120  # Longitud máxima del resumen acumulado en tokens
+
+# Enrutado de modelos por tarea
+# alt: tinyllama / qwen2:0.5b etc. None = usar preguntas de seguimiento y definiciones predefinidas
+OLLAMA_QUICK_MODEL = None  # Modelo pequeño para tareas auxiliares rápidas
+# Por tarea: modelo, opciones de generación y presupuesto de latencia (segundos máximos esperando a Ollama)
+MODEL_ROUTES = {
+    "conversation": {"model": OLLAMA_MODEL, "options": {}, "latency_budget": 180},
+    "follow_up": {"model": OLLAMA_QUICK_MODEL, "options": {"temperature": 0.7, "num_predict": 40}, "latency_budget": 8},
+    "definition": {"model": OLLAMA_QUICK_MODEL, "options": {"temperature": 0.2, "num_predict": 60}, "latency_budget": 15},
+    "summary": {"model": SUMMARY_MODEL, "options": {"temperature": 0.2, "num_predict": SUMMARY_MAX_TOKENS}, "latency_budget": 60},
+}
+
+# Caché de respuestas para los primeros turnos de cada conversación
+ENABLE_RESPONSE_CACHE = True  # Reutilizar respuestas a mensajes iniciales casi idénticos
+RESPONSE_CACHE_SIZE = 256  # Máximo de mensajes distintos guardados
+RESPONSE_CACHE_TTL = 24 * 3600  # Segundos que se conserva una entrada
+RESPONSE_CACHE_SIMILARITY = 0.85  # Similitud mínima (0-1) entre mensajes para reutilizar una respuesta
+RESPONSE_CACHE_MAX_VARIANTS = 3  # Respuestas distintas que se generan antes de servir desde la caché
+
+# Precarga en segundo plano del contexto de los temas sugeridos
+ENABLE_PREFETCH = True  # Preparar en Ollama el contexto del tema sugerido mientras el usuario lee o escribe
+PREFETCH_DELAY = 1.5  # Segundos de inactividad antes de precargar
+
+# Sesiones de conversación
+MAX_SESSIONS = 32  # Máximo de sesiones simultáneas por proceso
+SESSION_IDLE_TIMEOUT = 1800  # Segundos de inactividad antes de descartar una sesión
+
+# Servidor HTTP/WebSocket local (python main.py --server)
+API_HOST = "127.0.0.1"  # Interfaz en la que escucha el servidor
+API_PORT = 8765  # Puerto del servidor
+API_MAX_CONCURRENT_TURNS = 4  # Turnos procesándose a la vez en todo el servidor
+API_MAX_TURNS_PER_SESSION = 1  # Turnos simultáneos permitidos por sesión
+
+# Medición de latencias del procesamiento de cada turno
+ENABLE_TRACING = True  # Registrar la duración de cada etapa (corrección, prompt, Ollama, interfaz)
+TRACE_LOG_SPANS = False  # Escribir cada medición en LOG_FILE (además del resumen al salir)
+TRACE_RECENT_SPANS = 500  # Mediciones recientes conservadas en memoria
+
+# Métricas de rendimiento (endpoint /metrics y panel de rendimiento)
+METRICS_WINDOW = 300  # Segundos que abarcan las tasas (turnos/min, tokens/s)
+METRICS_HOST = "127.0.0.1"  # Interfaz del endpoint local de la aplicación de escritorio
+METRICS_PORT = 9464  # Puerto del endpoint local (None para desactivarlo)
+PERFORMANCE_PANEL_REFRESH = 2000  # Milisegundos entre actualizaciones del panel
 
 # Configuración de aprendizaje
 LEARNING_LEVELS = ["Principiante", "Intermedio", "Avanzado"]
@@ -28,6 +98,7 @@ DEFAULT_LEVEL = "Intermedio"
 # Configuración de verificación gramatical
 GRAMMAR_FOCUS_OPTIONS = ["Todo", "Tiempos Verbales", "Preposiciones", "Artículos", "Orden de Palabras"]
 DEFAULT_GRAMMAR_FOCUS = "Todo"
+LANGUAGE_TOOL_SERVER = None  # URL de un servidor LanguageTool ya en marcha (None = iniciar uno local)
 
 # Configuración de vocabulario
 VOCAB_REVIEW_FREQUENCY = 10  # Con qué frecuencia sugerir revisión de vocabulario (en mensajes)
@@ -40,8 +111,23 @@ LOG_FILE = "data/app.log"  # Archivo de registro
 CONVERSATION_EXPORT_DIR = "data/conversations"  # Directorio para exportar conversaciones
 
 # Configuración de reconocimiento de voz
+# Motor: "google" (en línea), "whisper" o "sphinx" (locales, sin red) o "file" (transcripciones fijas para pruebas)
+SPEECH_RECOGNITION_BACKEND = "google"
+SPEECH_RECOGNITION_LANGUAGE = "en-US"  # Idioma que se reconoce
+SPEECH_WHISPER_MODEL = "base.en"  # Modelo de Whisper (tiny.en, base.en, small.en...)
+SPEECH_STUB_TRANSCRIPTS = "data/voice_transcripts.txt"  # Transcripciones del motor "file", una por línea
 SPEECH_RECOGNITION_TIMEOUT = 5  # Tiempo máximo de escucha en segundos
-SPEECH_ENERGY_THRESHOLD = 4000  # Umbral de energía para detección de voz
+SPEECH_ENERGY_THRESHOLD = 4000  # Umbral de energía inicial para detección de voz (luego se recalibra)
+SPEECH_KEEP_MICROPHONE_OPEN = True  # Mantener abierto el micrófono entre escuchas para empezar al instante
+SPEECH_RECALIBRATION_INTERVAL = 120  # Segundos entre recalibraciones del ruido ambiente en segundo plano (None = nunca)
+SPEECH_CALIBRATION_DURATION = 0.5  # Segundos de audio usados en cada calibración
+SPEECH_PAUSE_THRESHOLD = 0.5  # Segundos de silencio que marcan el final de la frase (detección de actividad de voz)
+SPEECH_PHRASE_TIME_LIMIT = None  # Duración máxima de una frase en segundos (None = hasta que se deje de hablar)
+SPEECH_PARTIAL_INTERVAL = 1.0  # Segundos de audio nuevo entre transcripciones parciales (motores locales; None = desactivado)
+
+# Configuración de síntesis de voz
+SPEECH_QUEUE_SIZE = 20  # Frases en la cola de síntesis como máximo (las demás esperan en orden a que haya hueco)
+SPEAK_REPLIES_IN_VOICE_MODE = True  # Leer en voz alta, frase a frase, las respuestas a mensajes dictados por voz
 
 # Configuración de repetición espaciada
 SPACED_REPETITION_INITIAL_INTERVAL = 1  # Intervalo inicial en días
@@ -1,9 +1,26 @@
-from core.ollama_client import get_ai_response
+from core.ollama_client import (
+    GenerationHandle, get_route, select_instruction_template, stream_ai_response,
+    INSTRUCTION_TOKEN_RESERVE, ROUTE_CONVERSATION
+)
+from core.prefetcher import prefetcher
+from core.conversation_history import count_tokens
+from core.response_cache import ResponseCache
+from core.session import ConversationSession, SessionRegistry
+from core.metrics import metrics
+from core.tracing import tracer
+from core.ui_updates import get_scheduler
 from core.grammar_checker import correct_text, get_alternative_expressions
 from core.prompt_loader import load_starters
+from config import (
+    OLLAMA_NUM_CTX, OLLAMA_NUM_PREDICT, ENABLE_HISTORY_SUMMARY, SUMMARY_MAX_TOKENS,
+    ENABLE_RESPONSE_CACHE, INSTRUCTION_TEMPLATE_MODE, PROMPT_TURN_TOKEN_RESERVE
+)
 import tkinter as tk
+import queue
 import random
+import threading
 import time
+from concurrent.futures import Future
 
 # Initialize with conversation starters and an enhanced system prompt
 STARTERS = load_starters()
@@ -34,7 +51,24 @@ Remember that your main goal is to keep the conversation flowing naturally while
 the user improve their English skills. Always validate what they say before moving on.
 """
 
-chat_history = SYSTEM_PROMPT
+SUMMARY_HEADER = "Summary of the earlier conversation:"
+
+# Token budget left for conversation turns once the fixed prompt parts, a turn and the reply fit
+HISTORY_TOKEN_BUDGET = (
+    OLLAMA_NUM_CTX - OLLAMA_NUM_PREDICT - INSTRUCTION_TOKEN_RESERVE - PROMPT_TURN_TOKEN_RESERVE
+    - count_tokens(SYSTEM_PROMPT)
+)
+if ENABLE_HISTORY_SUMMARY:
+    HISTORY_TOKEN_BUDGET -= SUMMARY_MAX_TOKENS + count_tokens(SUMMARY_HEADER) + 1
+
+# Conversations served by this process; the desktop window uses its own default session
+sessions = SessionRegistry(HISTORY_TOKEN_BUDGET)
+default_session = ConversationSession(HISTORY_TOKEN_BUDGET, session_id="desktop")
+
+# Replies to opening messages, shared by all sessions
+response_cache = ResponseCache() if ENABLE_RESPONSE_CACHE else None
+if response_cache is not None:
+    metrics.register("response_cache", response_cache.get_stats)
 
 def detect_disinterest(message):
     """
@@ -76,16 +110,18 @@ def detect_disinterest(message):
     
     return is_disinterested, topic_to_avoid
 
-def suggest_topic(chat_area, avoid_topic=None):
+def pick_starter(avoid_topic=None):
     """
-    Suggest a conversation topic to the user, avoiding a specific topic if provided
+    Choose a conversation starter, avoiding a specific topic if provided
     
     Args:
-        chat_area: The text area to display the suggestion
         avoid_topic: Optional keyword to avoid in the suggested topic
+        
+    Returns:
+        The starter, or None if there are no starters
     """
     if not STARTERS:
-        return
+        return None
     
     # If we need to avoid a specific topic, filter out starters containing that keyword
     available_starters = STARTERS
@@ -97,13 +133,49 @@ def suggest_topic(chat_area, avoid_topic=None):
     if not available_starters:
         available_starters = STARTERS
         
-    suggestion = random.choice(available_starters)
+    return random.choice(available_starters)
+
+def offer_starter(session, starter):
+    """
+    Make a starter the context of the learner's next message and prefetch it
     
-    chat_area.config(state="normal")
-    chat_area.insert("end", "SUGGESTION: ", "system")
-    chat_area.insert("end", f"{suggestion}\n\n", "correction")
-    chat_area.config(state="disabled")
-    chat_area.yview("end")
+    The starter is shown to the model as the AI's last line, and the prompt up
+    to it is prepared in Ollama while the learner reads and types.
+    
+    Args:
+        session: ConversationSession the starter was suggested in
+        starter: The suggested starter
+    """
+    with session.lock:
+        session.starter = starter
+        session.template = select_instruction_template() if INSTRUCTION_TEMPLATE_MODE == "random" else None
+        prefix = build_prompt_prefix(session)
+        template, _ = turn_templates(session)
+    
+    if prefetcher:
+        prefetcher.schedule(session.session_id, prefix, template)
+
+def suggest_topic(chat_area, avoid_topic=None, session=None, remember=True):
+    """
+    Suggest a conversation topic to the user, avoiding a specific topic if provided
+    
+    Args:
+        chat_area: The text area to display the suggestion
+        avoid_topic: Optional keyword to avoid in the suggested topic
+        session: ConversationSession the suggestion belongs to (defaults to the desktop session)
+        remember: Whether the learner's next message answers this suggestion
+    """
+    suggestion = pick_starter(avoid_topic)
+    if not suggestion:
+        return
+    
+    view = get_scheduler(chat_area)
+    view.insert("end", "SUGGESTION: ", "system")
+    view.insert("end", f"{suggestion}\n\n", "correction")
+    view.scroll_to_end()
+    
+    if remember:
+        offer_starter(session or default_session, suggestion)
 
 def format_learning_feedback(categorized_issues, expression_suggestions):
     """
@@ -155,118 +227,515 @@ def format_learning_feedback(categorized_issues, expression_suggestions):
     
     return "\n".join(feedback) if feedback else "[✓ Your English is excellent!]"
 
-def handle_user_input(message, chat_area):
-    global chat_history
+def _render_prefix(history, summary="", starter=None, turn_tokens=0):
+    # Everything before the new message. The history already leaves
+    # PROMPT_TURN_TOKEN_RESERVE free, so all stored turns are rendered and the
+    # prefix is the same whatever the message; only a longer turn drops old turns
+    reserved = turn_tokens + (count_tokens(starter) + 2 if starter else 0)
+    history_text = history.render(history.max_tokens - max(0, reserved - PROMPT_TURN_TOKEN_RESERVE))
+    
+    parts = [SYSTEM_PROMPT.rstrip()]
+    if summary:
+        parts.append(f"{SUMMARY_HEADER} {summary}")
+    if history_text:
+        parts.append(history_text)
+    if starter:
+        parts.append(f"AI: {starter}")
+    return "\n".join(parts) + "\n"
 
-    chat_area.config(state="normal")
+def build_prompt(history, user_message, instruction_message, summary="", starter=None, template=""):
+    """
+    Build the model prompt from the system prompt, the turns that fit and the new message
     
-    # Insert user message with simplified styling
-    chat_area.insert("end", "USER: ", "system")
-    chat_area.insert("end", f"{message}\n", "user")
-    chat_area.yview("end")
-    chat_area.update()
+    Args:
+        history: ConversationHistory with the previous turns
+        user_message: The corrected user message for this turn
+        instruction_message: Instructions describing how to answer this turn
+        summary: Running summary of turns no longer in the history
+        starter: Suggested starter the user is answering, if any
+        template: Instruction template placed after the history ("suffix" mode)
+        
+    Returns:
+        The full prompt string
+    """
+    current = f"User: {user_message}\n\n{instruction_message}"
+    if template:
+        current = f"{template}\n\n{current}"
+    return _render_prefix(history, summary, starter, count_tokens(current)) + current
 
-    # Show checking indicator on a new line
-    chat_area.insert("end", "[Analyzing language...]\n", "system")
-    chat_area.yview("end")
-    chat_area.update()
+def turn_templates(session):
+    """
+    Choose the instruction template of the next reply and where it goes
     
-    # Get enhanced grammar correction
-    corrected, issues, categorized_issues = correct_text(message)
+    Everything before the new message should stay byte-identical between turns
+    so Ollama can reuse its KV cache. INSTRUCTION_TEMPLATE_MODE decides:
+    "random" puts a new random template first (prefix changes every turn),
+    "session" puts a template fixed for the session first, and "suffix" puts a
+    random template after the history.
     
-    # Get alternative expression suggestions
-    expression_suggestions = get_alternative_expressions(message)
+    Args:
+        session: ConversationSession of the turn
+        
+    Returns:
+        Tuple of (template before the prompt, template after the history); at
+        most one of them is not empty
+    """
+    if INSTRUCTION_TEMPLATE_MODE == "suffix":
+        return "", select_instruction_template()
+    if INSTRUCTION_TEMPLATE_MODE == "session":
+        if not session.instruction_template:
+            session.instruction_template = select_instruction_template()
+        return session.instruction_template, ""
+    return session.template or select_instruction_template(), ""
 
-    # Display corrections with better formatting
-    if corrected != message or expression_suggestions:
-        chat_area.insert("end", "CORRECTION:\n", "correction")
-        chat_area.insert("end", f"{corrected}\n\n", "correction")
+def build_prompt_prefix(session):
+    """
+    Build the part of the next prompt that comes before the user's message
+    
+    It is the start of what build_prompt returns for the next turn unless
+    that turn needs more than PROMPT_TURN_TOKEN_RESERVE tokens.
+    
+    Args:
+        session: ConversationSession with a suggested starter
         
-        # Display comprehensive feedback
-        learning_feedback = format_learning_feedback(categorized_issues, expression_suggestions)
-        chat_area.insert("end", "LEARNING NOTES:\n", "correction") 
-        chat_area.insert("end", f"{learning_feedback}\n\n", "correction")
-    else:
-        chat_area.insert("end", "[✓ Your English looks good!]\n\n", "correction")
-    
-    chat_area.yview("end")
-    chat_area.update()
+    Returns:
+        The prompt prefix, ending with a line break
+    """
+    return _render_prefix(session.history, session.get_summary(), session.starter)
 
-    # Check for disinterest and suggest a new topic if needed
-    is_disinterested, topic_to_avoid = detect_disinterest(corrected)
-    
-    if is_disinterested and topic_to_avoid:
-        chat_area.insert("end", f"[Detected disinterest in topic: {topic_to_avoid}. Suggesting alternative...]\n", "system")
-        suggest_topic(chat_area, topic_to_avoid)
-        chat_area.yview("end")
-        chat_area.update()
+def analyze_message(message):
+    """
+    Run the language checks for a learner message without touching any UI
+    
+    Args:
+        message: The user's message
+        
+    Returns:
+        dict: Correction, issues, expression suggestions, feedback and disinterest info
+    """
+    with tracer.span("turn.analyze"):
+        # Get enhanced grammar correction
+        corrected, issues, categorized_issues = correct_text(message)
+        
+        # Get alternative expression suggestions
+        with tracer.span("expressions.suggest"):
+            expression_suggestions = get_alternative_expressions(message)
+        
+        learning_feedback = None
+        if corrected != message or expression_suggestions:
+            learning_feedback = format_learning_feedback(categorized_issues, expression_suggestions)
+        
+        # Check for disinterest so the AI can change the subject
+        is_disinterested, topic_to_avoid = detect_disinterest(corrected)
+    
+    return {
+        "message": message,
+        "corrected": corrected,
+        "issues": issues,
+        "categorized_issues": categorized_issues,
+        "expression_suggestions": expression_suggestions,
+        "learning_feedback": learning_feedback,
+        "is_disinterested": is_disinterested,
+        "topic_to_avoid": topic_to_avoid,
+        # Filled in by build_turn_prompt
+        "starter": None,
+        "template": None,
+        "suffix_template": None
+    }
 
-    # AI waiting message on a new line
-    chat_area.insert("end", "AI: ", "system")
-    chat_area.insert("end", "[Thinking...]\n", "system")
-    chat_area.yview("end")
-    chat_area.update()
+def start_analysis(message):
+    """
+    Start analyze_message in a background thread
+    
+    Used by voice input to check the transcript as soon as it arrives,
+    while the UI is still showing it.
+    
+    Args:
+        message: The user's message
+        
+    Returns:
+        Future: Resolves to the analysis; pass it to handle_user_input
+    """
+    future = Future()
+    
+    def run():
+        try:
+            future.set_result(analyze_message(message))
+        except Exception as e:
+            future.set_exception(e)
+    
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+def build_instruction(analysis):
+    """
+    Build the per-turn instructions for the AI from the message analysis
+    
+    Args:
+        analysis: Result of analyze_message
+        
+    Returns:
+        The instruction message placed after the conversation in the prompt
+    """
+    corrected = analysis["corrected"]
+    topic_to_avoid = analysis["topic_to_avoid"]
     
     # Prepare instruction for the AI based on the corrections and user's intent
     instruction = "Please respond to the user. "
     
     # Add information about corrections made
-    if corrected != message:
+    if corrected != analysis["message"]:
         instruction += "I've corrected some grammar issues in their message. "
     
-    if expression_suggestions:
+    if analysis["expression_suggestions"]:
         instruction += "I've suggested some more natural expressions. "
     
     # Add information about most common issue category for focused help
-    most_issues = max(categorized_issues.items(), key=lambda x: len(x[1]) if isinstance(x[1], list) else 0)
+    most_issues = max(analysis["categorized_issues"].items(), key=lambda x: len(x[1]) if isinstance(x[1], list) else 0)
     category, issues_list = most_issues
     
     if issues_list:
         instruction += f"Their most common issue is with {category.lower().replace('_', ' ')}. Please subtly incorporate correct usage of this in your response. "
     
     # Add disinterest information
-    if is_disinterested:
+    if analysis["is_disinterested"]:
         instruction += f"The user has expressed they DON'T LIKE {topic_to_avoid if topic_to_avoid else 'the current topic'}. Acknowledge this and change the subject to something different. "
     
     # Format chat history with a clearer structure
-    last_message = f"User's message: \"{corrected}\". {instruction} Respond conversationally and end with a question to keep the conversation going."
+    return f"User's message: \"{corrected}\". {instruction} Respond conversationally and end with a question to keep the conversation going."
+
+def is_opening_turn(session):
+    """Check whether the next reply depends only on the current message"""
+    return len(session.history) == 0 and not session.get_summary()
+
+def response_cache_context(analysis):
+    """
+    Everything besides the message that shapes an opening reply
     
-    # Update chat history with corrected text
-    chat_history += f"\nUser: {corrected}"
+    Args:
+        analysis: Result of analyze_message
+        
+    Returns:
+        Context key for the response cache
+    """
+    category, issues_list = max(analysis["categorized_issues"].items(), key=lambda x: len(x[1]) if isinstance(x[1], list) else 0)
+    return ResponseCache.make_context(
+        get_route(ROUTE_CONVERSATION)["model"] or "",
+        SYSTEM_PROMPT,
+        str(analysis["corrected"] != analysis["message"]),
+        str(bool(analysis["expression_suggestions"])),
+        category if issues_list else "",
+        str(analysis["is_disinterested"]),
+        analysis["topic_to_avoid"] or "",
+        analysis.get("starter") or "",
+        # The instruction template, before the prompt or after the history, shapes the reply too
+        analysis["template"] or "",
+        analysis["suffix_template"] or ""
+    )
+
+def get_cached_reply(session, analysis):
+    """
+    Return a cached reply for an opening turn
     
-    # Get AI response with enhanced prompting
-    prompt = chat_history + f"\n\n{last_message}"
-    ai_response = get_ai_response(prompt)
-    chat_history += f"\nAI: {ai_response}"
+    Returns:
+        The reply, or None if the turn is not cacheable or nothing matches
+    """
+    if response_cache is None or not is_opening_turn(session):
+        return None
+    return response_cache.get(analysis["corrected"], response_cache_context(analysis))
+
+def cache_reply(analysis, ai_response):
+    """Remember a reply generated for an opening turn (error messages are skipped)"""
+    if response_cache is None or not ai_response or ai_response.startswith("[Error"):
+        return
+    response_cache.put(analysis["corrected"], response_cache_context(analysis), ai_response)
+
+def build_turn_prompt(session, analysis):
+    """
+    Build the model prompt for a turn and update the learner profile
     
-    # Limit chat history length to prevent context overflow with smaller models
-    # Keep only the last 10 exchanges plus the system prompt
-    history_lines = chat_history.split('\n')
-    if len(history_lines) > 20:  # System prompt + 10 exchanges (2 lines each)
-        system_prompt_lines = SYSTEM_PROMPT.strip().split('\n')
-        chat_history = '\n'.join(system_prompt_lines + history_lines[-20:])
+    Args:
+        session: ConversationSession the turn belongs to
+        analysis: Result of analyze_message
+        
+    Returns:
+        The full prompt string
+    """
+    session.touch()
+    if analysis["is_disinterested"] and analysis["topic_to_avoid"]:
+        session.profile.avoid_topic(analysis["topic_to_avoid"])
+    
+    # The suggested starter and its pinned template are used by this turn only
+    analysis["template"], analysis["suffix_template"] = turn_templates(session)
+    analysis["starter"] = session.starter
+    session.starter = session.template = None
+    
+    with tracer.span("prompt.build"):
+        return build_prompt(
+            session.history, analysis["corrected"], build_instruction(analysis),
+            session.get_summary(), analysis["starter"], analysis["suffix_template"]
+        )
+
+def finish_turn(session, analysis, ai_response, response_seconds):
+    """
+    Store a finished exchange in the session history and metrics
     
-    # Remove the "Thinking..." line
-    chat_area.delete("end-2l", "end-1l")
+    Args:
+        session: ConversationSession the turn belongs to
+        analysis: Result of analyze_message
+        ai_response: The AI reply shown to the learner
+        response_seconds: Time spent generating the reply
+    """
+    # Store the whole exchange; old turns are evicted once the token budget is exceeded
+    session.history.append(analysis["corrected"], ai_response)
+    session.metrics.record_turn(analysis["corrected"] != analysis["message"], response_seconds)
+    session.touch()
+    metrics.inc("turns")
+    metrics.mark("turns")
+
+class PendingReply:
+    """
+    A learner turn being processed for the chat area: the grammar analysis,
+    then the AI reply, both computed in background threads.
+    
+    The Tk thread polls them with `after`, shows the corrections once the
+    analysis is ready and then writes the reply chunks, all through the
+    widget's UIUpdateScheduler. The window stays responsive and the turn can
+    be stopped with stop(). A stopped reply is not stored in the conversation
+    history.
+    """
+    
+    POLL_INTERVAL_MS = 50
+    
+    def __init__(self, chat_area, session, analysis, on_done=None, on_chunk=None, on_analysis=None):
+        self.chat_area = chat_area
+        self.view = get_scheduler(chat_area)
+        self.session = session
+        self.analysis = None  # The analyze_message result, once it is shown
+        self.on_done = on_done
+        self.on_chunk = on_chunk
+        self.on_analysis = on_analysis
+        self.handle = GenerationHandle()
+        self.finished = False
+        self.cached = False
+        self._analysis_future = analysis
+        self._started = False
+        self._created = time.perf_counter()
+        self._chunks = queue.Queue()
+        # Set when the "Thinking..." line is shown; the reply replaces that line,
+        # even if more text is added below it
+        self._mark = None
+        
+        threading.Thread(target=self._generate, daemon=True).start()
+        chat_area.after(self.POLL_INTERVAL_MS, self._poll)
+    
+    @property
+    def active(self):
+        return not self.finished
+    
+    def stop(self, notice="[Response stopped]"):
+        """
+        Cancel the generation and close the reply in the chat area right away
+        
+        Args:
+            notice: System line shown after the partial reply (None for no line)
+        """
+        if self.finished:
+            return
+        self.handle.cancel()
+        
+        if self._mark is None and self._analysis_future.done():
+            self._show_analysis()
+        if self._mark is None:
+            # Stopped while the message was still being analyzed
+            if notice:
+                self.view.insert("end", f"{notice}\n", "system")
+        else:
+            self._drain()
+            if notice:
+                self.view.insert(self._mark, ("\n" if self._started else "") + f"{notice}\n", "system")
+        self._finish()
+    
+    def _generate(self):
+        session = self.session
+        try:
+            try:
+                analysis = self._analysis_future.result()
+            except Exception:
+                # Reported in the chat area by the Tk thread
+                return
+            
+            with session.lock:
+                if self.handle.cancelled:
+                    return
+                opening = is_opening_turn(session)
+                prompt = build_turn_prompt(session, analysis)
+                cached = get_cached_reply(session, analysis)
+            
+            # The lock is not held while streaming, so a reset never waits for Ollama
+            response_start = time.time()
+            if cached:
+                self.cached = True
+                parts = [cached]
+                self._chunks.put(cached)
+            else:
+                parts = []
+                for chunk in stream_ai_response(
+                    prompt, session_id=session.session_id, handle=self.handle, template=analysis["template"]
+                ):
+                    parts.append(chunk)
+                    self._chunks.put(chunk)
+            
+            # A stopped reply is dropped so it never reaches the next prompt
+            with session.lock:
+                if not self.handle.cancelled:
+                    ai_response = "".join(parts).strip()
+                    finish_turn(session, analysis, ai_response, time.time() - response_start)
+                    if opening and not cached:
+                        cache_reply(analysis, ai_response)
+        finally:
+            self._chunks.put(None)
+    
+    def _show_analysis(self):
+        # Write the corrections and the "Thinking..." line; returns False if the analysis failed
+        view = self.view
+        try:
+            analysis = self._analysis_future.result()
+        except Exception as e:
+            view.insert("end", f"[Error analyzing message: {e}]\n", "error")
+            view.scroll_to_end()
+            return False
+        self.analysis = analysis
+        
+        # Display corrections with better formatting
+        if analysis["learning_feedback"]:
+            view.insert("end", "CORRECTION:\n", "correction")
+            view.insert("end", f"{analysis['corrected']}\n\n", "correction")
+            
+            # Display comprehensive feedback
+            view.insert("end", "LEARNING NOTES:\n", "correction")
+            view.insert("end", f"{analysis['learning_feedback']}\n\n", "correction")
+        else:
+            view.insert("end", "[✓ Your English looks good!]\n\n", "correction")
+        
+        # Suggest a new topic if the user is not interested in the current one
+        topic_to_avoid = analysis["topic_to_avoid"]
+        if analysis["is_disinterested"] and topic_to_avoid:
+            view.insert("end", f"[Detected disinterest in topic: {topic_to_avoid}. Suggesting alternative...]\n", "system")
+            suggest_topic(self.chat_area, topic_to_avoid, remember=False)
+        
+        # AI waiting message on a new line
+        view.insert("end", "AI: ", "system")
+        view.insert("end", "[Thinking...]\n", "system")
+        self._mark = f"reply_{id(self)}"
+        view.call(self.chat_area.mark_set, self._mark, "end-2l")
+        view.call(self.chat_area.mark_gravity, self._mark, "left")
+        view.scroll_to_end()
+        
+        tracer.record("turn.corrections", time.perf_counter() - self._created)
+        if self.on_analysis:
+            self.on_analysis(self)
+        return True
+    
+    def _drain(self):
+        # Queue the chunks received so far; returns True once the reply is complete
+        while True:
+            try:
+                chunk = self._chunks.get_nowait()
+            except queue.Empty:
+                return False
+            if chunk is None:
+                return True
+            if not self._started:
+                # Remove the "Thinking..." line
+                self.view.call(self.chat_area.delete, self._mark, f"{self._mark} +1l")
+                self.view.call(self.chat_area.mark_gravity, self._mark, "right")
+                self._started = True
+                tracer.record("turn.first_chunk", time.perf_counter() - self._created, cached=self.cached)
+            self.view.insert(self._mark, chunk, "ai")
+            if self.on_chunk:
+                self.on_chunk(chunk)
+    
+    def _poll(self):
+        if self.finished:
+            return
+        if self._mark is None:
+            if not self._analysis_future.done():
+                self.chat_area.after(self.POLL_INTERVAL_MS, self._poll)
+                return
+            if not self._show_analysis():
+                self._finish()
+                return
+        if self._drain():
+            self.view.insert(self._mark, "\n", "ai")
+            self._finish()
+        else:
+            self.view.scroll_to_end()
+            self.chat_area.after(self.POLL_INTERVAL_MS, self._poll)
+    
+    def _finish(self):
+        self.finished = True
+        if not self.handle.cancelled and self._mark is not None:
+            tracer.record("turn.reply", time.perf_counter() - self._created, cached=self.cached)
+        
+        # Add simple separator
+        if self._mark is None:
+            self.view.insert("end", "\n" + "-" * 50 + "\n\n", "separator")
+        else:
+            self.view.call(self.chat_area.mark_gravity, self._mark, "right")
+            self.view.insert(self._mark, "\n" + "-" * 50 + "\n\n", "separator")
+            self.view.call(self.chat_area.mark_unset, self._mark)
+        self.view.scroll_to_end()
+        
+        if self.on_done:
+            self.on_done(self)
+
+def handle_user_input(message, chat_area, session=None, on_done=None, on_chunk=None, analysis=None, on_analysis=None):
+    """
+    Show a learner message and start its corrections and AI reply
     
-    # Show the AI response with simplified styling
-    chat_area.insert("end", f"{ai_response.strip()}\n", "ai")
+    The grammar analysis and the AI reply run in background threads; the
+    corrections are shown as soon as the analysis is ready and the reply is
+    streamed into the chat area. Nothing is redrawn until the Tk thread is
+    idle, so this returns right away.
     
-    # Add simple separator
-    chat_area.insert("end", "\n" + "-" * 50 + "\n\n", "separator")
+    Args:
+        message: The learner's message
+        chat_area: Text widget of the conversation
+        session: ConversationSession (defaults to the desktop session)
+        on_done: Called with the PendingReply once the reply is complete or stopped
+        on_chunk: Called in the Tk thread with each piece of the reply as it is shown
+        analysis: Future from start_analysis(message), if the check already started
+        on_analysis: Called in the Tk thread with the PendingReply once the corrections are shown
+        
+    Returns:
+        PendingReply: Use stop() to cancel the reply
+    """
+    session = session or default_session
+    view = get_scheduler(chat_area)
+    
+    # Insert user message with simplified styling
+    view.insert("end", "USER: ", "system")
+    view.insert("end", f"{message}\n", "user")
+
+    # Show checking indicator on a new line
+    view.insert("end", "[Analyzing language...]\n", "system")
+    view.scroll_to_end()
     
-    chat_area.config(state="disabled")
-    chat_area.yview("end")
+    if analysis is None:
+        analysis = start_analysis(message)
+    return PendingReply(chat_area, session, analysis, on_done, on_chunk, on_analysis)
 
-def reset_conversation(chat_area):
-    """Reset the conversation history"""
-    global chat_history
-    chat_history = SYSTEM_PROMPT
+def reset_conversation(chat_area, session=None, pending_reply=None):
+    """Reset the conversation history, stopping a reply still being generated"""
+    session = session or default_session
+    if pending_reply:
+        pending_reply.stop(notice=None)
+    session.reset()
     
-    chat_area.config(state="normal")
-    chat_area.insert("end", "[Conversation reset]\n\n", "system")
-    chat_area.config(state="disabled")
-    chat_area.yview("end")
+    view = get_scheduler(chat_area)
+    view.insert("end", "[Conversation reset]\n\n", "system")
+    view.scroll_to_end()
     
     # Suggest a starter topic
-    suggest_topic(chat_area)
\ No newline at end of file
+    suggest_topic(chat_area, session=session)
\ No newline at end of file
@@ -0,0 +1,157 @@
+import math
+import re
+from collections import deque
+from typing import Callable, Deque, Iterator, List, Optional
+
+# Rough pieces a BPE/SentencePiece tokenizer produces: words and single symbols
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+def count_tokens(text: str) -> int:
+    """
+    Estimate how many model tokens a piece of text will use.
+
+    Ollama does not expose the model tokenizer, so this approximates a
+    BPE/SentencePiece vocabulary: short words are one token, long words are
+    split roughly every 4 characters, punctuation and line breaks count as one.
+
+    Args:
+        text: The text to measure
+
+    Returns:
+        Estimated number of tokens
+    """
+    if not text:
+        return 0
+
+    tokens = text.count("\n")
+    for piece in _TOKEN_PATTERN.findall(text):
+        tokens += max(1, math.ceil(len(piece) / 4))
+    return tokens
+
+
+def _longest_prefix(text: str, fits: Callable[[str], bool]) -> str:
+    # Binary search for the most whole words of text that still fit
+    words = text.split(" ")
+    low, high = 0, len(words)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if fits(" ".join(words[:middle])):
+            low = middle
+        else:
+            high = middle - 1
+    return " ".join(words[:low])
+
+
+class ConversationTurn:
+    """A single user/AI exchange with its rendered text and token cost cached."""
+
+    __slots__ = ("user", "ai", "text", "tokens")
+
+    def __init__(self, user: str, ai: str, token_counter: Callable[[str], int] = count_tokens):
+        self.user = user
+        self.ai = ai
+        self.text = f"User: {user}\nAI: {ai}"
+        # +1 for the line break that joins this turn to the previous one
+        self.tokens = token_counter(self.text) + 1
+
+
+class ConversationHistory:
+    """
+    Conversation buffer made of whole turns with a token budget.
+
+    Turns are kept in a deque, so appending and evicting are O(1) and multi-line
+    AI replies are never cut in half. When the stored turns exceed `max_tokens`
+    the oldest ones are evicted down to `low_watermark` of the budget and
+    handed to `on_evict`. Evicting in batches keeps the start of the history
+    (and so the prompt prefix Ollama can reuse) unchanged for several turns.
+    The newest turn is never evicted; a turn larger than the whole budget is
+    truncated to fit.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int,
+        token_counter: Callable[[str], int] = count_tokens,
+        on_evict: Optional[Callable[[List[ConversationTurn]], None]] = None,
+        low_watermark: float = 1.0
+    ):
+        self.max_tokens = max_tokens
+        self.low_watermark = low_watermark
+        self.token_counter = token_counter
+        self.on_evict = on_evict
+        self.turns: Deque[ConversationTurn] = deque()
+        self.total_tokens = 0
+
+    def append(self, user: str, ai: str) -> ConversationTurn:
+        """
+        Add a finished exchange to the history, evicting old turns if needed.
+
+        Args:
+            user: The (corrected) user message
+            ai: The AI response
+
+        Returns:
+            The stored turn (truncated if it alone exceeds the budget)
+        """
+        turn = ConversationTurn(user, ai, self.token_counter)
+        if turn.tokens > self.max_tokens:
+            turn = ConversationTurn(*self._truncate_turn(user, ai), self.token_counter)
+        self.turns.append(turn)
+        self.total_tokens += turn.tokens
+
+        evicted = []
+        if self.total_tokens > self.max_tokens:
+            target = self.max_tokens * self.low_watermark
+            while len(self.turns) > 1 and self.total_tokens > target:
+                old_turn = self.turns.popleft()
+                self.total_tokens -= old_turn.tokens
+                evicted.append(old_turn)
+
+        if evicted and self.on_evict:
+            self.on_evict(evicted)
+
+        return turn
+
+    def render(self, max_tokens: Optional[int] = None) -> str:
+        """
+        Render the most recent turns that fit in the given token budget.
+
+        Args:
+            max_tokens: Budget for this prompt (defaults to the buffer budget)
+
+        Returns:
+            The turns formatted as "User: ...\\nAI: ..." lines, oldest first
+        """
+        budget = self.max_tokens if max_tokens is None else max_tokens
+        if self.total_tokens <= budget:
+            return "\n".join(turn.text for turn in self.turns)
+
+        selected = []
+        used = 0
+        for turn in reversed(self.turns):
+            if used + turn.tokens > budget:
+                break
+            selected.append(turn.text)
+            used += turn.tokens
+        selected.reverse()
+        return "\n".join(selected)
+
+    def _truncate_turn(self, user: str, ai: str):
+        # Keep the start of the exchange: cut the reply first, then the message
+        def fits(user_text, ai_text):
+            return self.token_counter(f"User: {user_text}\nAI: {ai_text}") + 1 <= self.max_tokens
+
+        if not fits(user, ""):
+            return _longest_prefix(user, lambda text: fits(text, "")), ""
+        return user, _longest_prefix(ai, lambda text: fits(user, text))
+
+    def clear(self) -> None:
+        """Remove every turn from the history"""
+        self.turns.clear()
+        self.total_tokens = 0
+
+    def __len__(self) -> int:
+        return len(self.turns)
+
+    def __iter__(self) -> Iterator[ConversationTurn]:
+        return iter(self.turns)
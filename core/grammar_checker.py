@@ -3,10 +3,16 @@ import re
 from typing import Dict, List, Tuple, Any, Optional
 import json
 import os
-from config import DATA_DIR
+import threading
+from config import DATA_DIR, LANGUAGE_TOOL_SERVER
+from core.ollama_client import define_word, route_enabled, ROUTE_DEFINITION
+from core.tracing import tracer
 
-# Inicializar la herramienta
-tool = language_tool_python.LanguageTool('en-US')
+# Inicializar la herramienta (local o en un servidor compartido)
+if LANGUAGE_TOOL_SERVER:
+    tool = language_tool_python.LanguageTool('en-US', remote_server=LANGUAGE_TOOL_SERVER)
+else:
+    tool = language_tool_python.LanguageTool('en-US')
 
 # Categorizar problemas por tipo para mejor retroalimentación
 VERB_TENSE_RULES = [
@@ -58,6 +64,8 @@ class KnowledgeBase:
             "idioms_learned": {},      # Expresiones idiomáticas aprendidas
             "pronunciation_challenges": {}  # Desafíos de pronunciación específicos
         }
+        # Varias sesiones pueden registrar errores a la vez desde distintos hilos
+        self.lock = threading.RLock()
         self.load()
     
     def load(self):
@@ -74,39 +82,48 @@ class KnowledgeBase:
     def save(self):
         """Guardar base de conocimiento en archivo"""
         try:
-            with open(self.file_path, "w", encoding="utf-8") as f:
+            with tracer.span("knowledge_base.save"), self.lock, open(self.file_path, "w", encoding="utf-8") as f:
                 json.dump(self.data, f, indent=2)
         except Exception as e:
             print(f"Error al guardar base de conocimiento: {e}")
     
     def record_error(self, error_type: str, error_text: str, context: str):
         """Registrar un error en la base de conocimiento"""
-        if error_type not in self.data["common_errors"]:
-            self.data["common_errors"][error_type] = {}
-        
-        if error_text in self.data["common_errors"][error_type]:
-            self.data["common_errors"][error_type][error_text]["count"] += 1
+        with self.lock:
+            if error_type not in self.data["common_errors"]:
+                self.data["common_errors"][error_type] = {}
             
-            # Añadir contexto si no se ha visto antes
-            if context not in self.data["common_errors"][error_type][error_text]["contexts"]:
-                self.data["common_errors"][error_type][error_text]["contexts"].append(context)
-        else:
-            self.data["common_errors"][error_type][error_text] = {
-                "count": 1,
-                "contexts": [context]
-            }
-        
-        self.save()
+            if error_text in self.data["common_errors"][error_type]:
+                self.data["common_errors"][error_type][error_text]["count"] += 1
+                
+                # Añadir contexto si no se ha visto antes
+                if context not in self.data["common_errors"][error_type][error_text]["contexts"]:
+                    self.data["common_errors"][error_type][error_text]["contexts"].append(context)
+            else:
+                self.data["common_errors"][error_type][error_text] = {
+                    "count": 1,
+                    "contexts": [context]
+                }
+            
+            self.save()
     
     def add_vocabulary(self, word: str, definition: str, example: str, tags: List[str] = None):
         """Añadir vocabulario aprendido"""
-        self.data["learned_vocabulary"][word] = {
-            "definition": definition,
-            "example": example,
-            "tags": tags or [],
-            "date_added": self.get_current_date_string()
-        }
-        self.save()
+        with self.lock:
+            self.data["learned_vocabulary"][word] = {
+                "definition": definition,
+                "example": example,
+                "tags": tags or [],
+                "date_added": self.get_current_date_string()
+            }
+            self.save()
+    
+    def update_definition(self, word: str, definition: str):
+        """Sustituir la definición de una palabra ya guardada"""
+        with self.lock:
+            if word in self.data["learned_vocabulary"]:
+                self.data["learned_vocabulary"][word]["definition"] = definition
+                self.save()
     
     def get_current_date_string(self) -> str:
         """Obtener fecha actual como string (para serialización JSON)"""
@@ -133,12 +150,13 @@ class KnowledgeBase:
     
     def add_pronunciation_challenge(self, phoneme: str, word: str):
         """Registrar un desafío de pronunciación para el usuario"""
-        if phoneme not in self.data["pronunciation_challenges"]:
-            self.data["pronunciation_challenges"][phoneme] = []
-        
-        if word not in self.data["pronunciation_challenges"][phoneme]:
-            self.data["pronunciation_challenges"][phoneme].append(word)
-            self.save()
+        with self.lock:
+            if phoneme not in self.data["pronunciation_challenges"]:
+                self.data["pronunciation_challenges"][phoneme] = []
+            
+            if word not in self.data["pronunciation_challenges"][phoneme]:
+                self.data["pronunciation_challenges"][phoneme].append(word)
+                self.save()
     
     def get_pronunciation_exercises(self, count: int = 3) -> List[Dict]:
         """Obtener ejercicios de pronunciación personalizados"""
@@ -359,6 +377,25 @@ def extract_vocabulary_candidates(text: str) -> List[Dict]:
     
     return candidates
 
+# Cómo se describe cada tipo de candidato al pedir su definición
+DEFINITION_KINDS = {
+    "uncommon_word": "word",
+    "idiom": "idiom",
+    "phrasal_verb": "phrasal verb"
+}
+
+def fill_vocabulary_definitions(candidates: List[Dict]):
+    """
+    Sustituye las definiciones genéricas por las del modelo rápido
+    
+    Args:
+        candidates: Candidatos de vocabulario ya añadidos a la base de conocimiento
+    """
+    for candidate in candidates:
+        definition = define_word(candidate["word"], DEFINITION_KINDS.get(candidate["type"], "word"))
+        if definition:
+            knowledge_base.update_definition(candidate["word"], definition)
+
 def correct_text(text: str) -> Tuple[str, List[str], Dict[str, List[str]]]:
     """
     Corregir texto y proporcionar retroalimentación detallada por categoría.
@@ -372,7 +409,8 @@ def correct_text(text: str) -> Tuple[str, List[str], Dict[str, List[str]]]:
         - lista de problemas
         - diccionario de sugerencias categorizadas
     """
-    matches = tool.check(text)
+    with tracer.span("languagetool.check", chars=len(text)):
+        matches = tool.check(text)
     corrected = language_tool_python.utils.correct(text, matches)
     
     # Lista básica de problemas
@@ -441,7 +479,8 @@ def correct_text(text: str) -> Tuple[str, List[str], Dict[str, List[str]]]:
             )
     
     # Extraer candidatos de vocabulario
-    vocab_candidates = extract_vocabulary_candidates(text)
+    with tracer.span("vocabulary.extract"):
+        vocab_candidates = extract_vocabulary_candidates(text)
     
     # Añadir cada candidato a la base de conocimiento
     for candidate in vocab_candidates[:3]:  # Limitar a 3 para no sobrecargar
@@ -469,6 +508,10 @@ def correct_text(text: str) -> Tuple[str, List[str], Dict[str, List[str]]]:
                 [candidate["type"]]
             )
     
+    # Completar las definiciones con el modelo rápido sin retrasar la corrección
+    if vocab_candidates and route_enabled(ROUTE_DEFINITION):
+        threading.Thread(target=fill_vocabulary_definitions, args=(vocab_candidates[:3],), daemon=True).start()
+    
     return corrected, issues, categorized
 
 def get_alternative_expressions(text: str) -> List[Tuple[str, str]]:
@@ -0,0 +1,230 @@
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from config import METRICS_WINDOW
+from core.tracing import tracer
+
+# Prefix of every exported metric name
+METRIC_PREFIX = "english_ai"
+
+# Content type of the Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_INVALID_NAME_CHARS = re.compile(r"[^a-zA-Z0-9_]")
+
+def _metric_name(*parts: str) -> str:
+    return _INVALID_NAME_CHARS.sub("_", "_".join((METRIC_PREFIX,) + parts))
+
+def _format_value(value: float) -> str:
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    """
+    Live performance numbers for operators.
+
+    Holds counters and rolling-window events (e.g. turns or generated tokens
+    over the last `window` seconds), and pulls the stats that other modules
+    already keep (scheduler, prefix reuse, response cache, ...) through
+    registered collectors. Stage latencies come from the tracer histograms.
+    """
+
+    def __init__(self, window: float = METRICS_WINDOW):
+        self.window = window
+        self.started_at = time.time()
+        self._counters: Dict[str, float] = {}
+        self._events: Dict[str, Deque[Tuple[float, float, float]]] = {}
+        self._collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, amount: float = 1) -> None:
+        """Increase a counter that only goes up"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def mark(self, name: str, amount: float = 1, seconds: float = 0.0) -> None:
+        """
+        Record an event in the rolling window.
+
+        Args:
+            name: Event name, e.g. "turns"
+            amount: Size of the event (1 for a turn, the token count for a generation)
+            seconds: Time the event took, used for throughput (amount per busy second)
+        """
+        now = time.time()
+        with self._lock:
+            events = self._events.setdefault(name, deque())
+            events.append((now, amount, seconds))
+            self._expire(events, now)
+
+    def register(self, name: str, collector: Callable[[], Dict[str, Any]]) -> None:
+        """
+        Add a source of stats to the snapshot.
+
+        Args:
+            name: Section name, e.g. "response_cache"
+            collector: Callable returning a dict of numbers
+        """
+        with self._lock:
+            self._collectors[name] = collector
+
+    def get_rolling(self) -> Dict[str, Dict[str, Any]]:
+        """Rates of the rolling-window events"""
+        now = time.time()
+        elapsed = max(1.0, min(self.window, now - self.started_at))
+        rolling = {}
+        with self._lock:
+            for name, events in self._events.items():
+                self._expire(events, now)
+                total = sum(amount for _, amount, _ in events)
+                busy = sum(seconds for _, _, seconds in events)
+                rolling[name] = {
+                    "count": len(events),
+                    "total": total,
+                    "per_minute": total * 60 / elapsed,
+                    # Amount per busy second; None for events recorded without a duration
+                    "throughput": total / busy if busy else None
+                }
+        return rolling
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Collect every metric.
+
+        Returns:
+            Dict: counters, rolling rates, stage latencies and one section per collector
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            collectors = list(self._collectors.items())
+
+        snapshot = {
+            "uptime": time.time() - self.started_at,
+            "counters": counters,
+            "rolling": self.get_rolling(),
+            "latency": tracer.get_stats()
+        }
+        for name, collector in collectors:
+            try:
+                snapshot[name] = collector()
+            except Exception as e:
+                print(f"Error collecting {name} metrics: {e}")
+        return snapshot
+
+    def render_prometheus(self) -> str:
+        """Render the snapshot in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines: List[str] = []
+
+        lines.append(f"# TYPE {_metric_name('uptime_seconds')} gauge")
+        lines.append(f"{_metric_name('uptime_seconds')} {_format_value(snapshot['uptime'])}")
+
+        for name, value in sorted(snapshot["counters"].items()):
+            metric = _metric_name(name, "total")
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {_format_value(value)}")
+
+        for name, rates in sorted(snapshot["rolling"].items()):
+            for key in ("per_minute", "throughput"):
+                if rates[key] is None:
+                    continue
+                metric = _metric_name(name, key)
+                lines.append(f"# TYPE {metric} gauge")
+                lines.append(f"{metric} {_format_value(rates[key])}")
+
+        latency = _metric_name("stage_latency_ms")
+        if snapshot["latency"]:
+            lines.append(f"# TYPE {latency} summary")
+            for stage, stats in snapshot["latency"].items():
+                lines.append(f'{latency}{{stage="{stage}",quantile="0.5"}} {_format_value(stats["p50_ms"])}')
+                lines.append(f'{latency}{{stage="{stage}",quantile="0.95"}} {_format_value(stats["p95_ms"])}')
+                lines.append(f'{latency}_sum{{stage="{stage}"}} {_format_value(stats["avg_ms"] * stats["count"])}')
+                lines.append(f'{latency}_count{{stage="{stage}"}} {stats["count"]}')
+
+        for section, values in snapshot.items():
+            if section in ("uptime", "counters", "rolling", "latency") or not isinstance(values, dict):
+                continue
+            for key, value in sorted(values.items()):
+                if isinstance(value, bool):
+                    value = int(value)
+                if not isinstance(value, (int, float)):
+                    continue
+                metric = _metric_name(section, key)
+                lines.append(f"# TYPE {metric} gauge")
+                lines.append(f"{metric} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+    def format_report(self) -> str:
+        """Render the snapshot as plain text for the desktop performance panel"""
+        snapshot = self.snapshot()
+        rolling = snapshot["rolling"]
+        turns = rolling.get("turns", {})
+        tokens = rolling.get("ollama_tokens", {})
+
+        lines = [
+            f"Uptime: {snapshot['uptime'] / 60:.1f} min   (rolling window: {self.window / 60:.0f} min)",
+            f"Turns: {snapshot['counters'].get('turns', 0):.0f} total, {turns.get('per_minute', 0.0):.2f}/min",
+            f"Ollama: {tokens.get('throughput') or 0.0:.1f} tokens/s",
+            "",
+            tracer.format_report(),
+        ]
+        for section, values in snapshot.items():
+            if section in ("uptime", "counters", "rolling", "latency") or not isinstance(values, dict):
+                continue
+            lines.append("")
+            lines.append(f"[{section}]")
+            for key, value in sorted(values.items()):
+                if isinstance(value, float):
+                    value = f"{value:.3f}"
+                lines.append(f"  {key}: {value}")
+        return "\n".join(lines)
+
+    def _expire(self, events: Deque[Tuple[float, float, float]], now: float) -> None:
+        while events and now - events[0][0] > self.window:
+            events.popleft()
+
+
+metrics = MetricsRegistry()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes are frequent; keep them out of the console
+        pass
+
+
+def start_metrics_server(host: str, port: int) -> Optional[ThreadingHTTPServer]:
+    """
+    Serve GET /metrics in a background thread (used by the desktop app).
+
+    Args:
+        host: Interface to bind, normally 127.0.0.1
+        port: Port to listen on
+
+    Returns:
+        The running server, or None if it could not be started
+    """
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        print(f"Error starting metrics endpoint on {host}:{port}: {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
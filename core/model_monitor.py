@@ -0,0 +1,121 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import requests
+
+from config import OLLAMA_MODEL, OLLAMA_WARMUP_ON_START, OLLAMA_HEALTH_CHECK_INTERVAL
+from core.ollama_client import get_route, list_loaded_models, warm_up_model, ROUTE_CONVERSATION
+
+# Model states reported by ModelMonitor
+MODEL_UNKNOWN = "unknown"
+MODEL_LOADING = "loading"
+MODEL_READY = "ready"
+MODEL_UNLOADED = "unloaded"
+MODEL_OFFLINE = "offline"
+
+class ModelMonitor:
+    """
+    Preloads the chat model at startup and keeps track of whether Ollama has it
+    in memory.
+
+    A background thread loads the model once (as soon as Ollama is reachable)
+    and then asks /api/ps every `interval` seconds. Readers call get_status(),
+    which never blocks on the network.
+    """
+
+    def __init__(
+        self,
+        model: str = None,
+        interval: float = OLLAMA_HEALTH_CHECK_INTERVAL,
+        warm_up: bool = OLLAMA_WARMUP_ON_START
+    ):
+        self.model = model or get_route(ROUTE_CONVERSATION)["model"] or OLLAMA_MODEL
+        self.interval = interval
+        self.warm_up = warm_up
+        self.state = MODEL_UNKNOWN
+        self.expires_at: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.checked_at: Optional[float] = None
+        self._warmed_up = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        """Start warming up and probing in the background"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop probing (a warm-up in progress still finishes)"""
+        self._stop.set()
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "model": self.model,
+                "state": self.state,
+                "expires_at": self.expires_at,
+                "load_seconds": self.load_seconds,
+                "last_error": self.last_error,
+                "checked_at": self.checked_at
+            }
+
+    def check(self) -> str:
+        """
+        Ask Ollama whether the model is loaded and update the status.
+
+        Returns:
+            str: The new state
+        """
+        try:
+            loaded = list_loaded_models()
+        except requests.exceptions.RequestException as e:
+            self._set(MODEL_OFFLINE, error=str(e))
+            return MODEL_OFFLINE
+
+        entry = next((m for m in loaded if self._matches(m.get("name") or m.get("model", ""))), None)
+        if entry:
+            self._set(MODEL_READY, expires_at=entry.get("expires_at"))
+            return MODEL_READY
+        self._set(MODEL_UNLOADED)
+        return MODEL_UNLOADED
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            state = self.check()
+            if state == MODEL_READY:
+                # Already loaded: later unloads follow the keep-alive policy
+                self._warmed_up = True
+            elif self.warm_up and not self._warmed_up and state == MODEL_UNLOADED:
+                self._load()
+                continue
+            self._stop.wait(self.interval)
+
+    def _load(self) -> None:
+        self._set(MODEL_LOADING)
+        try:
+            load_seconds = warm_up_model(self.model)
+        except Exception as e:
+            print(f"Error preloading model {self.model}: {e}")
+            self._set(MODEL_OFFLINE, error=str(e))
+            self._stop.wait(self.interval)
+            return
+
+        self._warmed_up = True
+        with self._lock:
+            self.load_seconds = load_seconds
+
+    def _matches(self, name: str) -> bool:
+        # Ollama reports untagged models as "<name>:latest"
+        return name == self.model or (":" not in self.model and name == f"{self.model}:latest")
+
+    def _set(self, state: str, expires_at: Optional[str] = None, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.state = state
+            self.expires_at = expires_at
+            self.last_error = error
+            self.checked_at = time.time()
@@ -1,7 +1,356 @@
+import asyncio
+import json
 import requests
-import time
 import random
-from config import OLLAMA_API_URL, OLLAMA_MODEL
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+import aiohttp
+from config import (
+    OLLAMA_API_URL, OLLAMA_MODEL, OLLAMA_NUM_CTX, OLLAMA_NUM_PREDICT, OLLAMA_KEEP_ALIVE,
+    OLLAMA_MAX_CONCURRENCY, OLLAMA_MAX_QUEUE_DEPTH, OLLAMA_QUEUE_TIMEOUT, OLLAMA_WARMUP_TIMEOUT, MODEL_ROUTES
+)
+from core.conversation_history import count_tokens
+from core.metrics import metrics
+from core.tracing import tracer
+
+# Root of the Ollama HTTP API (OLLAMA_API_URL points at /api/generate)
+OLLAMA_BASE_URL = OLLAMA_API_URL.rsplit("/api/", 1)[0]
+
+# Seconds allowed to open a connection to Ollama
+CONNECT_TIMEOUT = 10
+
+# Request priorities: interactive turns are always admitted before background work
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+class SchedulerOverloaded(Exception):
+    """The request was shed because the Ollama queue is full or the wait timed out"""
+
+
+class _Ticket:
+    __slots__ = ("session_id", "priority", "enqueued_at", "granted", "shed", "on_wake")
+
+    def __init__(self, session_id: str, priority: int):
+        self.session_id = session_id
+        self.priority = priority
+        self.enqueued_at = time.time()
+        self.granted = threading.Event()
+        self.shed = False
+        self.on_wake = None  # Extra wake-up hook for asyncio waiters
+
+    def wake(self) -> None:
+        self.granted.set()
+        if self.on_wake:
+            self.on_wake()
+
+
+class OllamaScheduler:
+    """
+    Admission control in front of Ollama.
+
+    At most `max_concurrency` generations run at once. Waiting requests are
+    queued by priority and, within a priority, served round-robin across
+    sessions so one busy learner cannot starve the others. When more than
+    `max_queue_depth` requests are waiting, background work is shed first and
+    new requests are rejected with SchedulerOverloaded.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = OLLAMA_MAX_CONCURRENCY,
+        max_queue_depth: int = OLLAMA_MAX_QUEUE_DEPTH,
+        queue_timeout: float = OLLAMA_QUEUE_TIMEOUT
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue_depth = max_queue_depth
+        self.queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        # priority -> session_id -> waiting tickets; session order rotates for fairness
+        self._queues = {
+            PRIORITY_INTERACTIVE: OrderedDict(),
+            PRIORITY_BACKGROUND: OrderedDict()
+        }
+        self._queued = 0
+        self._in_flight = 0
+        self._stats = {
+            "admitted": 0,
+            "shed": 0,
+            "timeouts": 0,
+            "wait_seconds_total": 0.0,
+            "max_wait_seconds": 0.0,
+            "max_queue_depth": 0
+        }
+
+    @contextmanager
+    def slot(self, session_id: str = "default", priority: int = PRIORITY_INTERACTIVE, timeout: float = None):
+        """
+        Hold a generation slot for the duration of the `with` block.
+
+        Args:
+            session_id: Session the request belongs to (used for fair queuing)
+            priority: PRIORITY_INTERACTIVE or PRIORITY_BACKGROUND
+            timeout: Maximum seconds to wait in the queue (defaults to queue_timeout)
+
+        Raises:
+            SchedulerOverloaded: If the request is shed or waits too long
+        """
+        ticket = self.acquire(session_id, priority, timeout)
+        try:
+            yield
+        finally:
+            self.release(ticket)
+
+    @asynccontextmanager
+    async def aslot(self, session_id: str = "default", priority: int = PRIORITY_INTERACTIVE, timeout: float = None):
+        """Asyncio version of `slot`: waits without blocking the event loop or a thread"""
+        ticket = await self.aacquire(session_id, priority, timeout)
+        try:
+            yield
+        finally:
+            self.release(ticket)
+
+    def acquire(self, session_id: str = "default", priority: int = PRIORITY_INTERACTIVE, timeout: float = None) -> _Ticket:
+        """Wait for a generation slot; see `slot` for the arguments"""
+        ticket = _Ticket(session_id, priority)
+        if self._admit(ticket):
+            return ticket
+
+        wait_timeout = self.queue_timeout if timeout is None else timeout
+        if not ticket.granted.wait(wait_timeout) and self._abandon(ticket, timed_out=True):
+            raise SchedulerOverloaded("Timed out waiting for Ollama")
+
+        if ticket.shed:
+            raise SchedulerOverloaded("Request shed to make room for interactive turns")
+        return ticket
+
+    async def aacquire(self, session_id: str = "default", priority: int = PRIORITY_INTERACTIVE, timeout: float = None) -> _Ticket:
+        """Asyncio version of `acquire`; cancelling the waiting task leaves the queue cleanly"""
+        loop = asyncio.get_running_loop()
+        woken = loop.create_future()
+
+        def resolve():
+            if not woken.done():
+                woken.set_result(None)
+
+        ticket = _Ticket(session_id, priority)
+        ticket.on_wake = lambda: loop.call_soon_threadsafe(resolve)
+        if self._admit(ticket):
+            return ticket
+
+        wait_timeout = self.queue_timeout if timeout is None else timeout
+        try:
+            await asyncio.wait_for(asyncio.shield(woken), wait_timeout)
+        except asyncio.TimeoutError:
+            if self._abandon(ticket, timed_out=True):
+                raise SchedulerOverloaded("Timed out waiting for Ollama")
+        except asyncio.CancelledError:
+            # Granted while being cancelled: hand the slot to the next request
+            if not self._abandon(ticket) and not ticket.shed:
+                self.release(ticket)
+            raise
+
+        if ticket.shed:
+            raise SchedulerOverloaded("Request shed to make room for interactive turns")
+        return ticket
+
+    def release(self, ticket: _Ticket) -> None:
+        """Free the slot held by a ticket and admit the next waiting request"""
+        with self._lock:
+            self._in_flight -= 1
+            self._dispatch()
+
+    def queue_depth(self) -> int:
+        """Number of requests waiting for a slot"""
+        with self._lock:
+            return self._queued
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Snapshot of the scheduler state.
+
+        Returns:
+            Dict: Queue depth per priority, requests in flight and admission counters
+        """
+        with self._lock:
+            metrics = dict(self._stats)
+            metrics["in_flight"] = self._in_flight
+            metrics["queue_depth"] = self._queued
+            metrics["queue_depth_interactive"] = sum(len(q) for q in self._queues[PRIORITY_INTERACTIVE].values())
+            metrics["queue_depth_background"] = sum(len(q) for q in self._queues[PRIORITY_BACKGROUND].values())
+            metrics["avg_wait_seconds"] = (
+                metrics["wait_seconds_total"] / metrics["admitted"] if metrics["admitted"] else 0.0
+            )
+            return metrics
+
+    def _admit(self, ticket: _Ticket) -> bool:
+        # Grant a free slot right away or queue the ticket; True if granted
+        victim = None
+        with self._lock:
+            if self._in_flight < self.max_concurrency and self._queued == 0:
+                self._grant(ticket)
+                return True
+
+            if self._queued >= self.max_queue_depth:
+                victim = self._pop_newest(PRIORITY_BACKGROUND) if ticket.priority == PRIORITY_INTERACTIVE else None
+                if victim is None:
+                    self._stats["shed"] += 1
+                    raise SchedulerOverloaded("Ollama request queue is full")
+
+            self._enqueue(ticket)
+
+        if victim:
+            victim.wake()
+        return False
+
+    def _abandon(self, ticket: _Ticket, timed_out: bool = False) -> bool:
+        # Take a waiting ticket out of the queue; False if it was granted in the meantime
+        with self._lock:
+            if ticket.granted.is_set():
+                return False
+            self._remove(ticket)
+            if timed_out:
+                self._stats["timeouts"] += 1
+            return True
+
+    # The helpers below must be called with the lock held
+
+    def _grant(self, ticket: _Ticket) -> None:
+        wait = time.time() - ticket.enqueued_at
+        self._in_flight += 1
+        self._stats["admitted"] += 1
+        self._stats["wait_seconds_total"] += wait
+        self._stats["max_wait_seconds"] = max(self._stats["max_wait_seconds"], wait)
+        tracer.record("ollama.queue_wait", wait, priority=ticket.priority)
+        ticket.wake()
+
+    def _enqueue(self, ticket: _Ticket) -> None:
+        sessions = self._queues[ticket.priority]
+        sessions.setdefault(ticket.session_id, deque()).append(ticket)
+        self._queued += 1
+        self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], self._queued)
+
+    def _remove(self, ticket: _Ticket) -> None:
+        sessions = self._queues[ticket.priority]
+        waiting = sessions.get(ticket.session_id)
+        if waiting and ticket in waiting:
+            waiting.remove(ticket)
+            self._queued -= 1
+            if not waiting:
+                del sessions[ticket.session_id]
+
+    def _pop_newest(self, priority: int):
+        # Shed the most recently queued request of the given priority
+        sessions = self._queues[priority]
+        newest = None
+        for waiting in sessions.values():
+            if newest is None or waiting[-1].enqueued_at > newest.enqueued_at:
+                newest = waiting[-1]
+        if newest is None:
+            return None
+        self._remove(newest)
+        newest.shed = True
+        self._stats["shed"] += 1
+        return newest
+
+    def _dispatch(self) -> None:
+        while self._in_flight < self.max_concurrency and self._queued:
+            for priority in (PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND):
+                sessions = self._queues[priority]
+                if sessions:
+                    session_id, waiting = next(iter(sessions.items()))
+                    ticket = waiting.popleft()
+                    self._queued -= 1
+                    # Move the session to the back so the others get the next slot
+                    del sessions[session_id]
+                    if waiting:
+                        sessions[session_id] = waiting
+                    self._grant(ticket)
+                    break
+
+
+# Shared by every session in the process
+scheduler = OllamaScheduler()
+metrics.register("ollama_scheduler", scheduler.get_metrics)
+
+
+class PrefixReuseTracker:
+    """
+    Measures how much of each prompt Ollama can take from its KV cache.
+    
+    Ollama reuses the longest common prefix between a request and the previous
+    one it evaluated for the same model, so every request sent is compared with
+    the previous prompt for its model. The prompt evaluation counts Ollama
+    reports at the end of a generation are accumulated as well.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_prompt: Dict[str, str] = {}
+        self._stats = {
+            "requests": 0,
+            "prompt_tokens": 0,
+            "reused_tokens": 0,
+            "ollama_prompt_eval_count": 0,
+            "ollama_prompt_eval_seconds": 0.0
+        }
+    
+    def record(self, payload: dict) -> int:
+        """
+        Record a request about to be sent.
+        
+        Args:
+            payload: The JSON body for the generate endpoint
+            
+        Returns:
+            int: Estimated prompt tokens shared with the previous request
+        """
+        model, prompt = payload.get("model", ""), payload.get("prompt", "")
+        with self._lock:
+            previous = self._last_prompt.get(model, "")
+            self._last_prompt[model] = prompt
+        
+        shared = 0
+        for a, b in zip(previous, prompt):
+            if a != b:
+                break
+            shared += 1
+        reused_tokens = count_tokens(prompt[:shared])
+        prompt_tokens = count_tokens(prompt)
+        
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["prompt_tokens"] += prompt_tokens
+            self._stats["reused_tokens"] += reused_tokens
+        return reused_tokens
+    
+    def record_eval(self, data: dict) -> None:
+        """Record the prompt evaluation figures of a finished Ollama response"""
+        if "prompt_eval_count" not in data:
+            return
+        with self._lock:
+            self._stats["ollama_prompt_eval_count"] += data.get("prompt_eval_count", 0)
+            self._stats["ollama_prompt_eval_seconds"] += data.get("prompt_eval_duration", 0) / 1e9
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["prefix_reuse_ratio"] = stats["reused_tokens"] / stats["prompt_tokens"] if stats["prompt_tokens"] else 0.0
+        return stats
+
+
+prefix_tracker = PrefixReuseTracker()
+metrics.register("prompt_prefix", prefix_tracker.get_metrics)
+
+def record_response_stats(data: dict, route: str) -> None:
+    """Feed the final Ollama response of a request to the prefix, latency and throughput metrics"""
+    prefix_tracker.record_eval(data)
+    tracer.record_ollama(data, route)
+    if data.get("eval_duration"):
+        metrics.mark("ollama_tokens", data.get("eval_count", 0), data["eval_duration"] / 1e9)
 
 # Enhanced system instructions for language learning
 INSTRUCTION_TEMPLATES = [
@@ -47,80 +396,662 @@ VERB_TENSES = [
     "future with going to", "present perfect continuous"
 ]
 
-def get_ai_response(prompt: str) -> str:
+# Appended to the prompt when the model answers too briefly
+RETRY_SUFFIX = "\n\nPlease provide a detailed response that directly addresses what the user just said and ends with a question."
+
+# Tokens to reserve in the context window for the longest filled instruction template (and a retry)
+INSTRUCTION_TOKEN_RESERVE = max(
+    count_tokens(template.format(tense=max(VERB_TENSES, key=len), topic=max(VOCAB_TOPICS, key=len)))
+    for template in INSTRUCTION_TEMPLATES
+) + count_tokens(RETRY_SUFFIX) + 2
+
+# Model routes: which model, options and latency budget each task uses (MODEL_ROUTES in config.py)
+ROUTE_CONVERSATION = "conversation"
+ROUTE_FOLLOW_UP = "follow_up"
+ROUTE_DEFINITION = "definition"
+ROUTE_SUMMARY = "summary"
+
+def get_route(route: str) -> Dict[str, Any]:
+    """
+    Return the model, generation options and latency budget for a task.
+    
+    Args:
+        route: One of the ROUTE_* names (unknown names use the conversation route)
+        
+    Returns:
+        Dict with "model" (may be None when the task has no model), "options"
+        and "latency_budget" (seconds, or None for no limit)
+    """
+    settings = MODEL_ROUTES.get(route) or MODEL_ROUTES[ROUTE_CONVERSATION]
+    return {
+        "model": settings.get("model"),
+        "options": dict(settings.get("options") or {}),
+        "latency_budget": settings.get("latency_budget")
+    }
+
+def route_enabled(route: str) -> bool:
+    """Check whether a model is configured for a task"""
+    return bool(get_route(route)["model"])
+
+def request_timeout(latency_budget: Optional[float]):
+    """requests timeout for a latency budget (connect, read)"""
+    return (CONNECT_TIMEOUT, latency_budget) if latency_budget else None
+
+def client_timeout(latency_budget: Optional[float]) -> aiohttp.ClientTimeout:
+    """aiohttp timeout for a latency budget"""
+    return aiohttp.ClientTimeout(total=None, sock_connect=CONNECT_TIMEOUT, sock_read=latency_budget)
+
+def build_generate_request(prompt: str, route: str, options: dict = None, model: str = None) -> dict:
+    """
+    Build the Ollama request body for a plain completion on a route.
+    
+    Raises:
+        ValueError: If the route has no model and none is given
+    """
+    settings = get_route(route)
+    model = model or settings["model"]
+    if not model:
+        raise ValueError(f"No model configured for route '{route}'")
+    
+    request_options = {"num_ctx": OLLAMA_NUM_CTX}
+    request_options.update(settings["options"])
+    request_options.update(options or {})
+    return {
+        "model": model,
+        "prompt": prompt,
+        "stream": False,
+        "keep_alive": OLLAMA_KEEP_ALIVE,
+        "options": request_options
+    }
+
+def generate_text(
+    prompt: str,
+    route: str,
+    options: dict = None,
+    session_id: str = "default",
+    priority: int = PRIORITY_BACKGROUND,
+    model: str = None
+) -> str:
+    """
+    Run a plain completion without instruction templates or conversational fix-ups.
+    
+    Used for auxiliary tasks such as summaries. The route picks the model and
+    options; its latency budget limits both the wait in the scheduler queue and
+    the wait for Ollama. Request errors (including SchedulerOverloaded and
+    timeouts) are raised so the caller can decide how to degrade.
+    
+    Args:
+        prompt: The full prompt to send
+        route: Task route (ROUTE_SUMMARY, ROUTE_FOLLOW_UP, ...)
+        options: Extra generation options merged over the route options
+        session_id: Session the request is made for
+        priority: Scheduler priority (background by default)
+        model: Overrides the route model
+        
+    Returns:
+        The generated text, stripped
+    """
+    payload = build_generate_request(prompt, route, options, model)
+    latency_budget = get_route(route)["latency_budget"]
+    
+    with scheduler.slot(session_id, priority, timeout=latency_budget):
+        prefix_tracker.record(payload)
+        response = requests.post(OLLAMA_API_URL, json=payload, timeout=request_timeout(latency_budget))
+    response.raise_for_status()
+    data = response.json()
+    record_response_stats(data, route)
+    return data.get("response", "").strip()
+
+def warm_up_model(model: str = OLLAMA_MODEL, keep_alive=OLLAMA_KEEP_ALIVE) -> float:
+    """
+    Load a model into Ollama's memory without generating anything.
+    
+    An empty prompt makes Ollama load the model and keep it for `keep_alive`.
+    The context size matches the one used for replies so the model is not
+    reloaded on the first real turn. Errors are raised.
+    
+    Args:
+        model: The Ollama model to load
+        keep_alive: How long Ollama keeps the model loaded afterwards
+        
+    Returns:
+        float: Seconds the load took
+    """
+    start = time.time()
+    with scheduler.slot("warmup", PRIORITY_BACKGROUND):
+        response = requests.post(OLLAMA_API_URL, json={
+            "model": model,
+            "prompt": "",
+            "stream": False,
+            "keep_alive": keep_alive,
+            "options": {"num_ctx": OLLAMA_NUM_CTX}
+        }, timeout=request_timeout(OLLAMA_WARMUP_TIMEOUT))
+    response.raise_for_status()
+    return time.time() - start
+
+def list_loaded_models(timeout: float = 5) -> list:
+    """
+    Return the models Ollama currently has in memory (the /api/ps endpoint).
+    
+    Errors are raised.
+    """
+    response = requests.get(OLLAMA_BASE_URL + "/api/ps", timeout=timeout)
+    response.raise_for_status()
+    return response.json().get("models", [])
+
+# Generation parameters that make responses more conversational and educational
+CONVERSATION_OPTIONS = {
+    "temperature": 0.7,  # Slightly lower temperature for more coherent responses
+    "top_p": 0.9,        # Nucleus sampling for more diverse text
+    "top_k": 40,         # Consider more token options
+    "num_predict": OLLAMA_NUM_PREDICT,  # Allow for longer responses
+    "num_ctx": OLLAMA_NUM_CTX,  # Context window the history budget is sized for
+    "stop": ["User:"]    # Stop generating when the user would speak next
+}
+
+# Appended when a substantial response does not end with a question
+FOLLOW_UP_QUESTIONS = [
+    "What do you think about that?",
+    "How does that sound to you?",
+    "Would you like to know more about this topic?",
+    "Have you had any experiences with this?",
+    "How would you approach this situation?",
+    "Would you agree with that perspective?",
+    "Does that make sense to you?",
+    "What else would you like to discuss?"
+]
+
+def select_instruction_template() -> str:
+    """
+    Randomly select and fill an instruction template to vary the language focus.
+    
+    Returns:
+        The filled instruction template
+    """
+    template = random.choice(INSTRUCTION_TEMPLATES)
+    
+    # Fill in the template with appropriate values
+    if "{tense}" in template:
+        return template.format(tense=random.choice(VERB_TENSES))
+    elif "{topic}" in template:
+        return template.format(topic=random.choice(VOCAB_TOPICS))
+    return template
+
+def build_conversation_request(prompt: str, stream: bool = False, template: str = None) -> dict:
+    """
+    Build the Ollama request body for a conversational reply.
+    
+    Args:
+        prompt: The user prompt with conversation history
+        stream: Whether Ollama should stream the response
+        template: Instruction template placed before the prompt (a random one if
+            None, none if empty because the prompt already contains it)
+        
+    Returns:
+        The JSON payload for the generate endpoint
+    """
+    # Combine the instruction template with the user prompt
+    if template is None:
+        template = select_instruction_template()
+    enhanced_prompt = f"{template}\n\n{prompt}" if template else prompt
+    route = get_route(ROUTE_CONVERSATION)
+    options = dict(CONVERSATION_OPTIONS)
+    options.update(route["options"])
+    return {
+        "model": route["model"] or OLLAMA_MODEL,
+        "prompt": enhanced_prompt,
+        "stream": stream,
+        "keep_alive": OLLAMA_KEEP_ALIVE,
+        "options": options
+    }
+
+def needs_follow_up(ai_response: str) -> bool:
+    """Check whether a response fails to end with a question"""
+    return not any(ai_response.strip().endswith(c) for c in ["?", "?"])
+
+# Speaker markers the model sometimes writes into its reply
+REPLY_MARKERS = ("AI:", "User:")
+
+def clean_reply(text: str) -> str:
+    """Remove the speaker markers from a whole reply"""
+    for marker in REPLY_MARKERS:
+        text = text.replace(marker, "")
+    return text.strip()
+
+def _marker_start_length(text: str) -> int:
+    # Length of the longest end of text that could be the start of a marker
+    for length in range(min(len(text), max(map(len, REPLY_MARKERS)) - 1), 0, -1):
+        if any(marker.startswith(text[-length:]) for marker in REPLY_MARKERS):
+            return length
+    return 0
+
+class ReplyStreamCleaner:
+    """
+    Applies clean_reply to a streamed reply, chunk by chunk.
+    
+    A marker can arrive split across chunks ("A" then "I: "), so the end of a
+    chunk that could start one is held back until the next chunk, or until
+    finish().
+    """
+    
+    def __init__(self):
+        self._pending = ""
+        self._started = False
+    
+    def feed(self, chunk: str) -> str:
+        """Clean a chunk; returns the text that can be shown now"""
+        text = self._pending + chunk
+        for marker in REPLY_MARKERS:
+            text = text.replace(marker, "")
+        held = _marker_start_length(text)
+        self._pending = text[len(text) - held:] if held else ""
+        return self._emit(text[:len(text) - held])
+    
+    def finish(self) -> str:
+        """The text still held back once the stream has ended"""
+        text, self._pending = self._pending, ""
+        return self._emit(text)
+    
+    def _emit(self, text: str) -> str:
+        # Leading whitespace of the reply is dropped, as clean_reply does
+        if not self._started:
+            text = text.lstrip()
+            self._started = bool(text)
+        return text
+
+FOLLOW_UP_PROMPT = """An English tutor just said this to a learner:
+"{reply}"
+
+Write one short, friendly question that invites the learner to keep talking about it.
+Reply with the question only."""
+
+DEFINITION_PROMPT = """Explain the meaning of the English {kind} "{word}" to a language learner
+in one short, simple sentence. Reply with the definition only."""
+
+def _follow_up_prompt(ai_response: str) -> str:
+    return FOLLOW_UP_PROMPT.format(reply=ai_response.strip()[-800:])
+
+def _clean_follow_up(text: str) -> str:
+    # Keep the first line if it is a question; otherwise use a canned question
+    lines = [line.strip().strip('"') for line in text.strip().splitlines() if line.strip()]
+    question = lines[0] if lines else ""
+    if needs_follow_up(question):
+        return random.choice(FOLLOW_UP_QUESTIONS)
+    return question
+
+def generate_follow_up(ai_response: str, session_id: str = "default", priority: int = PRIORITY_INTERACTIVE) -> str:
+    """
+    Write a follow-up question for a reply that does not end with one.
+    
+    Uses the quick follow-up route. A canned question is used when the route has
+    no model, or when the request fails or exceeds its latency budget.
+    
+    Args:
+        ai_response: The reply the question follows
+        session_id: Session the request is made for
+        priority: Scheduler priority
+        
+    Returns:
+        The question
+    """
+    if not route_enabled(ROUTE_FOLLOW_UP):
+        return random.choice(FOLLOW_UP_QUESTIONS)
+    try:
+        text = generate_text(_follow_up_prompt(ai_response), ROUTE_FOLLOW_UP, session_id=session_id, priority=priority)
+    except Exception as e:
+        print(f"Error generating follow-up question: {e}")
+        return random.choice(FOLLOW_UP_QUESTIONS)
+    return _clean_follow_up(text)
+
+def define_word(word: str, kind: str = "word") -> Optional[str]:
+    """
+    Get a short learner-friendly definition from the definition route.
+    
+    Args:
+        word: Word or expression to define
+        kind: What it is ("word", "idiom", "phrasal verb")
+        
+    Returns:
+        The definition, or None if the route has no model or the request fails
+    """
+    if not route_enabled(ROUTE_DEFINITION):
+        return None
+    try:
+        definition = generate_text(DEFINITION_PROMPT.format(kind=kind, word=word), ROUTE_DEFINITION, session_id="vocabulary")
+    except Exception as e:
+        print(f"Error defining '{word}': {e}")
+        return None
+    return definition.splitlines()[0].strip() if definition else None
+
+def describe_request_error(error: Exception) -> str:
+    """
+    Turn an exception raised while talking to Ollama into a message for the learner.
+    
+    Args:
+        error: The exception
+        
+    Returns:
+        A bracketed error message
+    """
+    if isinstance(error, SchedulerOverloaded):
+        return "[Error: The AI is busy with other learners right now. Please try again in a moment.]"
+    if isinstance(error, (requests.exceptions.ConnectionError, aiohttp.ClientConnectionError)):
+        return "[Error: Connection to Ollama failed. Make sure Ollama is running on your machine and the model is downloaded.]"
+    if isinstance(error, (requests.exceptions.RequestException, aiohttp.ClientError)):
+        return f"[Error: Request to Ollama failed: {error}]"
+    return f"[Error: {error}]"
+
+def get_ai_response(
+    prompt: str,
+    retries: int = 1,
+    session_id: str = "default",
+    priority: int = PRIORITY_INTERACTIVE
+) -> str:
     """
     Get a response from the Ollama API with improved parameters for better language learning.
     
     Args:
         prompt: The user prompt with conversation history
+        retries: How many times a too-short answer may be regenerated
+        session_id: Session the request is made for (used for fair scheduling)
+        priority: Scheduler priority
         
     Returns:
         The AI response as a string
     """
     try:
-        # Start time to calculate response time
-        start_time = time.time()
-        
-        # Randomly select an instruction template to vary the language focus
-        template = random.choice(INSTRUCTION_TEMPLATES)
-        
-        # Fill in the template with appropriate values
-        if "{tense}" in template:
-            filled_template = template.format(tense=random.choice(VERB_TENSES))
-        elif "{topic}" in template:
-            filled_template = template.format(topic=random.choice(VOCAB_TOPICS))
-        else:
-            filled_template = template
-            
-        # Combine the instruction template with the user prompt
-        enhanced_prompt = filled_template + "\n\n" + prompt
-        
         # Create a more complete request with parameters to guide the conversation
-        response = requests.post(OLLAMA_API_URL, json={
-            "model": OLLAMA_MODEL,
-            "prompt": enhanced_prompt,
-            "stream": False,
-            # Add parameters to make responses more conversational and educational
-            "options": {
-                "temperature": 0.7,  # Slightly lower temperature for more coherent responses
-                "top_p": 0.9,        # Nucleus sampling for more diverse text
-                "top_k": 40,         # Consider more token options
-                "num_predict": 350,  # Allow for longer responses
-                "stop": ["User:"]    # Stop generating when the user would speak next
-            }
-        })
+        payload = build_conversation_request(prompt)
+        latency_budget = get_route(ROUTE_CONVERSATION)["latency_budget"]
+        with scheduler.slot(session_id, priority):
+            prefix_tracker.record(payload)
+            response = requests.post(OLLAMA_API_URL, json=payload, timeout=request_timeout(latency_budget))
         
         response.raise_for_status()
         data = response.json()
+        record_response_stats(data, ROUTE_CONVERSATION)
         ai_response = data.get("response", "[No response from model]")
         
-        # Clean up any trailing conversation markers the model might add
-        ai_response = ai_response.replace("AI:", "").strip()
+        # Clean up any conversation markers the model might add
+        ai_response = clean_reply(ai_response)
         
         # Ensure the response has a question at the end to encourage conversation
-        if not any(ai_response.strip().endswith(c) for c in ["?", "?"]):
+        if needs_follow_up(ai_response):
             # Check if the response is too short
-            if len(ai_response.split()) < 15:
-                retry_prompt = prompt + "\n\nPlease provide a detailed response that directly addresses what the user just said and ends with a question."
-                return get_ai_response(retry_prompt)
+            if len(ai_response.split()) < 15 and retries > 0:
+                retry_prompt = prompt + RETRY_SUFFIX
+                return get_ai_response(retry_prompt, retries - 1, session_id, priority)
             
             # If not interrogative but substantial response, add a follow-up question based on content
-            follow_up_questions = [
-                "What do you think about that?",
-                "How does that sound to you?",
-                "Would you like to know more about this topic?",
-                "Have you had any experiences with this?",
-                "How would you approach this situation?",
-                "Would you agree with that perspective?",
-                "Does that make sense to you?",
-                "What else would you like to discuss?"
-            ]
-            ai_response += "\n\n" + random.choice(follow_up_questions)
+            ai_response += "\n\n" + generate_follow_up(ai_response, session_id, priority)
             
         return ai_response
-    except requests.exceptions.ConnectionError:
-        return "[Error: Connection to Ollama failed. Make sure Ollama is running on your machine and the model is downloaded.]"
-    except requests.exceptions.RequestException as e:
-        return f"[Error: Request to Ollama failed: {e}]"
     except Exception as e:
-        return f"[Error: {e}]"
\ No newline at end of file
+        return describe_request_error(e)
+
+class GenerationHandle:
+    """
+    Lets another thread stop a streamed generation.
+    
+    Cancelling closes the HTTP stream, which makes Ollama stop generating, and
+    the scheduler slot is released as soon as the streaming loop exits.
+    """
+    
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._response = None
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+    
+    def cancel(self) -> None:
+        """Stop the generation; safe to call more than once and from any thread"""
+        with self._lock:
+            self._cancelled.set()
+            response = self._response
+            self._response = None
+        if response is not None:
+            response.close()
+    
+    def attach(self, response) -> bool:
+        """
+        Register the open HTTP response so cancel() can close it.
+        
+        Returns:
+            bool: False if the handle was already cancelled (the caller should stop)
+        """
+        with self._lock:
+            if self.cancelled:
+                return False
+            self._response = response
+            return True
+    
+    def detach(self) -> None:
+        with self._lock:
+            self._response = None
+
+
+def stream_ai_response(
+    prompt: str,
+    session_id: str = "default",
+    priority: int = PRIORITY_INTERACTIVE,
+    handle: Optional[GenerationHandle] = None,
+    template: str = None
+) -> Iterator[str]:
+    """
+    Stream a conversational response from the Ollama API chunk by chunk.
+    
+    Uses the same templates and options as get_ai_response. Short answers are not
+    regenerated (the text is already shown); a follow-up question is streamed at
+    the end instead when the reply does not end with one.
+    
+    Args:
+        prompt: The user prompt with conversation history
+        session_id: Session the request is made for (used for fair scheduling)
+        priority: Scheduler priority
+        handle: Optional GenerationHandle to stop the generation early; nothing
+            more is yielded once it is cancelled
+        template: Instruction template (see build_conversation_request)
+        
+    Yields:
+        Pieces of the response text (an error message if the request fails)
+    """
+    handle = handle or GenerationHandle()
+    full_response = ""
+    try:
+        with scheduler.slot(session_id, priority):
+            if handle.cancelled:
+                return
+            payload = build_conversation_request(prompt, stream=True, template=template)
+            latency_budget = get_route(ROUTE_CONVERSATION)["latency_budget"]
+            prefix_tracker.record(payload)
+            request_start = time.perf_counter()
+            with requests.post(OLLAMA_API_URL, json=payload, stream=True, timeout=request_timeout(latency_budget)) as response:
+                if not handle.attach(response):
+                    return
+                try:
+                    response.raise_for_status()
+                    cleaner = ReplyStreamCleaner()
+                    for line in response.iter_lines():
+                        if handle.cancelled:
+                            return
+                        if not line:
+                            continue
+                        data = json.loads(line)
+                        chunk = cleaner.feed(data.get("response", ""))
+                        if data.get("done"):
+                            chunk += cleaner.finish()
+                        if chunk:
+                            if not full_response:
+                                tracer.record("ollama.first_token", time.perf_counter() - request_start)
+                            full_response += chunk
+                            yield chunk
+                        if data.get("done"):
+                            record_response_stats(data, ROUTE_CONVERSATION)
+                            break
+                finally:
+                    handle.detach()
+    except Exception as e:
+        # Closing the stream from cancel() surfaces here as a read error
+        if not handle.cancelled:
+            yield describe_request_error(e)
+        return
+    
+    if handle.cancelled:
+        return
+    if not full_response.strip():
+        yield "[No response from model]"
+    elif needs_follow_up(full_response):
+        question = generate_follow_up(full_response, session_id, priority)
+        if not handle.cancelled:
+            yield "\n\n" + question
+
+# Async client: same templates, options and error messages, without a thread per request
+
+# One HTTP session per event loop so connections to Ollama are reused
+_http_sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+
+def _get_http_session() -> aiohttp.ClientSession:
+    loop = asyncio.get_running_loop()
+    session = _http_sessions.get(loop)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=None, sock_connect=CONNECT_TIMEOUT))
+        _http_sessions[loop] = session
+    return session
+
+async def aclose_http_session() -> None:
+    """Close the HTTP session used by the async client on the running event loop"""
+    session = _http_sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
+
+async def agenerate_text(
+    prompt: str,
+    route: str,
+    options: dict = None,
+    session_id: str = "default",
+    priority: int = PRIORITY_BACKGROUND,
+    model: str = None
+) -> str:
+    """Asyncio version of generate_text; errors are raised"""
+    payload = build_generate_request(prompt, route, options, model)
+    latency_budget = get_route(route)["latency_budget"]
+    
+    async with scheduler.aslot(session_id, priority, timeout=latency_budget):
+        prefix_tracker.record(payload)
+        async with _get_http_session().post(OLLAMA_API_URL, json=payload, timeout=client_timeout(latency_budget)) as response:
+            response.raise_for_status()
+            data = await response.json(content_type=None)
+    record_response_stats(data, route)
+    return data.get("response", "").strip()
+
+async def agenerate_follow_up(ai_response: str, session_id: str = "default", priority: int = PRIORITY_INTERACTIVE) -> str:
+    """Asyncio version of generate_follow_up"""
+    if not route_enabled(ROUTE_FOLLOW_UP):
+        return random.choice(FOLLOW_UP_QUESTIONS)
+    try:
+        text = await agenerate_text(_follow_up_prompt(ai_response), ROUTE_FOLLOW_UP, session_id=session_id, priority=priority)
+    except Exception as e:
+        print(f"Error generating follow-up question: {e}")
+        return random.choice(FOLLOW_UP_QUESTIONS)
+    return _clean_follow_up(text)
+
+async def aget_ai_response(
+    prompt: str,
+    retries: int = 1,
+    session_id: str = "default",
+    priority: int = PRIORITY_INTERACTIVE
+) -> str:
+    """
+    Asyncio version of get_ai_response.
+    
+    Cancelling the calling task closes the connection, which makes Ollama stop
+    generating and frees the scheduler slot.
+    
+    Args:
+        prompt: The user prompt with conversation history
+        retries: How many times a too-short answer may be regenerated
+        session_id: Session the request is made for (used for fair scheduling)
+        priority: Scheduler priority
+        
+    Returns:
+        The AI response as a string
+    """
+    try:
+        payload = build_conversation_request(prompt)
+        latency_budget = get_route(ROUTE_CONVERSATION)["latency_budget"]
+        async with scheduler.aslot(session_id, priority):
+            prefix_tracker.record(payload)
+            async with _get_http_session().post(OLLAMA_API_URL, json=payload, timeout=client_timeout(latency_budget)) as response:
+                response.raise_for_status()
+                data = await response.json(content_type=None)
+        record_response_stats(data, ROUTE_CONVERSATION)
+        
+        ai_response = clean_reply(data.get("response", "[No response from model]"))
+        
+        if needs_follow_up(ai_response):
+            if len(ai_response.split()) < 15 and retries > 0:
+                return await aget_ai_response(prompt + RETRY_SUFFIX, retries - 1, session_id, priority)
+            ai_response += "\n\n" + await agenerate_follow_up(ai_response, session_id, priority)
+        
+        return ai_response
+    except Exception as e:
+        return describe_request_error(e)
+
+async def astream_ai_response(
+    prompt: str,
+    session_id: str = "default",
+    priority: int = PRIORITY_INTERACTIVE,
+    template: str = None
+) -> AsyncIterator[str]:
+    """
+    Asyncio version of stream_ai_response.
+    
+    Closing the iterator or cancelling the consuming task closes the Ollama
+    stream and frees the scheduler slot.
+    
+    Args:
+        prompt: The user prompt with conversation history
+        session_id: Session the request is made for (used for fair scheduling)
+        priority: Scheduler priority
+        template: Instruction template (see build_conversation_request)
+        
+    Yields:
+        Pieces of the response text (an error message if the request fails)
+    """
+    full_response = ""
+    payload = build_conversation_request(prompt, stream=True, template=template)
+    latency_budget = get_route(ROUTE_CONVERSATION)["latency_budget"]
+    try:
+        async with scheduler.aslot(session_id, priority):
+            prefix_tracker.record(payload)
+            request_start = time.perf_counter()
+            async with _get_http_session().post(OLLAMA_API_URL, json=payload, timeout=client_timeout(latency_budget)) as response:
+                response.raise_for_status()
+                cleaner = ReplyStreamCleaner()
+                async for line in response.content:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    chunk = cleaner.feed(data.get("response", ""))
+                    if data.get("done"):
+                        chunk += cleaner.finish()
+                    if chunk:
+                        if not full_response:
+                            tracer.record("ollama.first_token", time.perf_counter() - request_start)
+                        full_response += chunk
+                        yield chunk
+                    if data.get("done"):
+                        record_response_stats(data, ROUTE_CONVERSATION)
+                        break
+    except Exception as e:
+        yield describe_request_error(e)
+        return
+    
+    if not full_response.strip():
+        yield "[No response from model]"
+    elif needs_follow_up(full_response):
+        yield "\n\n" + await agenerate_follow_up(full_response, session_id, priority)
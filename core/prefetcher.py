@@ -0,0 +1,116 @@
+import threading
+from typing import Any, Dict
+
+import requests
+
+from config import ENABLE_PREFETCH, PREFETCH_DELAY
+from core.metrics import metrics
+from core.ollama_client import (
+    GenerationHandle, SchedulerOverloaded, OLLAMA_API_URL, PRIORITY_BACKGROUND, ROUTE_CONVERSATION,
+    build_conversation_request, get_route, prefix_tracker, request_timeout, scheduler
+)
+
+class StarterPrefetcher:
+    """
+    Uses idle time to prepare the reply to a suggested starter.
+
+    Once a starter has been on screen for `delay` seconds and Ollama is idle,
+    the prompt the learner's answer will start with (instruction template,
+    system prompt, history and the starter) is sent with a single predicted
+    token. Ollama keeps the evaluated prefix in its KV cache, so the real turn
+    only has to evaluate the learner's message. The session pins the template
+    so both requests share the same prefix.
+
+    A newer starter or a reset cancels the prefetch. A learner message does not:
+    the turn reuses the prefix being evaluated.
+    """
+
+    def __init__(self, delay: float = PREFETCH_DELAY):
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Any] = {}  # session_id -> (timer, handle)
+        self._stats = {"scheduled": 0, "completed": 0, "skipped_busy": 0, "cancelled": 0, "failed": 0}
+
+    def schedule(self, session_id: str, prompt_prefix: str, template: str) -> None:
+        """
+        Prefetch a prompt prefix for a session after the idle delay.
+
+        Args:
+            session_id: Session the starter was suggested in
+            prompt_prefix: Prompt up to (not including) the learner's answer
+            template: Instruction template pinned for the session's next reply
+        """
+        self.cancel(session_id)
+        handle = GenerationHandle()
+        timer = threading.Timer(self.delay, self._run, args=(session_id, prompt_prefix, template, handle))
+        timer.daemon = True
+        with self._lock:
+            self._pending[session_id] = (timer, handle)
+            self._stats["scheduled"] += 1
+        timer.start()
+
+    def cancel(self, session_id: str) -> None:
+        """Drop the pending or running prefetch of a session"""
+        with self._lock:
+            pending = self._pending.pop(session_id, None)
+            if pending:
+                self._stats["cancelled"] += 1
+        if pending:
+            timer, handle = pending
+            timer.cancel()
+            handle.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, pending=len(self._pending))
+
+    def _run(self, session_id: str, prompt_prefix: str, template: str, handle: GenerationHandle) -> None:
+        payload = build_conversation_request(prompt_prefix, stream=True, template=template)
+        payload["options"]["num_predict"] = 1
+
+        if scheduler.get_metrics()["in_flight"] or scheduler.queue_depth():
+            outcome = "skipped_busy"
+        else:
+            outcome = self._prefill(session_id, payload, handle)
+
+        with self._lock:
+            if self._pending.get(session_id, (None, None))[1] is handle:
+                del self._pending[session_id]
+            if outcome:
+                self._stats[outcome] += 1
+
+    def _prefill(self, session_id: str, payload: Dict[str, Any], handle: GenerationHandle):
+        # Returns the outcome to count, or None if the prefetch was cancelled
+        try:
+            # Only use idle time: give up at once if anything else holds or awaits Ollama
+            with scheduler.slot(session_id, PRIORITY_BACKGROUND, timeout=0):
+                if handle.cancelled:
+                    return None
+                prefix_tracker.record(payload)
+                latency_budget = get_route(ROUTE_CONVERSATION)["latency_budget"]
+                with requests.post(
+                    OLLAMA_API_URL, json=payload, stream=True, timeout=request_timeout(latency_budget)
+                ) as response:
+                    if not handle.attach(response):
+                        return None
+                    try:
+                        response.raise_for_status()
+                        for _ in response.iter_lines():
+                            if handle.cancelled:
+                                return None
+                    finally:
+                        handle.detach()
+        except SchedulerOverloaded:
+            return "skipped_busy"
+        except Exception as e:
+            if handle.cancelled:
+                return None
+            print(f"Error prefetching starter context: {e}")
+            return "failed"
+        return "completed"
+
+
+# Shared by every session of the process (None when prefetching is disabled)
+prefetcher = StarterPrefetcher() if ENABLE_PREFETCH else None
+if prefetcher:
+    metrics.register("prefetcher", prefetcher.get_stats)
@@ -0,0 +1,259 @@
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Operaciones del alineamiento
+MATCH = "match"
+SUBSTITUTION = "substitution"
+DELETION = "deletion"  # Palabra del texto original que no se pronunció
+INSERTION = "insertion"  # Palabra pronunciada que no estaba en el texto
+
+# Similitud mínima (0-1) para considerar una sustitución como casi acierto y no como otra palabra
+NEAR_MISS_SIMILARITY = 0.5
+
+# Grafías que suelen corresponder a los fonemas de PRONUNCIATION_CHALLENGES. Sin
+# diccionario fonético solo se detectan las consonantes con grafía inequívoca
+PHONEME_SPELLINGS = {
+    'θ': ['th'],
+    'ð': ['th'],
+    'ʃ': ['sh'],
+    'tʃ': ['ch', 'tch'],
+    'dʒ': ['j', 'dge'],
+    'ʒ': ['sure', 'sion'],
+    'ŋ': ['ng'],
+    'r': ['r'],
+    'h': ['h'],
+}
+
+# Palabras funcionales con "th" sonora; el resto de "th" se considera sorda
+VOICED_TH_WORDS = {
+    "the", "this", "that", "these", "those", "there", "their", "they", "them", "then",
+    "than", "though", "with", "other", "mother", "father", "brother", "weather", "together"
+}
+
+_WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+def normalize_words(text: str) -> List[str]:
+    """Minúsculas y sin puntuación, para comparar lo leído con lo reconocido"""
+    return _WORD.findall(text.lower())
+
+@lru_cache(maxsize=65536)
+def word_similarity(a: str, b: str) -> float:
+    """
+    Similitud entre dos palabras a nivel de caracteres (1 - distancia de
+    Levenshtein normalizada por la longitud de la palabra más larga)
+
+    Returns:
+        float: 1.0 si son iguales, 0.0 si no comparten nada
+    """
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    if len(a) < len(b):
+        a, b = b, a
+    # Programación dinámica con una sola fila
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        previous = current
+    return 1.0 - previous[-1] / len(a)
+
+def align_words(reference: List[str], hypothesis: List[str]) -> List[Tuple[str, Optional[str], Optional[str], float]]:
+    """
+    Alinea las palabras del texto original con las reconocidas (distancia de
+    edición a nivel de palabra con reconstrucción del camino)
+
+    Una sustitución cuesta 1 - similitud, así que una palabra casi bien
+    pronunciada se alinea con su original en vez de desplazar al resto. Los
+    extremos comunes se recortan antes de la tabla, que solo cubre la parte
+    que difiere.
+
+    Args:
+        reference: Palabras del texto que se debía leer
+        hypothesis: Palabras reconocidas
+
+    Returns:
+        list: Tuplas (operación, palabra original, palabra reconocida, similitud)
+              en orden de lectura; la palabra que falta en cada caso es None
+    """
+    # Prefijo y sufijo idénticos
+    start = 0
+    limit = min(len(reference), len(hypothesis))
+    while start < limit and reference[start] == hypothesis[start]:
+        start += 1
+    end = 0
+    while end < limit - start and reference[-1 - end] == hypothesis[-1 - end]:
+        end += 1
+
+    ref = reference[start:len(reference) - end]
+    hyp = hypothesis[start:len(hypothesis) - end]
+    rows, cols = len(ref), len(hyp)
+
+    # back[i][j]: 0 = diagonal, 1 = borrado (arriba), 2 = inserción (izquierda)
+    back = [bytearray(cols + 1) for _ in range(rows + 1)]
+    for j in range(1, cols + 1):
+        back[0][j] = 2
+    # Coste de sustitución de cada palabra original contra toda la hipótesis,
+    # calculado una vez por palabra distinta (los textos repiten mucho "the", "a"...)
+    substitution_costs = {}
+    previous = [float(j) for j in range(cols + 1)]
+    for i in range(1, rows + 1):
+        back_row = back[i]
+        back_row[0] = 1
+        current = [float(i)]
+        ref_word = ref[i - 1]
+        costs = substitution_costs.get(ref_word)
+        if costs is None:
+            costs = [1.0 - word_similarity(ref_word, word) for word in hyp]
+            substitution_costs[ref_word] = costs
+        for j in range(1, cols + 1):
+            diagonal = previous[j - 1] + costs[j - 1]
+            up = previous[j] + 1.0
+            left = current[j - 1] + 1.0
+            if diagonal <= up and diagonal <= left:
+                current.append(diagonal)
+            elif up <= left:
+                current.append(up)
+                back_row[j] = 1
+            else:
+                current.append(left)
+                back_row[j] = 2
+        previous = current
+
+    middle = []
+    i, j = rows, cols
+    while i > 0 or j > 0:
+        step = back[i][j]
+        if step == 0:
+            similarity = word_similarity(ref[i - 1], hyp[j - 1])
+            middle.append((MATCH if similarity == 1.0 else SUBSTITUTION, ref[i - 1], hyp[j - 1], similarity))
+            i -= 1
+            j -= 1
+        elif step == 1:
+            middle.append((DELETION, ref[i - 1], None, 0.0))
+            i -= 1
+        else:
+            middle.append((INSERTION, None, hyp[j - 1], 0.0))
+            j -= 1
+    middle.reverse()
+
+    head = [(MATCH, word, word, 1.0) for word in reference[:start]]
+    tail = [(MATCH, word, word, 1.0) for word in reference[len(reference) - end:]]
+    return head + middle + tail
+
+def word_phonemes(word: str) -> List[str]:
+    """Fonemas de PRONUNCIATION_CHALLENGES que probablemente contiene una palabra, según su grafía"""
+    phonemes = []
+    for phoneme, spellings in PHONEME_SPELLINGS.items():
+        if phoneme == 'h':
+            # La h solo suena al principio (house), no en th/sh/ch ni en hour/honest
+            if word.startswith("h") and not word.startswith(("hour", "honest", "honor")):
+                phonemes.append(phoneme)
+        elif phoneme in ('θ', 'ð'):
+            if "th" in word and (phoneme == 'ð') == (word in VOICED_TH_WORDS):
+                phonemes.append(phoneme)
+        elif phoneme == 'ŋ':
+            if re.search(r"ng(?!e)", word):
+                phonemes.append(phoneme)
+        elif any(spelling in word for spelling in spellings):
+            phonemes.append(phoneme)
+    return phonemes
+
+def missed_phonemes(original: str, spoken: Optional[str]) -> List[str]:
+    """
+    Fonemas de la palabra original cuya grafía no aparece en la reconocida
+    (p. ej. "think" reconocida como "sink" pierde la θ)
+    """
+    if not spoken:
+        return []
+    spoken_phonemes = set(word_phonemes(spoken))
+    return [phoneme for phoneme in word_phonemes(original) if phoneme not in spoken_phonemes]
+
+def score_pronunciation(original_text: str, spoken_text: str) -> Dict:
+    """
+    Compara el texto que se debía leer con el reconocido
+
+    Args:
+        original_text: Texto que se debía pronunciar
+        spoken_text: Texto reconocido del habla
+
+    Returns:
+        dict: accuracy (palabras exactas / total), score (0-100, con crédito
+              parcial por casi aciertos y penalización por palabras añadidas),
+              mispronounced, extra_words, correct_words, total_words,
+              alignment y challenges (pares (fonema, palabra) detectados)
+    """
+    original_words = normalize_words(original_text)
+    spoken_words = normalize_words(spoken_text)
+    alignment = align_words(original_words, spoken_words)
+
+    total_words = len(original_words)
+    correct_words = 0
+    similarity_sum = 0.0
+    mispronounced = []
+    extra_words = []
+    challenges = []
+
+    for operation, original, spoken, similarity in alignment:
+        if operation == MATCH:
+            correct_words += 1
+            similarity_sum += 1.0
+        elif operation == SUBSTITUTION:
+            mispronounced.append((original, spoken))
+            if similarity >= NEAR_MISS_SIMILARITY:
+                similarity_sum += similarity
+                challenges.extend((phoneme, original) for phoneme in missed_phonemes(original, spoken))
+        elif operation == DELETION:
+            mispronounced.append((original, "[omitido]"))
+        else:
+            extra_words.append(spoken)
+
+    accuracy = correct_words / total_words if total_words > 0 else 0
+    compared = total_words + len(extra_words)
+    score = similarity_sum / compared if compared > 0 else 0
+
+    return {
+        "accuracy": accuracy,
+        "score": int(score * 100),
+        "mispronounced": mispronounced,
+        "extra_words": extra_words,
+        "correct_words": correct_words,
+        "total_words": total_words,
+        "alignment": alignment,
+        "challenges": challenges
+    }
+
+def score_pronunciation_batch(recordings: Iterable[Tuple[str, str]]) -> List[Dict]:
+    """
+    Puntúa varias grabaciones; las similitudes entre palabras se calculan una
+    sola vez para todo el lote
+
+    Args:
+        recordings: Pares (texto original, texto reconocido)
+
+    Returns:
+        list: Un resultado de score_pronunciation por grabación, en el mismo orden
+    """
+    return [score_pronunciation(original, spoken) for original, spoken in recordings]
+
+def record_challenges(result: Dict, knowledge_base) -> int:
+    """
+    Registra en la base de conocimiento los fonemas fallados de un resultado
+
+    Args:
+        result: Resultado de score_pronunciation
+        knowledge_base: KnowledgeBase donde guardar los desafíos
+
+    Returns:
+        int: Número de desafíos registrados
+    """
+    for phoneme, word in result["challenges"]:
+        knowledge_base.add_pronunciation_challenge(phoneme, word)
+    return len(result["challenges"])
@@ -0,0 +1,187 @@
+import hashlib
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, List, Optional
+
+from config import (
+    RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL, RESPONSE_CACHE_SIMILARITY,
+    RESPONSE_CACHE_MAX_VARIANTS
+)
+
+_NON_WORD = re.compile(r"[^\w\s']+", re.UNICODE)
+_SPACES = re.compile(r"\s+")
+
+def normalize_message(text: str) -> str:
+    """Lowercase a message and drop punctuation and repeated spaces"""
+    return _SPACES.sub(" ", _NON_WORD.sub(" ", text.lower())).strip()
+
+def message_signature(normalized: str) -> FrozenSet[str]:
+    """
+    Character trigrams of a normalized message.
+
+    Trigrams tolerate typos, plurals and small rewordings, which is what
+    near-identical opening messages from different learners look like.
+    """
+    padded = f" {normalized} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+def similarity(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Jaccard similarity of two signatures"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class _CacheEntry:
+    __slots__ = ("context", "normalized", "signature", "variants", "created_at", "last_served", "hits")
+
+    def __init__(self, context: str, normalized: str, signature: FrozenSet[str]):
+        self.context = context
+        self.normalized = normalized
+        self.signature = signature
+        self.variants: List[str] = []
+        self.created_at = time.time()
+        self.last_served = -1
+        self.hits = 0
+
+
+class ResponseCache:
+    """
+    Reuses AI replies for messages that are nearly identical to earlier ones.
+
+    Entries are grouped by context (model, prompt template and instructions),
+    so a reply is only reused when the model would have been asked the same
+    thing. Inside a context, messages match when their trigram similarity
+    reaches `similarity_threshold`.
+
+    To keep replies varied, an entry is only served once it holds
+    `max_variants` different replies; until then lookups miss and the fresh
+    reply is added as another variant. Served variants rotate randomly, never
+    repeating the previous one. Entries expire after `ttl` seconds and the
+    least recently used are dropped beyond `max_entries`.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = RESPONSE_CACHE_SIZE,
+        ttl: float = RESPONSE_CACHE_TTL,
+        similarity_threshold: float = RESPONSE_CACHE_SIMILARITY,
+        max_variants: int = RESPONSE_CACHE_MAX_VARIANTS
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.max_variants = max(1, max_variants)
+        self._entries: "OrderedDict[int, _CacheEntry]" = OrderedDict()
+        self._by_context: Dict[str, List[_CacheEntry]] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    @staticmethod
+    def make_context(*parts: str) -> str:
+        """Build a compact context key from the parts that shape the reply"""
+        return hashlib.sha1("\x00".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, message: str, context: str) -> Optional[str]:
+        """
+        Look up a reply for a message.
+
+        Args:
+            message: The learner's (corrected) message
+            context: Key from make_context
+
+        Returns:
+            str: A cached reply, or None if there is no entry with enough variants
+        """
+        normalized = normalize_message(message)
+        with self._lock:
+            entry = self._find(normalized, context)
+            if entry is None or len(entry.variants) < self.max_variants:
+                self._stats["misses"] += 1
+                return None
+
+            choices = [i for i in range(len(entry.variants)) if i != entry.last_served] or [0]
+            entry.last_served = random.choice(choices)
+            entry.hits += 1
+            self._entries.move_to_end(id(entry))
+            self._stats["hits"] += 1
+            return entry.variants[entry.last_served]
+
+    def put(self, message: str, context: str, reply: str) -> None:
+        """
+        Store a freshly generated reply.
+
+        Args:
+            message: The learner's (corrected) message
+            context: Key from make_context
+            reply: The AI reply
+        """
+        normalized = normalize_message(message)
+        if not normalized or not reply:
+            return
+
+        with self._lock:
+            entry = self._find(normalized, context)
+            if entry is None:
+                entry = _CacheEntry(context, normalized, message_signature(normalized))
+                self._entries[id(entry)] = entry
+                self._by_context.setdefault(context, []).append(entry)
+                while len(self._entries) > self.max_entries:
+                    self._drop(next(iter(self._entries.values())))
+                    self._stats["evictions"] += 1
+            else:
+                self._entries.move_to_end(id(entry))
+
+            if reply not in entry.variants and len(entry.variants) < self.max_variants:
+                entry.variants.append(reply)
+                self._stats["stores"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_context.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0
+            }
+
+    def _find(self, normalized: str, context: str) -> Optional[_CacheEntry]:
+        candidates = self._by_context.get(context)
+        if not candidates:
+            return None
+
+        now = time.time()
+        signature = None
+        best, best_score = None, 0.0
+        for entry in list(candidates):
+            if now - entry.created_at > self.ttl:
+                self._drop(entry)
+                continue
+            if entry.normalized == normalized:
+                return entry
+            if signature is None:
+                signature = message_signature(normalized)
+            score = similarity(signature, entry.signature)
+            if score >= self.similarity_threshold and score > best_score:
+                best, best_score = entry, score
+        return best
+
+    def _drop(self, entry: _CacheEntry) -> None:
+        self._entries.pop(id(entry), None)
+        candidates = self._by_context.get(entry.context)
+        if candidates is not None:
+            candidates.remove(entry)
+            if not candidates:
+                del self._by_context[entry.context]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,245 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from config import (
+    DEFAULT_LEVEL, DEFAULT_GRAMMAR_FOCUS, ENABLE_HISTORY_SUMMARY,
+    MAX_SESSIONS, SESSION_IDLE_TIMEOUT, HISTORY_EVICTION_LOW_WATERMARK
+)
+from core.conversation_history import ConversationHistory
+from core.prefetcher import prefetcher
+from core.summarizer import ConversationSummarizer
+
+class LearnerProfile:
+    """What we know about the learner behind a session"""
+
+    def __init__(self, level: str = DEFAULT_LEVEL, grammar_focus: str = DEFAULT_GRAMMAR_FOCUS):
+        self.level = level
+        self.grammar_focus = grammar_focus
+        self.avoided_topics: List[str] = []
+
+    def avoid_topic(self, topic: str) -> None:
+        """Remember a topic the learner said they don't like"""
+        if topic and topic not in self.avoided_topics:
+            self.avoided_topics.append(topic)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "level": self.level,
+            "grammar_focus": self.grammar_focus,
+            "avoided_topics": list(self.avoided_topics)
+        }
+
+
+class SessionMetrics:
+    """Per-session counters for messages, corrections and AI response time"""
+
+    def __init__(self):
+        self.messages = 0
+        self.corrections = 0
+        self.ai_responses = 0
+        self.ai_response_time = 0.0
+
+    def record_turn(self, corrected: bool, response_seconds: float) -> None:
+        """
+        Record a finished turn.
+
+        Args:
+            corrected: Whether the learner's message needed corrections
+            response_seconds: Time spent waiting for the AI response
+        """
+        self.messages += 1
+        if corrected:
+            self.corrections += 1
+        self.ai_responses += 1
+        self.ai_response_time += response_seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "messages": self.messages,
+            "corrections": self.corrections,
+            "ai_responses": self.ai_responses,
+            "avg_ai_response_time": self.ai_response_time / self.ai_responses if self.ai_responses else 0.0
+        }
+
+
+class ConversationSession:
+    """
+    One learner's conversation: history, running summary, profile and metrics.
+
+    Sessions are independent, so a single process can hold many of them. The
+    `lock` serializes turns inside a session; different sessions never block
+    each other.
+    """
+
+    def __init__(self, history_budget: int, session_id: str = None, profile: LearnerProfile = None):
+        self.session_id = session_id or uuid.uuid4().hex
+        self.profile = profile or LearnerProfile()
+        self.metrics = SessionMetrics()
+        self.summarizer = ConversationSummarizer(session_id=self.session_id) if ENABLE_HISTORY_SUMMARY else None
+        self.history = ConversationHistory(
+            history_budget,
+            on_evict=self.summarizer.add_turns if self.summarizer else None,
+            low_watermark=HISTORY_EVICTION_LOW_WATERMARK
+        )
+        self.starter: Optional[str] = None  # Suggested starter the learner is about to answer
+        self.template: Optional[str] = None  # Instruction template pinned for the next reply
+        self.instruction_template: Optional[str] = None  # Fixed template in "session" mode
+        self.created_at = time.time()
+        self.last_active = self.created_at
+        self.lock = threading.RLock()
+
+    def touch(self) -> None:
+        """Mark the session as active now"""
+        self.last_active = time.time()
+
+    def get_summary(self) -> str:
+        """Return the running summary of turns no longer in the history"""
+        return self.summarizer.get_summary() if self.summarizer else ""
+
+    def reset(self) -> None:
+        """Start the conversation over, keeping the learner profile"""
+        if prefetcher:
+            prefetcher.cancel(self.session_id)
+        with self.lock:
+            self.history.clear()
+            self.starter = None
+            self.template = None
+            if self.summarizer:
+                self.summarizer.reset()
+            self.touch()
+
+    def close(self) -> None:
+        """Release background resources held by the session"""
+        if prefetcher:
+            prefetcher.cancel(self.session_id)
+        if self.summarizer:
+            self.summarizer.close()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "profile": self.profile.to_dict(),
+            "metrics": self.metrics.to_dict(),
+            "turns": len(self.history),
+            "history_tokens": self.history.total_tokens,
+            "created_at": self.created_at,
+            "last_active": self.last_active
+        }
+
+
+class SessionRegistry:
+    """
+    Holds the active sessions of the process.
+
+    Sessions idle for longer than `idle_timeout` seconds are evicted whenever the
+    registry is used (or when `evict_idle` is called). If `max_sessions` is
+    reached, the least recently used session makes room for the new one.
+    """
+
+    def __init__(
+        self,
+        history_budget: int,
+        idle_timeout: float = SESSION_IDLE_TIMEOUT,
+        max_sessions: int = MAX_SESSIONS
+    ):
+        self.history_budget = history_budget
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, ConversationSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, session_id: str = None, profile: LearnerProfile = None) -> ConversationSession:
+        """
+        Create and register a new session.
+
+        Args:
+            session_id: Optional identifier (a random one is generated otherwise)
+            profile: Optional learner profile
+
+        Returns:
+            ConversationSession: The new session
+        """
+        session = ConversationSession(self.history_budget, session_id, profile)
+        evicted = []
+        with self._lock:
+            evicted.extend(self._pop_idle(time.time()))
+            if session.session_id in self._sessions:
+                evicted.append(self._sessions.pop(session.session_id))
+            while len(self._sessions) >= self.max_sessions:
+                evicted.append(self._sessions.popitem(last=False)[1])
+            self._sessions[session.session_id] = session
+
+        for old_session in evicted:
+            old_session.close()
+        return session
+
+    def get(self, session_id: str) -> Optional[ConversationSession]:
+        """
+        Get an active session and mark it as used.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            ConversationSession or None if it does not exist or was evicted
+        """
+        with self._lock:
+            evicted = self._pop_idle(time.time())
+            session = self._sessions.get(session_id)
+            if session:
+                session.touch()
+                self._sessions.move_to_end(session_id)
+
+        for old_session in evicted:
+            old_session.close()
+        return session
+
+    def get_or_create(self, session_id: str) -> ConversationSession:
+        """Get a session by id, creating it if needed"""
+        return self.get(session_id) or self.create(session_id)
+
+    def remove(self, session_id: str) -> bool:
+        """
+        Close and remove a session.
+
+        Returns:
+            bool: True if the session existed
+        """
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session:
+            session.close()
+            return True
+        return False
+
+    def evict_idle(self) -> List[str]:
+        """
+        Remove sessions that have been idle longer than the timeout.
+
+        Returns:
+            List[str]: Identifiers of the evicted sessions
+        """
+        with self._lock:
+            evicted = self._pop_idle(time.time())
+        for session in evicted:
+            session.close()
+        return [session.session_id for session in evicted]
+
+    def list_sessions(self) -> List[ConversationSession]:
+        """Return the active sessions, least recently used first"""
+        with self._lock:
+            return list(self._sessions.values())
+
+    def _pop_idle(self, now: float) -> List[ConversationSession]:
+        idle_ids = [
+            session_id for session_id, session in self._sessions.items()
+            if now - session.last_active > self.idle_timeout
+        ]
+        return [self._sessions.pop(session_id) for session_id in idle_ids]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
@@ -4,6 +4,8 @@ import os
 import random
 from typing import Dict, List, Any
 
+from core.tracing import tracer
+
 class VocabularyItem:
     def __init__(
         self, 
@@ -150,7 +152,7 @@ class VocabularyManager:
         """Carga el vocabulario desde el archivo de almacenamiento"""
         try:
             if os.path.exists(self.storage_file):
-                with open(self.storage_file, "r", encoding="utf-8") as f:
+                with tracer.span("vocabulary.load"), open(self.storage_file, "r", encoding="utf-8") as f:
                     data = json.load(f)
                     
                 for item_data in data:
@@ -165,9 +167,10 @@ class VocabularyManager:
     def save_vocabulary(self) -> None:
         """Guarda el vocabulario en el archivo de almacenamiento"""
         try:
-            data = [item.to_dict() for item in self.vocabulary_items.values()]
-            with open(self.storage_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
+            with tracer.span("vocabulary.save", items=len(self.vocabulary_items)):
+                data = [item.to_dict() for item in self.vocabulary_items.values()]
+                with open(self.storage_file, "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=2)
         except Exception as e:
             print(f"Error al guardar vocabulario: {e}")
     
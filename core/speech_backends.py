@@ -0,0 +1,190 @@
+import os
+import threading
+from typing import List, Optional
+
+from config import (
+    SPEECH_RECOGNITION_BACKEND, SPEECH_RECOGNITION_LANGUAGE, SPEECH_WHISPER_MODEL, SPEECH_STUB_TRANSCRIPTS
+)
+
+
+class SpeechNotUnderstood(Exception):
+    """El audio no contenía palabras reconocibles"""
+
+
+class RecognitionServiceError(Exception):
+    """El motor de reconocimiento no está disponible o falló"""
+
+
+class RecognizerBackend:
+    """
+    Motor que convierte el audio capturado en texto.
+
+    Los motores que necesitan audio reciben el Recognizer de
+    speech_recognition y el AudioData capturado; los que no (needs_microphone
+    = False) se llaman sin abrir el micrófono.
+    """
+
+    name = "base"
+    needs_microphone = True
+    supports_partial = False  # Si conviene transcribir el audio parcial mientras se sigue hablando
+
+    def transcribe(self, recognizer, audio) -> str:
+        """
+        Transcribe una frase
+
+        Args:
+            recognizer: speech_recognition.Recognizer (None si needs_microphone es False)
+            audio: AudioData capturado (None si needs_microphone es False)
+
+        Returns:
+            str: Texto reconocido
+
+        Raises:
+            SpeechNotUnderstood: Si no se entendió nada
+            RecognitionServiceError: Si el motor falló o no está instalado
+        """
+        raise NotImplementedError
+
+
+class _SpeechRecognitionBackend(RecognizerBackend):
+    # Traduce las excepciones de speech_recognition a las del módulo
+
+    def transcribe(self, recognizer, audio) -> str:
+        import speech_recognition as sr
+        try:
+            text = self._recognize(recognizer, audio)
+        except sr.UnknownValueError:
+            raise SpeechNotUnderstood()
+        except sr.RequestError as e:
+            raise RecognitionServiceError(str(e))
+        except ImportError as e:
+            raise RecognitionServiceError(f"Falta una dependencia del motor '{self.name}': {e}")
+        text = (text or "").strip()
+        if not text:
+            raise SpeechNotUnderstood()
+        return text
+
+    def _recognize(self, recognizer, audio) -> str:
+        raise NotImplementedError
+
+
+class GoogleBackend(_SpeechRecognitionBackend):
+    """Servicio web de Google (necesita red; una petición por frase, sin resultados parciales)"""
+
+    name = "google"
+
+    def __init__(self, language: str = SPEECH_RECOGNITION_LANGUAGE):
+        self.language = language
+
+    def _recognize(self, recognizer, audio) -> str:
+        return recognizer.recognize_google(audio, language=self.language)
+
+
+class WhisperBackend(_SpeechRecognitionBackend):
+    """
+    Whisper ejecutado en local (paquete openai-whisper), sin red.
+
+    El modelo se carga una sola vez, en la primera frase, y se reutiliza para
+    las siguientes y para las transcripciones parciales (recognize_whisper
+    de speech_recognition lo volvería a cargar del disco en cada llamada).
+    """
+
+    name = "whisper"
+    supports_partial = True
+
+    def __init__(self, model: str = SPEECH_WHISPER_MODEL, language: str = SPEECH_RECOGNITION_LANGUAGE):
+        self.model_name = model
+        self.language = language.split("-")[0]
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    def _load_model(self):
+        with self._model_lock:
+            if self._model is None:
+                import whisper
+                self._model = whisper.load_model(self.model_name)
+            return self._model
+
+    def _recognize(self, recognizer, audio) -> str:
+        import numpy as np
+        model = self._load_model()
+        # Whisper espera muestras float32 a 16 kHz entre -1 y 1
+        raw = audio.get_raw_data(convert_rate=16000, convert_width=2)
+        samples = np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+        result = model.transcribe(samples, language=self.language, fp16=model.device.type == "cuda")
+        return result["text"]
+
+
+class SphinxBackend(_SpeechRecognitionBackend):
+    """CMU Sphinx en local (paquete pocketsphinx): menos preciso que Whisper pero muy ligero"""
+
+    name = "sphinx"
+    supports_partial = True
+
+    def __init__(self, language: str = SPEECH_RECOGNITION_LANGUAGE):
+        self.language = language
+
+    def _recognize(self, recognizer, audio) -> str:
+        return recognizer.recognize_sphinx(audio, language=self.language)
+
+
+class FileStubBackend(RecognizerBackend):
+    """
+    Motor determinista para pruebas y benchmarks: devuelve, en orden y en
+    bucle, las transcripciones de un archivo de texto (una por línea), sin
+    micrófono ni red. Una línea vacía simula audio que no se entendió.
+    """
+
+    name = "file"
+    needs_microphone = False
+
+    def __init__(self, file_path: str = SPEECH_STUB_TRANSCRIPTS, transcripts: Optional[List[str]] = None):
+        self.file_path = file_path
+        self._transcripts = transcripts
+        self._position = 0
+        self._lock = threading.Lock()
+
+    def _load(self) -> List[str]:
+        if self._transcripts is None:
+            if not os.path.exists(self.file_path):
+                raise RecognitionServiceError(f"No existe el archivo de transcripciones: {self.file_path}")
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                self._transcripts = [line.rstrip("\n") for line in f]
+        return self._transcripts
+
+    def transcribe(self, recognizer, audio) -> str:
+        with self._lock:
+            transcripts = self._load()
+            if not transcripts:
+                raise SpeechNotUnderstood()
+            text = transcripts[self._position % len(transcripts)].strip()
+            self._position += 1
+        if not text:
+            raise SpeechNotUnderstood()
+        return text
+
+
+BACKENDS = {
+    GoogleBackend.name: GoogleBackend,
+    WhisperBackend.name: WhisperBackend,
+    SphinxBackend.name: SphinxBackend,
+    FileStubBackend.name: FileStubBackend,
+}
+
+def create_backend(name: str = SPEECH_RECOGNITION_BACKEND) -> RecognizerBackend:
+    """
+    Crea el motor de reconocimiento configurado
+
+    Args:
+        name: "google", "whisper", "sphinx" o "file"
+
+    Returns:
+        RecognizerBackend: El motor (aún sin cargar modelos)
+
+    Raises:
+        ValueError: Si el nombre no corresponde a ningún motor
+    """
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Motor de reconocimiento desconocido: {name} (opciones: {', '.join(BACKENDS)})")
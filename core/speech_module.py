@@ -1,168 +1,648 @@
-import speech_recognition as sr
-import pyttsx3
+import heapq
+import itertools
+import re
 import threading
 import queue
 import time
 
-class SpeechModule:
-    def __init__(self):
-        # Inicializar reconocimiento de voz
-        self.recognizer = sr.Recognizer()
-        self.recognizer.energy_threshold = 4000  # Ajustar según ruido ambiente
-        self.recognizer.dynamic_energy_threshold = True
-        
-        # Inicializar sintetizador de voz
-        self.engine = pyttsx3.init()
-        # Configurar voces - intentar obtener voz en inglés si está disponible
-        voices = self.engine.getProperty('voices')
-        english_voice = None
-        for voice in voices:
-            if "english" in voice.name.lower():
-                english_voice = voice.id
-                break
-        
-        if english_voice:
-            self.engine.setProperty('voice', english_voice)
+from config import (
+    SPEECH_QUEUE_SIZE, SPEECH_ENERGY_THRESHOLD, SPEECH_KEEP_MICROPHONE_OPEN, SPEECH_RECALIBRATION_INTERVAL,
+    SPEECH_CALIBRATION_DURATION, SPEECH_PAUSE_THRESHOLD, SPEECH_PHRASE_TIME_LIMIT, SPEECH_PARTIAL_INTERVAL,
+    ENABLE_SPEECH_RECOGNITION, ENABLE_SPEECH_SYNTHESIS
+)
+from core.metrics import metrics
+from core.pronunciation import record_challenges, score_pronunciation, score_pronunciation_batch
+from core.speech_backends import RecognitionServiceError, SpeechNotUnderstood, create_backend
+from core.tracing import tracer
+
+# Prioridades de la cola de síntesis (menor valor = se pronuncia antes)
+SPEECH_PRIORITY_HIGH = 0
+SPEECH_PRIORITY_NORMAL = 1
+
+# Segundos tras abrir el micrófono antes de la primera calibración en segundo plano
+FIRST_CALIBRATION_DELAY = 2
+
+# Segundos entre iteraciones del bucle del motor mientras pronuncia
+ENGINE_ITERATE_INTERVAL = 0.01
+
+# Fin de frase: signos de puntuación (con comillas o paréntesis de cierre) seguidos de espacio, o salto de línea
+SENTENCE_END = re.compile(r"[.!?…]+[\"')\]]*(?=\s)|\n+")
+
+# Abreviaturas cuyo punto no termina la frase
+ABBREVIATIONS = {"mr.", "mrs.", "ms.", "dr.", "prof.", "st.", "vs.", "etc.", "e.g.", "i.e.", "a.m.", "p.m."}
+
+# Una frase sin puntuación más larga que esto se pronuncia por partes, cortando en una coma o espacio
+MAX_SENTENCE_CHARS = 200
+
+def split_sentences(text):
+    """
+    Separa las frases completas del texto recibido hasta ahora
+    
+    Args:
+        text: Texto acumulado (puede terminar a mitad de frase)
         
-        # Configurar velocidad y volumen
-        self.engine.setProperty('rate', 150)  # 150 palabras por minuto
-        self.engine.setProperty('volume', 0.8)  # Volumen (0.0 a 1.0)
+    Returns:
+        tuple: (lista de frases completas, resto aún incompleto)
+    """
+    sentences = []
+    start = 0
+    for match in SENTENCE_END.finditer(text):
+        candidate = text[start:match.end()]
+        words = candidate.split()
+        if words and words[-1].lower() in ABBREVIATIONS:
+            continue
+        if candidate.strip():
+            sentences.append(candidate.strip())
+        start = match.end()
+    
+    rest = text[start:]
+    while len(rest) > MAX_SENTENCE_CHARS:
+        cut = rest.rfind(", ", 0, MAX_SENTENCE_CHARS)
+        if cut <= 0:
+            cut = rest.rfind(" ", 0, MAX_SENTENCE_CHARS)
+        if cut <= 0:
+            cut = MAX_SENTENCE_CHARS
+        else:
+            cut += 1
+        sentences.append(rest[:cut].strip())
+        rest = rest[cut:].lstrip()
+    return sentences, rest
+
+
+class SpeechStream:
+    """
+    Texto que llega por partes (p. ej. la respuesta de la IA en streaming),
+    pronunciado frase a frase en cuanto cada frase está completa.
+    
+    Un flush() del módulo invalida el flujo: lo que llegue después se ignora.
+    """
+    
+    def __init__(self, speech_module, priority):
+        self.speech_module = speech_module
+        self.priority = priority
+        self.sentences = 0
+        self._buffer = ""
+        self._generation = speech_module._generation
+    
+    @property
+    def active(self):
+        return self._generation == self.speech_module._generation
+    
+    def feed(self, text):
+        """Añade texto y pone en cola las frases que se hayan completado"""
+        if not text or not self.active:
+            return
+        sentences, self._buffer = split_sentences(self._buffer + text)
+        for sentence in sentences:
+            self._speak(sentence)
+    
+    def finish(self):
+        """Pronuncia lo que quede (la última frase puede no tener puntuación)"""
+        if self.active and self._buffer.strip():
+            self._speak(self._buffer.strip())
+        self._buffer = ""
+    
+    def cancel(self):
+        """Deja de pronunciar este flujo y descarta lo pendiente"""
+        self._buffer = ""
+        if self.active:
+            self.speech_module.flush()
+    
+    def _speak(self, sentence):
+        if self.speech_module.speak(sentence, self.priority):
+            self.sentences += 1
+
+class _PartialTranscriber:
+    """
+    Transcribe en su propio hilo el audio parcial de la frase en curso.
+    
+    Solo se transcribe el fragmento más reciente: si llega audio nuevo
+    mientras el motor trabaja, el anterior se descarta. Los errores se
+    ignoran, porque la transcripción definitiva se hace al terminar la frase.
+    
+    El motor se usa con transcribe_lock, el mismo que toma la transcripción
+    definitiva: tras close() no empieza ninguna parcial más, y la que esté en
+    curso termina antes de que empiece la definitiva (sin competir por la
+    CPU) y su resultado se descarta.
+    """
+    
+    def __init__(self, backend, recognizer, callback, stats, transcribe_lock):
+        self.backend = backend
+        self.recognizer = recognizer
+        self.callback = callback
+        self.stats = stats
+        self.transcribe_lock = transcribe_lock
+        self._audio = None
+        self._closed = False
+        self._condition = threading.Condition()
+        threading.Thread(target=self._run, daemon=True).start()
+    
+    def submit(self, audio):
+        with self._condition:
+            self._audio = audio
+            self._condition.notify()
+    
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._audio = None
+            self._condition.notify()
+    
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._audio is None and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                audio, self._audio = self._audio, None
+            with self.transcribe_lock:
+                if self._closed:
+                    return
+                try:
+                    text = self.backend.transcribe(self.recognizer, audio)
+                except Exception:
+                    continue
+            with self._condition:
+                if self._closed:
+                    self.stats["partials_discarded"] += 1
+                    return
+            self.stats["partials"] += 1
+            self.callback(text)
+
+class SpeechModule:
+    """
+    Reconocimiento y síntesis de voz.
+    
+    Los motores se crean la primera vez que se usan, fuera del hilo de la
+    interfaz: speech_recognition al empezar a escuchar y pyttsx3 en el hilo de
+    síntesis al pronunciar la primera frase. Las librerías solo se importan
+    entonces, así que un usuario que solo escribe no paga su coste.
+    
+    El micrófono se abre en la primera escucha y queda abierto; el umbral de
+    energía parte de SPEECH_ENERGY_THRESHOLD y se recalibra en segundo plano
+    mientras nadie habla, de modo que cada escucha empieza al instante.
+    """
+    
+    def __init__(
+        self,
+        queue_size: int = SPEECH_QUEUE_SIZE,
+        enable_recognition: bool = ENABLE_SPEECH_RECOGNITION,
+        enable_synthesis: bool = ENABLE_SPEECH_SYNTHESIS,
+        backend=None
+    ):
+        self.recognition_enabled = enable_recognition
+        self.synthesis_enabled = enable_synthesis
+        self.backend = backend or create_backend()  # Motor que transcribe el audio
+        self.recognizer = None  # Se crea en el primer listen()
+        self.microphone = None  # Flujo de captura abierto (con SPEECH_KEEP_MICROPHONE_OPEN)
+        self._microphone_lock = threading.Lock()  # Solo una escucha o calibración usa el micrófono a la vez
+        self._calibration_stop = threading.Event()
+        self._calibration_thread = None
+        self._listen_stats = {"listens": 0, "calibrations": 0, "partials": 0, "partials_discarded": 0}
+        self._transcribe_lock = threading.Lock()  # Una sola transcripción (parcial o definitiva) a la vez
+        self.last_endpoint = None  # Momento (perf_counter) en que terminó la última frase capturada
+        self.engine = None  # Se crea en el hilo de síntesis
+        self._engine_ready = threading.Event()  # Marcado cuando el motor se creó (o falló)
+        self._pending_voice = None  # Voz elegida con set_voice(), aplicada por el hilo de síntesis
+        self._init_lock = threading.Lock()
         
-        # Cola para comunicación entre hilos
-        self.speech_queue = queue.Queue()
+        # Cola de síntesis con prioridad: (prioridad, orden, generación, texto).
+        # Un único hilo la consume durante toda la vida del módulo.
+        self.speech_queue = queue.PriorityQueue(maxsize=queue_size)
+        self._sequence = itertools.count()
+        self._generation = 0  # Aumenta con flush(); los textos de generaciones anteriores se descartan
+        # Frases que no cupieron en la cola, en el mismo orden; el hilo de
+        # síntesis las pasa a la cola según se libera hueco y flush() las vacía
+        self._backlog = []
+        self._speech_lock = threading.Lock()
+        self._speech_stats = {"spoken": 0, "interrupted": 0, "deferred": 0, "flushed": 0, "errors": 0, "max_queue_length": 0}
         self.is_listening = False
         self.is_speaking = False
+        self._speech_worker = None
         
-    def listen(self, callback, error_callback=None, timeout=5):
+        metrics.register("speech", self.get_speech_stats)
+    
+    def _get_recognizer(self):
+        # Importar y configurar el reconocedor solo cuando se va a escuchar
+        with self._init_lock:
+            if self.recognizer is None:
+                import speech_recognition as sr
+                recognizer = sr.Recognizer()
+                recognizer.energy_threshold = SPEECH_ENERGY_THRESHOLD  # Ajustar según ruido ambiente
+                recognizer.dynamic_energy_threshold = True
+                # Fin de frase: tras SPEECH_PAUSE_THRESHOLD segundos por debajo del umbral de energía
+                recognizer.pause_threshold = SPEECH_PAUSE_THRESHOLD
+                recognizer.non_speaking_duration = min(recognizer.non_speaking_duration, SPEECH_PAUSE_THRESHOLD)
+                self.recognizer = recognizer
+            return self.recognizer
+    
+    def _open_microphone(self):
+        # Llamar con _microphone_lock adquirido. El flujo se abre una vez y se
+        # reutiliza; la calibración se hace en segundo plano, nunca al escuchar
+        if self.microphone is None:
+            import speech_recognition as sr
+            source = sr.Microphone()
+            source.__enter__()
+            self.microphone = source
+            if SPEECH_RECALIBRATION_INTERVAL and self._calibration_thread is None:
+                self._calibration_thread = threading.Thread(target=self._run_calibration, daemon=True)
+                self._calibration_thread.start()
+        return self.microphone
+    
+    def _close_microphone(self):
+        # Llamar con _microphone_lock adquirido
+        if self.microphone is not None:
+            try:
+                self.microphone.__exit__(None, None, None)
+            except Exception as e:
+                print(f"Error al cerrar el micrófono: {e}")
+            self.microphone = None
+    
+    def _run_calibration(self):
+        # Recalibra el umbral de energía con el ruido ambiente mientras nadie escucha ni habla
+        delay = FIRST_CALIBRATION_DELAY
+        while not self._calibration_stop.wait(delay):
+            if self.is_speaking or not self.speech_queue.empty():
+                # La voz sintetizada se tomaría por ruido ambiente y subiría el umbral: aplazar
+                delay = FIRST_CALIBRATION_DELAY
+                continue
+            delay = SPEECH_RECALIBRATION_INTERVAL
+            if self.is_listening or not self._microphone_lock.acquire(blocking=False):
+                continue
+            try:
+                if self.microphone is None:
+                    continue
+                self.recognizer.adjust_for_ambient_noise(self.microphone, duration=SPEECH_CALIBRATION_DURATION)
+                self._listen_stats["calibrations"] += 1
+            except Exception as e:
+                print(f"Error al calibrar el micrófono: {e}")
+                self._close_microphone()
+            finally:
+                self._microphone_lock.release()
+    
+    def close(self):
+        """Libera el micrófono y detiene la recalibración en segundo plano"""
+        self._calibration_stop.set()
+        with self._microphone_lock:
+            self._close_microphone()
+    
+    def _ensure_speech_worker(self):
+        with self._init_lock:
+            if self._speech_worker is None:
+                self._speech_worker = threading.Thread(target=self._run_speech_worker, daemon=True)
+                self._speech_worker.start()
+    
+    def _create_engine(self):
+        # Se ejecuta en el hilo de síntesis, que es el único que usa el motor
+        try:
+            import pyttsx3
+            engine = pyttsx3.init()
+            
+            # Configurar voces - intentar obtener voz en inglés si está disponible
+            voices = engine.getProperty('voices')
+            english_voice = None
+            for voice in voices:
+                if "english" in voice.name.lower():
+                    english_voice = voice.id
+                    break
+            
+            if english_voice:
+                engine.setProperty('voice', english_voice)
+            
+            # Configurar velocidad y volumen
+            engine.setProperty('rate', 150)  # 150 palabras por minuto
+            engine.setProperty('volume', 0.8)  # Volumen (0.0 a 1.0)
+            self.engine = engine
+        except Exception as e:
+            print(f"Error al iniciar la síntesis de voz: {e}")
+            self.synthesis_enabled = False
+            self.flush()
+        finally:
+            self._engine_ready.set()
+    
+    def listen(self, callback, error_callback=None, timeout=5, partial_callback=None):
         """
         Escucha entrada de voz y devuelve texto transcrito
         
+        La frase termina cuando se deja de hablar (SPEECH_PAUSE_THRESHOLD
+        segundos de silencio) y se transcribe en ese momento. Con motores
+        locales, el audio se transcribe también por partes mientras se habla.
+        
         Args:
-            callback: Función para procesar texto reconocido
+            callback: Función para procesar texto reconocido (se llama desde el hilo de escucha)
             error_callback: Función para manejar errores
-            timeout: Tiempo máximo de escucha en segundos
+            timeout: Tiempo máximo de espera hasta que se empieza a hablar, en segundos
+            partial_callback: Función que recibe la transcripción provisional mientras se habla
         """
-        if self.is_listening:
+        if self.is_listening or not self.recognition_enabled:
             return False
             
         # Función para ejecutar en un hilo separado
         def listen_thread():
             self.is_listening = True
+            partial = None
+            if partial_callback and SPEECH_PARTIAL_INTERVAL and self.backend.supports_partial:
+                partial = _PartialTranscriber(
+                    self.backend, self.recognizer, partial_callback, self._listen_stats, self._transcribe_lock
+                )
             try:
-                with sr.Microphone() as source:
-                    self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                    audio = self.recognizer.listen(source, timeout=timeout, phrase_time_limit=10)
-                    
+                audio = self._capture(timeout, partial) if self.backend.needs_microphone else None
+                self.last_endpoint = time.perf_counter()
+                if partial:
+                    partial.close()
+                
                 try:
-                    text = self.recognizer.recognize_google(audio, language="en-US")
+                    # Si hay una parcial en curso, se espera a que acabe en vez de transcribir a la vez
+                    with self._transcribe_lock, tracer.span("speech.recognize", backend=self.backend.name):
+                        text = self.backend.transcribe(self.recognizer, audio)
                     if callback:
                         callback(text)
-                except sr.UnknownValueError:
+                except SpeechNotUnderstood:
                     if error_callback:
                         error_callback("No se pudo entender el audio")
-                except sr.RequestError as e:
+                except RecognitionServiceError as e:
                     if error_callback:
                         error_callback(f"Error con el servicio de reconocimiento: {e}")
             except Exception as e:
                 if error_callback:
                     error_callback(f"Error: {e}")
             finally:
+                if partial:
+                    partial.close()
                 self.is_listening = False
         
         # Iniciar hilo para no bloquear la UI
         threading.Thread(target=listen_thread, daemon=True).start()
         return True
     
-    def speak(self, text):
+    def _capture(self, timeout, partial=None):
+        # Graba una frase del micrófono. El umbral de energía ya está
+        # calibrado, así que se empieza a escuchar sin esperar
+        import speech_recognition as sr
+        recognizer = self._get_recognizer()
+        if partial:
+            partial.recognizer = recognizer
+        with self._microphone_lock:
+            self._listen_stats["listens"] += 1
+            if not SPEECH_KEEP_MICROPHONE_OPEN:
+                with sr.Microphone() as source:
+                    return self._record_phrase(recognizer, source, timeout, partial)
+            try:
+                return self._record_phrase(recognizer, self._open_microphone(), timeout, partial)
+            except sr.WaitTimeoutError:
+                raise
+            except Exception:
+                # El flujo pudo quedar inservible (p. ej. se desconectó el dispositivo)
+                self._close_microphone()
+                raise
+    
+    def _record_phrase(self, recognizer, source, timeout, partial):
+        if partial is None:
+            return recognizer.listen(source, timeout=timeout, phrase_time_limit=SPEECH_PHRASE_TIME_LIMIT)
+        
+        # Recibir la frase por bloques para transcribir el audio parcial mientras se habla
+        import speech_recognition as sr
+        frames = bytearray()
+        sample_rate = sample_width = None
+        next_partial = SPEECH_PARTIAL_INTERVAL
+        ready = None
+        for chunk in recognizer.listen(source, timeout=timeout, phrase_time_limit=SPEECH_PHRASE_TIME_LIMIT, stream=True):
+            # Un bloque más significa que la frase sigue: solo entonces se envía
+            # la parcial preparada, para no lanzar una justo al terminar
+            if ready is not None:
+                partial.submit(ready)
+                ready = None
+            frames += chunk.frame_data
+            sample_rate, sample_width = chunk.sample_rate, chunk.sample_width
+            if len(frames) / (sample_rate * sample_width) >= next_partial:
+                next_partial += SPEECH_PARTIAL_INTERVAL
+                ready = sr.AudioData(bytes(frames), sample_rate, sample_width)
+        return sr.AudioData(bytes(frames), sample_rate or source.SAMPLE_RATE, sample_width or source.SAMPLE_WIDTH)
+    
+    def speak(self, text, priority=SPEECH_PRIORITY_NORMAL, interrupt=False):
         """
-        Sintetiza texto a voz
+        Añade texto a la cola de síntesis
         
         Args:
             text: Texto a sintetizar
+            priority: SPEECH_PRIORITY_HIGH se pronuncia antes que lo pendiente
+            interrupt: Descartar lo pendiente y cortar la frase en curso
+            
+        Returns:
+            bool: False si el texto está vacío o la síntesis no está disponible
+        """
+        text = text.strip() if text else ""
+        if not text or not self.synthesis_enabled:
+            return False
+        if interrupt:
+            self.flush()
+        self._ensure_speech_worker()
+        
+        # Con la cola llena la frase no se pierde: espera su turno sin bloquear a quien habla
+        with self._speech_lock:
+            item = (priority, next(self._sequence), self._generation, text)
+            if self._backlog or not self._put(item):
+                heapq.heappush(self._backlog, item)
+                self._speech_stats["deferred"] += 1
+            self._speech_stats["max_queue_length"] = max(
+                self._speech_stats["max_queue_length"], self.speech_queue.qsize() + len(self._backlog)
+            )
+        return True
+    
+    def _put(self, item):
+        try:
+            self.speech_queue.put_nowait(item)
+            return True
+        except queue.Full:
+            return False
+    
+    def _refill_queue(self):
+        # Pasar a la cola las frases en espera que quepan, por prioridad y orden de llegada
+        with self._speech_lock:
+            while self._backlog and self._put(self._backlog[0]):
+                heapq.heappop(self._backlog)
+    
+    def open_stream(self, priority=SPEECH_PRIORITY_NORMAL):
         """
-        if self.is_speaking:
-            self.speech_queue.put(text)
+        Crea un flujo para pronunciar texto a medida que llega
+        
+        Args:
+            priority: Prioridad de las frases del flujo en la cola
+            
+        Returns:
+            SpeechStream: Llamar a feed() con cada fragmento y a finish() al terminar
+        """
+        return SpeechStream(self, priority)
+    
+    def speak_stream(self, chunks, priority=SPEECH_PRIORITY_NORMAL):
+        """
+        Pronuncia frase a frase un iterable de fragmentos de texto (bloquea mientras lo recorre)
+        
+        Args:
+            chunks: Fragmentos de texto, p. ej. los de stream_ai_response
+            priority: Prioridad de las frases en la cola
+            
+        Returns:
+            SpeechStream: El flujo usado, ya terminado
+        """
+        stream = self.open_stream(priority)
+        for chunk in chunks:
+            if not stream.active:
+                break
+            stream.feed(chunk)
+        stream.finish()
+        return stream
+    
+    def flush(self):
+        """Descarta el texto pendiente y corta la frase que se está pronunciando"""
+        with self._speech_lock:
+            self._generation += 1
+            flushed = len(self._backlog)
+            self._backlog.clear()
+            while True:
+                try:
+                    self.speech_queue.get_nowait()
+                    flushed += 1
+                except queue.Empty:
+                    break
+            self._speech_stats["flushed"] += flushed
+    
+    def get_speech_stats(self):
+        """
+        Métricas de la cola de síntesis
+        
+        Returns:
+            dict: Longitud de la cola, frases pronunciadas, cortadas, aplazadas y vaciadas,
+                escuchas, calibraciones, transcripciones parciales y umbral de energía actual
+        """
+        with self._speech_lock:
+            return dict(
+                self._speech_stats,
+                queue_length=self.speech_queue.qsize() + len(self._backlog),
+                speaking=self.is_speaking,
+                listens=self._listen_stats["listens"],
+                calibrations=self._listen_stats["calibrations"],
+                partials=self._listen_stats["partials"],
+                partials_discarded=self._listen_stats["partials_discarded"],
+                energy_threshold=self.recognizer.energy_threshold if self.recognizer else SPEECH_ENERGY_THRESHOLD
+            )
+    
+    def _run_speech_worker(self):
+        self._create_engine()
+        if self.engine is None:
             return
+        
+        # El motor solo se usa desde este hilo. Con el bucle externo de pyttsx3
+        # (startLoop(False) + iterate) el bucle se inicia una sola vez y una
+        # frase se puede cortar a mitad; si el driver no lo admite, cada frase
+        # se pronuncia entera con runAndWait
+        try:
+            self.engine.startLoop(False)
+            external_loop = True
+        except Exception:
+            external_loop = False
+            # pyttsx3 marca el bucle como iniciado antes de llamar al driver: si
+            # no se cierra, runAndWait falla con "run loop already started"
+            try:
+                self.engine.endLoop()
+            except Exception:
+                pass
+        
+        while True:
+            _, _, generation, text = self.speech_queue.get()
+            self._refill_queue()
+            if generation != self._generation:
+                continue
             
-        # Función para ejecutar en un hilo separado
-        def speak_thread():
             self.is_speaking = True
+            outcome = "spoken"
             try:
-                # Primero procesar el texto actual
+                if self._pending_voice is not None:
+                    self.engine.setProperty('voice', self._pending_voice)
+                    self._pending_voice = None
                 self.engine.say(text)
-                self.engine.runAndWait()
-                
-                # Luego procesar cualquier otro texto en la cola
-                while not self.speech_queue.empty():
-                    next_text = self.speech_queue.get()
-                    self.engine.say(next_text)
+                if external_loop:
+                    self.engine.iterate()
+                    while self.engine.isBusy():
+                        if generation != self._generation:
+                            self.engine.stop()
+                            outcome = "interrupted"
+                            break
+                        time.sleep(ENGINE_ITERATE_INTERVAL)
+                        self.engine.iterate()
+                else:
                     self.engine.runAndWait()
+                with self._speech_lock:
+                    self._speech_stats[outcome] += 1
+            except Exception as e:
+                print(f"Error en la síntesis de voz: {e}")
+                with self._speech_lock:
+                    self._speech_stats["errors"] += 1
             finally:
                 self.is_speaking = False
-        
-        # Iniciar hilo para no bloquear la UI
-        threading.Thread(target=speak_thread, daemon=True).start()
     
-    def check_pronunciation(self, original_text, spoken_text):
+    def check_pronunciation(self, original_text, spoken_text, knowledge_base=None):
         """
-        Compara texto original con texto hablado para análisis básico de pronunciación
+        Compara texto original con texto hablado alineando las palabras, de
+        modo que una palabra añadida u omitida no desplaza a las siguientes
         
         Args:
             original_text: Texto que se debía pronunciar
             spoken_text: Texto reconocido del habla
+            knowledge_base: KnowledgeBase donde registrar los fonemas fallados (opcional),
+                que luego proponen los ejercicios de pronunciación
             
         Returns:
-            dict: Resultados del análisis
-        """
-        # Normalizar texto para comparación
-        original = original_text.lower().strip()
-        spoken = spoken_text.lower().strip()
-        
-        # Tokenizar en palabras
-        original_words = original.split()
-        spoken_words = spoken.split()
-        
-        # Analizar palabras correctas/incorrectas
-        total_words = len(original_words)
-        correct_words = 0
-        mispronounced = []
-        
-        # Comparar palabras
-        for i, orig_word in enumerate(original_words):
-            if i < len(spoken_words):
-                if orig_word == spoken_words[i]:
-                    correct_words += 1
-                else:
-                    mispronounced.append((orig_word, spoken_words[i]))
-            else:
-                mispronounced.append((orig_word, "[omitido]"))
-        
-        # Calcular puntuación
-        accuracy = correct_words / total_words if total_words > 0 else 0
+            dict: Resultados del análisis (ver pronunciation.score_pronunciation)
+        """
+        with tracer.span("pronunciation.score"):
+            result = score_pronunciation(original_text, spoken_text)
+        if knowledge_base is not None:
+            record_challenges(result, knowledge_base)
+        return result
+    
+    def check_pronunciation_batch(self, recordings, knowledge_base=None):
+        """
+        Analiza varias lecturas de una vez
         
-        return {
-            "accuracy": accuracy,
-            "score": int(accuracy * 100),
-            "mispronounced": mispronounced,
-            "correct_words": correct_words,
-            "total_words": total_words
-        }
+        Args:
+            recordings: Pares (texto original, texto reconocido)
+            knowledge_base: KnowledgeBase donde registrar los fonemas fallados (opcional)
+            
+        Returns:
+            list: Resultados del análisis en el mismo orden
+        """
+        with tracer.span("pronunciation.score_batch"):
+            results = score_pronunciation_batch(recordings)
+        if knowledge_base is not None:
+            for result in results:
+                record_challenges(result, knowledge_base)
+        return results
     
-    def get_available_voices(self):
+    def get_available_voices(self, timeout=5):
         """
         Obtener lista de voces disponibles
         
+        Args:
+            timeout: Segundos máximos esperando a que se cree el motor de síntesis
+        
         Returns:
-            list: Nombres de voces disponibles
+            list: Nombres de voces disponibles (vacía si la síntesis no está disponible)
         """
+        if not self.synthesis_enabled:
+            return []
+        self._ensure_speech_worker()
+        if not self._engine_ready.wait(timeout) or self.engine is None:
+            return []
         voices = self.engine.getProperty('voices')
         return [voice.name for voice in voices]
     
     def set_voice(self, voice_id):
         """
-        Establecer voz específica
+        Establecer voz específica (se aplica antes de la siguiente frase)
         
         Args:
             voice_id: ID de la voz a usar
         """
-        self.engine.setProperty('voice', voice_id)
\ No newline at end of file
+        self._pending_voice = voice_id
@@ -0,0 +1,133 @@
+import threading
+from typing import List
+
+from config import SUMMARY_MODEL, SUMMARY_MAX_TOKENS, OLLAMA_NUM_CTX
+from core.conversation_history import count_tokens
+from core.ollama_client import generate_text, PRIORITY_BACKGROUND, ROUTE_SUMMARY
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between an English learner and their AI tutor.
+
+Current summary:
+{summary}
+
+New exchanges to add:
+{turns}
+
+Rewrite the summary so it includes the new exchanges. Keep the learner's interests, opinions,
+topics they dislike, personal details they shared and recurring mistakes. Use at most {words} words,
+plain sentences, no lists. Reply with the summary only.
+
+Summary:"""
+
+# Tokens of pending turns kept for one summary call, so the prompt fits the context window
+MAX_PENDING_TOKENS = OLLAMA_NUM_CTX // 2
+
+class ConversationSummarizer:
+    """
+    Compresses turns evicted from the history into a short running summary.
+
+    Evicted turns are queued and summarized by a background thread with a cheap
+    model call, so the user never waits for it. The latest summary is kept in
+    memory and reused on every turn until new turns are evicted.
+    """
+
+    def __init__(self, model: str = SUMMARY_MODEL, max_tokens: int = SUMMARY_MAX_TOKENS, session_id: str = "default"):
+        self.model = model
+        self.session_id = session_id
+        self.max_tokens = max_tokens
+        self.summary = ""
+        self._pending: List[str] = []
+        self._pending_tokens = 0
+        self._generation = 0  # Increased on reset so stale results are dropped
+        self._closed = False
+        self._condition = threading.Condition()
+        self._worker = None
+
+    def add_turns(self, turns) -> None:
+        """
+        Queue evicted turns to be folded into the summary.
+
+        Args:
+            turns: ConversationTurn objects removed from the history
+        """
+        with self._condition:
+            if self._closed:
+                return
+            for turn in turns:
+                self._pending.append(turn.text)
+                self._pending_tokens += turn.tokens
+            self._trim_pending()
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, daemon=True)
+                self._worker.start()
+            self._condition.notify()
+
+    def get_summary(self) -> str:
+        """Return the current running summary (may be empty)"""
+        with self._condition:
+            return self.summary
+
+    def reset(self) -> None:
+        """Forget the summary and any turns still waiting to be summarized"""
+        with self._condition:
+            self.summary = ""
+            self._pending = []
+            self._pending_tokens = 0
+            self._generation += 1
+
+    def close(self) -> None:
+        """Stop the background worker; pending turns are discarded"""
+        with self._condition:
+            self._closed = True
+            self._pending = []
+            self._pending_tokens = 0
+            self._generation += 1
+            self._condition.notify()
+
+    def _trim_pending(self) -> None:
+        # Drop the oldest pending turns that do not fit in one summary prompt
+        while len(self._pending) > 1 and self._pending_tokens > MAX_PENDING_TOKENS:
+            self._pending_tokens -= count_tokens(self._pending.pop(0)) + 1
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                turns = self._pending
+                self._pending = []
+                self._pending_tokens = 0
+                summary = self.summary
+                generation = self._generation
+
+            prompt = SUMMARY_PROMPT.format(
+                summary=summary or "(empty)",
+                turns="\n".join(turns),
+                words=int(self.max_tokens * 0.6)
+            )
+            try:
+                new_summary = generate_text(
+                    prompt,
+                    ROUTE_SUMMARY,
+                    options={"num_predict": self.max_tokens},
+                    session_id=self.session_id,
+                    priority=PRIORITY_BACKGROUND,
+                    model=self.model
+                )
+            except Exception as e:
+                print(f"Error summarizing conversation: {e}")
+                new_summary = None
+
+            with self._condition:
+                if generation != self._generation:
+                    continue
+                if new_summary:
+                    self.summary = new_summary
+                else:
+                    # Keep the turns so the next attempt retries them
+                    self._pending = turns + self._pending
+                    self._pending_tokens = sum(count_tokens(text) + 1 for text in self._pending)
+                    self._trim_pending()
+                    self._condition.wait(timeout=30)
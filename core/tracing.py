@@ -0,0 +1,188 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from config import ENABLE_TRACING, TRACE_LOG_SPANS, TRACE_RECENT_SPANS, LOG_FILE
+
+# Upper bounds of the histogram buckets in milliseconds (the last one catches the rest)
+BUCKET_BOUNDS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, float("inf")]
+
+class Histogram:
+    """Latency histogram with fixed buckets; percentiles are bucket upper bounds"""
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKET_BOUNDS_MS)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        for i, bound in enumerate(BUCKET_BOUNDS_MS):
+            if ms <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, fraction: float) -> float:
+        """Approximate percentile (0-1) in milliseconds"""
+        if not self.count:
+            return 0.0
+        threshold = fraction * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= threshold:
+                # The overflow bucket has no upper bound: report the maximum instead
+                return min(BUCKET_BOUNDS_MS[i], self.max_ms)
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": self.max_ms
+        }
+
+
+class Tracer:
+    """
+    Records how long each stage of the turn pipeline takes.
+
+    Every span updates a histogram for its name and is kept in a short list of
+    recent spans. With `log_spans`, each span is also appended to the log file
+    as one JSON line; dump() writes a summary of all histograms there.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = ENABLE_TRACING,
+        log_file: str = LOG_FILE,
+        log_spans: bool = TRACE_LOG_SPANS,
+        recent_spans: int = TRACE_RECENT_SPANS
+    ):
+        self.enabled = enabled
+        self.log_file = log_file
+        self.log_spans = log_spans
+        self._histograms: Dict[str, Histogram] = {}
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=recent_spans)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Dict[str, Any]]:
+        """
+        Time a block of code.
+
+        Args:
+            name: Stage name, e.g. "languagetool.check"
+            attributes: Extra details stored with the span
+
+        Yields:
+            Dict: The span attributes, which the block may extend
+        """
+        if not self.enabled:
+            yield attributes
+            return
+        start = time.perf_counter()
+        try:
+            yield attributes
+        finally:
+            self.record(name, time.perf_counter() - start, **attributes)
+
+    def record(self, name: str, seconds: float, **attributes) -> None:
+        """
+        Record a span measured elsewhere (e.g. durations reported by Ollama).
+
+        Args:
+            name: Stage name
+            seconds: Duration of the stage
+            attributes: Extra details stored with the span
+        """
+        if not self.enabled:
+            return
+        ms = seconds * 1000
+        span = {"name": name, "ms": round(ms, 3), "at": time.time(), **attributes}
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(ms)
+            self._recent.append(span)
+
+        if self.log_spans:
+            self._write(json.dumps(span, default=str) + "\n")
+
+    def record_ollama(self, data: Dict[str, Any], route: str = "conversation") -> None:
+        """
+        Record the load, prefill and generation times from Ollama's final response.
+
+        Args:
+            data: The last (done) JSON object returned by the generate endpoint
+            route: Task route the request belonged to
+        """
+        if not self.enabled or "eval_duration" not in data:
+            return
+        if data.get("load_duration"):
+            self.record("ollama.load", data["load_duration"] / 1e9, route=route)
+        self.record(
+            "ollama.prefill", data.get("prompt_eval_duration", 0) / 1e9,
+            route=route, tokens=data.get("prompt_eval_count", 0)
+        )
+        self.record(
+            "ollama.generation", data["eval_duration"] / 1e9,
+            route=route, tokens=data.get("eval_count", 0)
+        )
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return the histogram summary of every stage"""
+        with self._lock:
+            return {name: histogram.to_dict() for name, histogram in sorted(self._histograms.items())}
+
+    def recent_spans(self, n: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return the most recent spans, oldest first"""
+        with self._lock:
+            spans = list(self._recent)
+        return spans[-n:] if n else spans
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._recent.clear()
+
+    def format_report(self) -> str:
+        """Render the histogram summary as a text table"""
+        lines = [f"{'stage':<28}{'count':>8}{'avg ms':>11}{'p50 ms':>11}{'p95 ms':>11}{'max ms':>11}"]
+        for name, stats in self.get_stats().items():
+            lines.append(
+                f"{name:<28}{stats['count']:>8}{stats['avg_ms']:>11.1f}"
+                f"{stats['p50_ms']:>11.1f}{stats['p95_ms']:>11.1f}{stats['max_ms']:>11.1f}"
+            )
+        return "\n".join(lines)
+
+    def dump(self, path: Optional[str] = None) -> None:
+        """Append the current histogram summary to the log file"""
+        if not self.enabled or not self._histograms:
+            return
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        self._write(f"=== Latency report {timestamp} ===\n{self.format_report()}\n\n", path)
+
+    def _write(self, text: str, path: Optional[str] = None) -> None:
+        path = path or self.log_file
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._lock, open(path, "a", encoding="utf-8") as f:
+                f.write(text)
+        except OSError as e:
+            print(f"Error writing trace log: {e}")
+
+
+tracer = Tracer()
@@ -0,0 +1,85 @@
+import time
+from typing import Any, Callable, List, Tuple
+
+from core.tracing import tracer
+
+
+class UIUpdateScheduler:
+    """
+    Batches writes to a Tk text widget into one flush per idle period.
+
+    Inserts, mark changes and scroll requests are queued in order and applied
+    together from an `after_idle` callback, before Tk redraws. Many writes
+    during a turn cost one state toggle, one scroll and one redraw, and no
+    event is processed half-way through a turn, as it was with update().
+
+    Must be used from the Tk thread, like the widget itself.
+    """
+
+    def __init__(self, widget):
+        self.widget = widget
+        self._operations: List[Tuple[Callable, Tuple[Any, ...]]] = []
+        self._scroll = False
+        self._scheduled = False
+        self._stats = {"flushes": 0, "operations": 0}
+
+    def insert(self, index: str, text: str, *tags) -> None:
+        """Queue an insert, as Text.insert(index, text, tags)"""
+        self.call(self.widget.insert, index, text, *tags)
+
+    def call(self, function: Callable, *args) -> None:
+        """Queue any other widget operation (delete, mark_set...) in order with the inserts"""
+        self._operations.append((function, args))
+        self._schedule()
+
+    def scroll_to_end(self) -> None:
+        """Scroll to the end after the next flush (requests are merged)"""
+        self._scroll = True
+        self._schedule()
+
+    def flush(self) -> None:
+        """Apply the queued operations now"""
+        self._scheduled = False
+        operations, self._operations = self._operations, []
+        if not operations and not self._scroll:
+            return
+
+        start = time.perf_counter()
+        if operations:
+            self.widget.config(state="normal")
+            for function, args in operations:
+                function(*args)
+            self.widget.config(state="disabled")
+        if self._scroll:
+            self._scroll = False
+            self.widget.yview("end")
+
+        self._stats["flushes"] += 1
+        self._stats["operations"] += len(operations)
+        tracer.record("ui.render", time.perf_counter() - start, operations=len(operations))
+
+    def get_stats(self) -> dict:
+        """Flushes done and operations applied since the scheduler was created"""
+        return dict(self._stats)
+
+    def _schedule(self) -> None:
+        if not self._scheduled:
+            self._scheduled = True
+            self.widget.after_idle(self.flush)
+
+
+def get_scheduler(widget) -> UIUpdateScheduler:
+    """
+    The update scheduler of a widget, created on first use
+
+    Args:
+        widget: Text widget (or anything with insert, config, yview and after_idle)
+
+    Returns:
+        UIUpdateScheduler: The same scheduler for every call with this widget
+    """
+    scheduler = getattr(widget, "update_scheduler", None)
+    if scheduler is None:
+        scheduler = UIUpdateScheduler(widget)
+        widget.update_scheduler = scheduler
+    return scheduler
@@ -1,4 +1,22 @@
-from ui.app_window import start_app
+import argparse
+import atexit
+
+from config import API_HOST, API_PORT
 
 if __name__ == "__main__":
-    start_app()
+    parser = argparse.ArgumentParser(description="English AI Terminal")
+    parser.add_argument("--server", action="store_true", help="Run the HTTP/WebSocket API instead of the desktop window")
+    parser.add_argument("--host", default=API_HOST, help="Host for the API server")
+    parser.add_argument("--port", type=int, default=API_PORT, help="Port for the API server")
+    args = parser.parse_args()
+
+    # Write the latency summary of the session to the log file on exit
+    from core.tracing import tracer
+    atexit.register(tracer.dump)
+
+    if args.server:
+        from api.server import run_server
+        run_server(args.host, args.port)
+    else:
+        from ui.app_window import start_app
+        start_app()
@@ -0,0 +1,15 @@
+"""
+The tests run offline: the LanguageTool stub of the benchmarks replaces
+language_tool_python before any test imports core.grammar_checker, which
+starts LanguageTool at import time (the real one needs Java and downloads
+its server on first use).
+"""
+import os
+import sys
+
+BENCHMARK_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+sys.path.insert(0, BENCHMARK_DIR)
+
+import fake_languagetool
+
+fake_languagetool.install(latency=0)
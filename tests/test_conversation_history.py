@@ -0,0 +1,100 @@
+import unittest
+
+from core.conversation_history import ConversationHistory, count_tokens
+
+
+def count_words(text):
+    return len(text.split())
+
+
+class ConversationHistoryTest(unittest.TestCase):
+    def make_history(self, max_tokens, **kwargs):
+        # "User: a\nAI: b" is 4 words, +1 for the joining line break
+        return ConversationHistory(max_tokens, token_counter=count_words, **kwargs)
+
+    def test_turns_are_kept_while_they_fit(self):
+        history = self.make_history(15)
+        for i in range(3):
+            history.append(f"u{i}", f"a{i}")
+
+        self.assertEqual(len(history), 3)
+        self.assertEqual(history.total_tokens, 15)
+        self.assertEqual(history.render(), "User: u0\nAI: a0\nUser: u1\nAI: a1\nUser: u2\nAI: a2")
+
+    def test_oldest_turns_are_evicted_in_a_batch(self):
+        evicted = []
+        history = self.make_history(20, on_evict=evicted.append, low_watermark=0.5)
+        for i in range(4):
+            history.append(f"u{i}", f"a{i}")
+        self.assertEqual(evicted, [])
+
+        history.append("u4", "a4")
+
+        # 25 tokens > 20, so turns go until at most 10 tokens are left
+        self.assertEqual(len(evicted), 1)
+        self.assertEqual([turn.user for turn in evicted[0]], ["u0", "u1", "u2"])
+        self.assertEqual([turn.user for turn in history], ["u3", "u4"])
+        self.assertEqual(history.total_tokens, 10)
+
+    def test_start_of_history_is_stable_between_evictions(self):
+        history = self.make_history(20, low_watermark=0.5)
+        for i in range(5):
+            history.append(f"u{i}", f"a{i}")
+        first = history.turns[0]
+
+        history.append("u5", "a5")
+        history.append("u6", "a6")
+
+        self.assertIs(history.turns[0], first)
+
+    def test_newest_turn_is_never_evicted(self):
+        history = self.make_history(12)
+        history.append("u0", "a0")
+        turn = history.append("one two three", "four five six")
+
+        self.assertEqual(list(history), [turn])
+        self.assertEqual(turn.ai, "four five six")
+
+    def test_oversize_turn_is_truncated_to_fit(self):
+        history = self.make_history(10)
+        turn = history.append("short question", "a very long answer that does not fit")
+
+        self.assertEqual(turn.user, "short question")
+        self.assertEqual(turn.ai, "a very long answer that")
+        self.assertLessEqual(turn.tokens, 10)
+
+    def test_oversize_message_drops_the_reply(self):
+        history = self.make_history(6)
+        turn = history.append("a message that is far too long", "reply")
+
+        self.assertEqual(turn.user, "a message that")
+        self.assertEqual(turn.ai, "")
+        self.assertLessEqual(history.total_tokens, 6)
+
+    def test_render_keeps_the_most_recent_turns(self):
+        history = self.make_history(100)
+        for i in range(4):
+            history.append(f"u{i}", f"a{i}")
+
+        self.assertEqual(history.render(10), "User: u2\nAI: a2\nUser: u3\nAI: a3")
+        self.assertEqual(history.render(4), "")
+
+    def test_clear(self):
+        history = self.make_history(100)
+        history.append("u0", "a0")
+        history.clear()
+
+        self.assertEqual(len(history), 0)
+        self.assertEqual(history.total_tokens, 0)
+
+
+class CountTokensTest(unittest.TestCase):
+    def test_long_words_and_punctuation(self):
+        self.assertEqual(count_tokens(""), 0)
+        self.assertEqual(count_tokens("Hi, you!"), 4)
+        self.assertEqual(count_tokens("unbelievable"), 3)
+        self.assertEqual(count_tokens("a\nb"), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
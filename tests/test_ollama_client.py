@@ -0,0 +1,179 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+from unittest import mock
+
+from core import ollama_client
+from core.ollama_client import (
+    PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, OllamaScheduler, ReplyStreamCleaner,
+    SchedulerOverloaded, clean_reply
+)
+
+
+class FakeStreamResponse:
+    """requests response streaming one JSON line per chunk, as Ollama does"""
+
+    def __init__(self, chunks):
+        lines = [json.dumps({"response": chunk, "done": False}) for chunk in chunks]
+        lines.append(json.dumps({"response": "", "done": True}))
+        self._lines = [line.encode("utf-8") for line in lines]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self):
+        return iter(self._lines)
+
+    def close(self):
+        pass
+
+
+def clean_stream(chunks):
+    cleaner = ReplyStreamCleaner()
+    return "".join(cleaner.feed(chunk) for chunk in chunks) + cleaner.finish()
+
+
+class ReplyMarkerTest(unittest.TestCase):
+    def test_leading_marker(self):
+        self.assertEqual(clean_stream(["  AI: Hello", " there?"]), "Hello there?")
+
+    def test_marker_in_the_middle_of_the_reply(self):
+        chunks = ["Great job. ", "AI: Now tell me", " more?"]
+        self.assertEqual(clean_stream(chunks), clean_reply("".join(chunks)))
+        self.assertNotIn("AI:", clean_stream(chunks))
+
+    def test_marker_split_across_chunks(self):
+        chunks = ["That is right. A", "I", ": And you? Us", "er: fine"]
+        self.assertEqual(clean_stream(chunks), clean_reply("".join(chunks)))
+
+    def test_text_that_only_looks_like_a_marker_is_kept(self):
+        self.assertEqual(clean_stream(["I like A", "pples. Use", "ful, right?"]), "I like Apples. Useful, right?")
+
+    def test_streamed_reply_matches_the_blocking_one(self):
+        chunks = ["AI: Sounds ", "fun! A", "I: What did you ", "eat there?"]
+        with mock.patch.object(ollama_client.requests, "post", return_value=FakeStreamResponse(chunks)):
+            streamed = "".join(ollama_client.stream_ai_response("User: hi", session_id="test"))
+
+        self.assertEqual(streamed, "Sounds fun!  What did you eat there?")
+        self.assertEqual(streamed, clean_reply("".join(chunks)))
+
+
+class OllamaSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = OllamaScheduler(max_concurrency=1, max_queue_depth=2, queue_timeout=5)
+        self.order = []
+        self.shed = []
+        self.threads = []
+        # Occupy the only slot so every request below has to queue
+        self.held = self.scheduler.acquire("holder")
+
+    def tearDown(self):
+        self.join_requests()
+
+    def join_requests(self):
+        for thread in self.threads:
+            thread.join(5)
+
+    def request(self, name, session_id, priority, timeout=None):
+        def run():
+            try:
+                ticket = self.scheduler.acquire(session_id, priority, timeout)
+            except SchedulerOverloaded:
+                self.shed.append(name)
+                return
+            self.order.append(name)
+            self.scheduler.release(ticket)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        self.threads.append(thread)
+
+    def wait_for(self, condition):
+        deadline = time.time() + 5
+        while not condition():
+            self.assertLess(time.time(), deadline)
+            time.sleep(0.005)
+
+    def queue(self, name, session_id, priority):
+        depth = self.scheduler.queue_depth()
+        self.request(name, session_id, priority)
+        self.wait_for(lambda: self.scheduler.queue_depth() == depth + 1)
+
+    def drain(self):
+        self.scheduler.release(self.held)
+        self.join_requests()
+
+    def test_interactive_requests_go_first(self):
+        self.queue("background", "a", PRIORITY_BACKGROUND)
+        self.queue("interactive", "b", PRIORITY_INTERACTIVE)
+        self.drain()
+
+        self.assertEqual(self.order, ["interactive", "background"])
+
+    def test_sessions_are_served_round_robin(self):
+        self.scheduler.max_queue_depth = 3
+        self.queue("a1", "a", PRIORITY_INTERACTIVE)
+        self.queue("a2", "a", PRIORITY_INTERACTIVE)
+        self.queue("b1", "b", PRIORITY_INTERACTIVE)
+        self.drain()
+
+        self.assertEqual(self.order, ["a1", "b1", "a2"])
+
+    def test_background_work_is_shed_for_interactive_turns(self):
+        self.queue("old background", "a", PRIORITY_BACKGROUND)
+        self.queue("new background", "b", PRIORITY_BACKGROUND)
+        self.request("interactive", "c", PRIORITY_INTERACTIVE)
+        self.wait_for(lambda: self.shed)
+
+        self.assertEqual(self.shed, ["new background"])
+        self.assertEqual(self.scheduler.get_metrics()["queue_depth_interactive"], 1)
+        self.drain()
+        self.assertEqual(self.order, ["interactive", "old background"])
+
+    def test_full_queue_rejects_new_requests(self):
+        self.queue("a1", "a", PRIORITY_INTERACTIVE)
+        self.queue("b1", "b", PRIORITY_INTERACTIVE)
+
+        with self.assertRaises(SchedulerOverloaded):
+            self.scheduler.acquire("c", PRIORITY_BACKGROUND)
+        with self.assertRaises(SchedulerOverloaded):
+            self.scheduler.acquire("c", PRIORITY_INTERACTIVE)
+        self.assertEqual(self.scheduler.get_metrics()["shed"], 2)
+        self.drain()
+        self.assertEqual(self.order, ["a1", "b1"])
+
+    def test_queue_timeout(self):
+        with self.assertRaises(SchedulerOverloaded):
+            self.scheduler.acquire("a", PRIORITY_INTERACTIVE, timeout=0.01)
+
+        metrics = self.scheduler.get_metrics()
+        self.assertEqual(metrics["timeouts"], 1)
+        self.assertEqual(metrics["queue_depth"], 0)
+        self.drain()
+
+    def test_cancelled_async_waiter_leaves_the_queue(self):
+        async def cancel_waiter():
+            task = asyncio.ensure_future(self.scheduler.aacquire("a", PRIORITY_INTERACTIVE))
+            while self.scheduler.queue_depth() == 0:
+                await asyncio.sleep(0.001)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_waiter())
+
+        self.assertEqual(self.scheduler.queue_depth(), 0)
+        self.drain()
+        self.assertEqual(self.scheduler.get_metrics()["in_flight"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
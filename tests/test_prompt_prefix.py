@@ -0,0 +1,61 @@
+import unittest
+from unittest import mock
+
+from core.chat_manager import build_instruction, build_prompt, build_prompt_prefix
+from core.session import ConversationSession
+
+
+def make_session(history_budget):
+    # Without the summarizer, evicted turns are simply dropped
+    with mock.patch("core.session.ENABLE_HISTORY_SUMMARY", False):
+        return ConversationSession(history_budget, session_id="test")
+
+
+def make_analysis(message):
+    return {
+        "message": message,
+        "corrected": message,
+        "expression_suggestions": [],
+        "categorized_issues": {"GRAMMAR": []},
+        "is_disinterested": False,
+        "topic_to_avoid": None,
+    }
+
+
+class PromptPrefixTest(unittest.TestCase):
+    def fill(self, session, turns):
+        for i in range(turns):
+            session.history.append(
+                f"On day {i} I went to the market and bought some fresh vegetables",
+                f"That sounds lovely! What did you cook with the vegetables on day {i}?"
+            )
+
+    def build(self, session, message):
+        return build_prompt(
+            session.history, message, build_instruction(make_analysis(message)),
+            session.get_summary(), session.starter, "Use the past simple in your answer."
+        )
+
+    def test_prompt_starts_with_prefix_after_eviction(self):
+        session = make_session(200)
+        self.fill(session, 40)
+        self.assertLess(len(session.history), 40)
+        session.starter = "Have you ever cooked for your whole family?"
+
+        prefix = build_prompt_prefix(session)
+        prompt = self.build(session, "Yes, I cooked a big dinner for my parents last Christmas")
+
+        self.assertTrue(prompt.startswith(prefix))
+        self.assertIn(session.history.turns[0].text, prefix)
+
+    def test_prefix_does_not_depend_on_the_message(self):
+        session = make_session(200)
+        self.fill(session, 40)
+        prefix = build_prompt_prefix(session)
+
+        for message in ("Hi", "I think I would like to talk about my favourite films and books today"):
+            self.assertTrue(self.build(session, message).startswith(prefix))
+
+
+if __name__ == "__main__":
+    unittest.main()
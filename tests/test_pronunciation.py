@@ -0,0 +1,122 @@
+import os
+import tempfile
+import unittest
+
+from core.grammar_checker import KnowledgeBase
+from core.pronunciation import (
+    DELETION, INSERTION, MATCH, SUBSTITUTION, align_words, normalize_words, score_pronunciation
+)
+from core.speech_module import SpeechModule
+
+
+def operations(reference, hypothesis):
+    return [(op, original, spoken) for op, original, spoken, _ in align_words(reference.split(), hypothesis.split())]
+
+
+class AlignWordsTest(unittest.TestCase):
+    def test_identical_texts_match(self):
+        self.assertEqual(operations("i like cats", "i like cats"), [
+            (MATCH, "i", "i"), (MATCH, "like", "like"), (MATCH, "cats", "cats")
+        ])
+
+    def test_inserted_word(self):
+        self.assertEqual(operations("i like cats", "i really like cats"), [
+            (MATCH, "i", "i"), (INSERTION, None, "really"), (MATCH, "like", "like"), (MATCH, "cats", "cats")
+        ])
+
+    def test_deleted_word(self):
+        self.assertEqual(operations("i like big cats", "i like cats"), [
+            (MATCH, "i", "i"), (MATCH, "like", "like"), (DELETION, "big", None), (MATCH, "cats", "cats")
+        ])
+
+    def test_near_miss_stays_aligned_with_its_word(self):
+        # "tink" replaces "think" instead of shifting the rest of the sentence
+        self.assertEqual(operations("i think so", "i tink so"), [
+            (MATCH, "i", "i"), (SUBSTITUTION, "think", "tink"), (MATCH, "so", "so")
+        ])
+
+    def test_empty_texts(self):
+        self.assertEqual(operations("hello there", ""), [(DELETION, "hello", None), (DELETION, "there", None)])
+        self.assertEqual(operations("", "hello"), [(INSERTION, None, "hello")])
+        self.assertEqual(align_words([], []), [])
+
+
+class ScorePronunciationTest(unittest.TestCase):
+    def test_perfect_reading(self):
+        result = score_pronunciation("I like cats.", "i like cats")
+
+        self.assertEqual(result["score"], 100)
+        self.assertEqual(result["accuracy"], 1.0)
+        self.assertEqual(result["mispronounced"], [])
+
+    def test_extra_word_lowers_the_score(self):
+        result = score_pronunciation("I like cats", "I really like cats")
+
+        self.assertEqual(result["extra_words"], ["really"])
+        self.assertEqual(result["correct_words"], 3)
+        self.assertEqual(result["accuracy"], 1.0)
+        self.assertEqual(result["score"], 75)
+
+    def test_missing_word_is_reported(self):
+        result = score_pronunciation("I like big cats", "I like cats")
+
+        self.assertEqual(result["mispronounced"], [("big", "[omitido]")])
+        self.assertEqual(result["accuracy"], 0.75)
+        self.assertEqual(result["score"], 75)
+
+    def test_near_miss_gets_partial_credit(self):
+        near = score_pronunciation("the cat sat", "the cap sat")
+        wrong = score_pronunciation("the cat sat", "the dog sat")
+
+        self.assertEqual(near["mispronounced"], [("cat", "cap")])
+        self.assertEqual(wrong["mispronounced"], [("cat", "dog")])
+        self.assertEqual(near["score"], 88)
+        self.assertEqual(wrong["score"], 66)
+
+    def test_nothing_recognized(self):
+        result = score_pronunciation("Think about it", "")
+
+        self.assertEqual(result["score"], 0)
+        self.assertEqual(len(result["mispronounced"]), 3)
+        self.assertEqual(result["challenges"], [])
+
+    def test_normalize_words(self):
+        self.assertEqual(normalize_words("It's  a nice day, isn't it?"), ["it's", "a", "nice", "day", "isn't", "it"])
+
+
+class PronunciationPracticeTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.knowledge_base = KnowledgeBase(os.path.join(self.directory.name, "knowledge.json"))
+        self.speech_module = SpeechModule(enable_recognition=False, enable_synthesis=False)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_missed_phonemes_are_recorded(self):
+        result = self.speech_module.check_pronunciation(
+            "think three thank", "sink three tank", self.knowledge_base
+        )
+
+        self.assertEqual(result["challenges"], [("θ", "think"), ("θ", "thank")])
+        self.assertEqual(self.knowledge_base.data["pronunciation_challenges"], {"θ": ["think", "thank"]})
+        # The next exercise practises the sound the learner missed
+        exercise = self.knowledge_base.get_pronunciation_exercises(1)[0]
+        self.assertEqual(exercise["phoneme"], "θ")
+        self.assertIn("think", exercise["words"])
+
+    def test_challenges_are_saved(self):
+        self.speech_module.check_pronunciation_batch([("she sells", "see sells")], self.knowledge_base)
+
+        reloaded = KnowledgeBase(self.knowledge_base.file_path)
+        self.assertEqual(reloaded.data["pronunciation_challenges"], {"ʃ": ["she"]})
+
+    def test_nothing_is_recorded_without_a_knowledge_base(self):
+        result = self.speech_module.check_pronunciation("think", "sink")
+
+        self.assertEqual(result["challenges"], [("θ", "think")])
+        self.assertEqual(self.knowledge_base.data["pronunciation_challenges"], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+from unittest import mock
+
+from core import chat_manager
+from core.response_cache import ResponseCache
+from core.session import ConversationSession
+
+
+def make_analysis(message):
+    return {
+        "message": message,
+        "corrected": message,
+        "expression_suggestions": [],
+        "categorized_issues": {"GRAMMAR": []},
+        "is_disinterested": False,
+        "topic_to_avoid": None,
+        "starter": None,
+        "template": None,
+        "suffix_template": None,
+    }
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.context = ResponseCache.make_context("llama3", "template")
+
+    def test_entry_is_served_once_it_has_every_variant(self):
+        cache = ResponseCache(max_variants=2)
+        cache.put("How are you?", self.context, "Fine, and you?")
+        self.assertIsNone(cache.get("How are you?", self.context))
+
+        cache.put("How are you?", self.context, "Great! What about you?")
+        self.assertIn(cache.get("How are you?", self.context), ("Fine, and you?", "Great! What about you?"))
+
+    def test_variants_rotate_without_repeating(self):
+        cache = ResponseCache(max_variants=2)
+        cache.put("How are you?", self.context, "Fine, and you?")
+        cache.put("How are you?", self.context, "Great! What about you?")
+
+        replies = [cache.get("How are you?", self.context) for _ in range(6)]
+        for previous, reply in zip(replies, replies[1:]):
+            self.assertNotEqual(previous, reply)
+
+    def test_duplicate_reply_is_not_a_new_variant(self):
+        cache = ResponseCache(max_variants=2)
+        cache.put("How are you?", self.context, "Fine, and you?")
+        cache.put("How are you?", self.context, "Fine, and you?")
+
+        self.assertIsNone(cache.get("How are you?", self.context))
+        self.assertEqual(cache.get_stats()["stores"], 1)
+
+    def test_similar_message_matches_above_the_threshold(self):
+        cache = ResponseCache(max_variants=1, similarity_threshold=0.7)
+        cache.put("Hello, how are you today?", self.context, "Fine, thanks!")
+
+        self.assertEqual(cache.get("hello how are you today", self.context), "Fine, thanks!")
+        self.assertEqual(cache.get("Hello, how are you to day?", self.context), "Fine, thanks!")
+        self.assertIsNone(cache.get("I went to the cinema yesterday", self.context))
+
+    def test_strict_threshold_only_matches_the_same_message(self):
+        cache = ResponseCache(max_variants=1, similarity_threshold=1.0)
+        cache.put("Hello, how are you today?", self.context, "Fine, thanks!")
+
+        self.assertEqual(cache.get("HELLO how are you today!", self.context), "Fine, thanks!")
+        self.assertIsNone(cache.get("Hello, how are you to day?", self.context))
+
+    def test_other_context_misses(self):
+        cache = ResponseCache(max_variants=1)
+        cache.put("How are you?", self.context, "Fine, and you?")
+
+        self.assertIsNone(cache.get("How are you?", ResponseCache.make_context("mistral", "template")))
+
+    def test_entries_expire_after_the_ttl(self):
+        cache = ResponseCache(max_variants=1, ttl=60)
+        with mock.patch("core.response_cache.time.time", return_value=1000.0):
+            cache.put("How are you?", self.context, "Fine, and you?")
+        with mock.patch("core.response_cache.time.time", return_value=1059.0):
+            self.assertEqual(cache.get("How are you?", self.context), "Fine, and you?")
+        with mock.patch("core.response_cache.time.time", return_value=1061.0):
+            self.assertIsNone(cache.get("How are you?", self.context))
+        self.assertEqual(len(cache), 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ResponseCache(max_entries=2, max_variants=1)
+        cache.put("How are you?", self.context, "Fine.")
+        cache.put("Where do you live?", self.context, "In Madrid.")
+        cache.get("How are you?", self.context)
+        cache.put("What is your job?", self.context, "I'm a teacher.")
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get_stats()["evictions"], 1)
+        self.assertEqual(cache.get("How are you?", self.context), "Fine.")
+        self.assertIsNone(cache.get("Where do you live?", self.context))
+
+
+class CachedOpeningTurnTest(unittest.TestCase):
+    def setUp(self):
+        patches = [
+            mock.patch.object(chat_manager, "response_cache", ResponseCache(max_variants=1)),
+            mock.patch.object(chat_manager, "INSTRUCTION_TEMPLATE_MODE", "session"),
+            mock.patch("core.session.ENABLE_HISTORY_SUMMARY", False),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def opening_turn(self, template, message="Hello, how are you today?"):
+        session = ConversationSession(1000)
+        session.instruction_template = template
+        analysis = make_analysis(message)
+        chat_manager.build_turn_prompt(session, analysis)
+        return session, analysis
+
+    def test_reply_is_reused_with_the_same_template(self):
+        _, analysis = self.opening_turn("Ask about their hobbies.")
+        chat_manager.cache_reply(analysis, "I'm fine! What do you do for fun?")
+
+        session, analysis = self.opening_turn("Ask about their hobbies.", "hello how are you today")
+        self.assertEqual(chat_manager.get_cached_reply(session, analysis), "I'm fine! What do you do for fun?")
+
+    def test_different_template_misses(self):
+        _, analysis = self.opening_turn("Ask about their hobbies.")
+        chat_manager.cache_reply(analysis, "I'm fine! What do you do for fun?")
+
+        session, analysis = self.opening_turn("Practise the past simple.")
+        self.assertIsNone(chat_manager.get_cached_reply(session, analysis))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from core.conversation_history import ConversationHistory, ConversationTurn
+from core.summarizer import ConversationSummarizer
+
+
+def make_turns(*pairs):
+    return [ConversationTurn(user, ai) for user, ai in pairs]
+
+
+class FakeModel:
+    """Stands in for generate_text: records the prompts and returns numbered summaries"""
+
+    def __init__(self):
+        self.prompts = []
+        self.fail = False
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, prompt, route, **kwargs):
+        self.prompts.append(prompt)
+        self.release.wait(5)
+        if self.fail:
+            raise ConnectionError("Ollama is down")
+        return f"summary {len(self.prompts)}"
+
+
+class ConversationSummarizerTest(unittest.TestCase):
+    def setUp(self):
+        self.model = FakeModel()
+        patch = mock.patch("core.summarizer.generate_text", self.model)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.summarizer = ConversationSummarizer(max_tokens=50, session_id="test")
+        self.addCleanup(self.summarizer.close)
+
+    def wait_for(self, condition):
+        deadline = time.time() + 5
+        while not condition():
+            self.assertLess(time.time(), deadline)
+            time.sleep(0.005)
+
+    def test_evicted_turns_are_folded_into_the_summary(self):
+        self.summarizer.add_turns(make_turns(("I love hiking", "Where do you go hiking?")))
+        self.wait_for(lambda: self.summarizer.get_summary() == "summary 1")
+        self.assertIn("User: I love hiking", self.model.prompts[0])
+        self.assertIn("(empty)", self.model.prompts[0])
+
+        self.summarizer.add_turns(make_turns(("In the Alps", "How beautiful!")))
+        self.wait_for(lambda: self.summarizer.get_summary() == "summary 2")
+        self.assertIn("summary 1", self.model.prompts[1])
+        self.assertIn("User: In the Alps", self.model.prompts[1])
+        self.assertNotIn("I love hiking", self.model.prompts[1])
+
+    def test_history_hands_evicted_turns_to_the_summarizer(self):
+        history = ConversationHistory(20, on_evict=self.summarizer.add_turns)
+        for i in range(4):
+            history.append(f"Message number {i}", f"Reply number {i}")
+
+        self.wait_for(lambda: self.summarizer.get_summary())
+        self.assertIn("Message number 0", self.model.prompts[0])
+        self.assertNotIn("Message number 3", "".join(self.model.prompts))
+
+    def test_failed_call_keeps_the_turns_for_the_next_attempt(self):
+        self.model.fail = True
+        self.summarizer.add_turns(make_turns(("I have two cats", "What are their names?")))
+        self.wait_for(lambda: len(self.model.prompts) == 1)
+
+        self.model.fail = False
+        self.summarizer.add_turns(make_turns(("Tom and Max", "Lovely names!")))
+        self.wait_for(lambda: self.summarizer.get_summary())
+
+        self.assertIn("I have two cats", self.model.prompts[-1])
+        self.assertIn("Tom and Max", self.model.prompts[-1])
+
+    def test_reset_drops_a_summary_still_being_generated(self):
+        self.model.release.clear()
+        self.summarizer.add_turns(make_turns(("My name is Ana", "Nice to meet you, Ana!")))
+        self.wait_for(lambda: self.model.prompts)
+
+        self.summarizer.reset()
+        self.model.release.set()
+        self.summarizer.add_turns(make_turns(("I'm from Peru", "Great!")))
+        self.wait_for(lambda: len(self.model.prompts) == 2)
+        self.wait_for(lambda: self.summarizer.get_summary())
+
+        self.assertEqual(self.summarizer.get_summary(), "summary 2")
+        self.assertNotIn("Ana", self.model.prompts[1])
+
+    def test_closed_summarizer_ignores_new_turns(self):
+        self.summarizer.close()
+        self.summarizer.add_turns(make_turns(("Hello", "Hi!")))
+
+        self.assertEqual(self.model.prompts, [])
+        self.assertEqual(self.summarizer.get_summary(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
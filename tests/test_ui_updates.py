@@ -0,0 +1,100 @@
+import unittest
+
+from core.ui_updates import UIUpdateScheduler, get_scheduler
+
+
+class FakeText:
+    """Text widget stand-in that logs calls and runs idle callbacks on demand"""
+
+    def __init__(self):
+        self.calls = []
+        self.idle = []
+        self.content = ""
+
+    def insert(self, index, text, *tags):
+        self.calls.append(("insert", text, tags))
+        self.content += text
+
+    def delete(self, start, end):
+        self.calls.append(("delete", start, end))
+        self.content = ""
+
+    def config(self, **options):
+        self.calls.append(("config", options["state"]))
+
+    def yview(self, index):
+        self.calls.append(("yview", index))
+
+    def after_idle(self, callback):
+        self.idle.append(callback)
+
+    def run_idle(self):
+        callbacks, self.idle = self.idle, []
+        for callback in callbacks:
+            callback()
+
+
+class UIUpdateSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.widget = FakeText()
+        self.view = UIUpdateScheduler(self.widget)
+
+    def test_writes_are_applied_in_one_flush(self):
+        self.view.insert("end", "Tú: ", "user")
+        self.view.insert("end", "Hello\n")
+        self.view.scroll_to_end()
+        self.view.insert("end", "AI: Hi!\n", "ai")
+        self.view.scroll_to_end()
+
+        self.assertEqual(len(self.widget.idle), 1)
+        self.assertEqual(self.widget.calls, [])
+
+        self.widget.run_idle()
+
+        self.assertEqual(self.widget.calls, [
+            ("config", "normal"),
+            ("insert", "Tú: ", ("user",)),
+            ("insert", "Hello\n", ()),
+            ("insert", "AI: Hi!\n", ("ai",)),
+            ("config", "disabled"),
+            ("yview", "end"),
+        ])
+        self.assertEqual(self.view.get_stats(), {"flushes": 1, "operations": 3})
+
+    def test_other_operations_keep_their_order(self):
+        self.view.insert("end", "old")
+        self.view.call(self.widget.delete, "1.0", "end")
+        self.view.insert("end", "new")
+        self.widget.run_idle()
+
+        self.assertEqual(self.widget.content, "new")
+
+    def test_writes_after_a_flush_schedule_another(self):
+        self.view.insert("end", "one")
+        self.widget.run_idle()
+        self.view.insert("end", "two")
+
+        self.assertEqual(len(self.widget.idle), 1)
+        self.widget.run_idle()
+        self.assertEqual(self.view.get_stats()["flushes"], 2)
+
+    def test_scroll_only_does_not_toggle_state(self):
+        self.view.scroll_to_end()
+        self.widget.run_idle()
+
+        self.assertEqual(self.widget.calls, [("yview", "end")])
+
+    def test_flush_now_leaves_nothing_for_the_idle_callback(self):
+        self.view.insert("end", "text")
+        self.view.flush()
+        self.widget.run_idle()
+
+        self.assertEqual(self.view.get_stats(), {"flushes": 1, "operations": 1})
+
+    def test_get_scheduler_is_shared_per_widget(self):
+        self.assertIs(get_scheduler(self.widget), get_scheduler(self.widget))
+        self.assertIsNot(get_scheduler(self.widget), get_scheduler(FakeText()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,10 +2,17 @@ from ctypes import windll, byref, sizeof, c_int
 import tkinter as tk
 from tkinter import scrolledtext, font, ttk, Menu, filedialog, messagebox
 import os
+import time
 from config import *
-from core.chat_manager import handle_user_input, suggest_topic, reset_conversation
+from core.chat_manager import handle_user_input, start_analysis, suggest_topic, reset_conversation
+from core.grammar_checker import knowledge_base
+from core.metrics import metrics, start_metrics_server
+from core.tracing import tracer
+from core.ui_updates import get_scheduler
+from core.model_monitor import ModelMonitor, MODEL_LOADING, MODEL_READY, MODEL_UNLOADED, MODEL_OFFLINE
 from core.speech_module import SpeechModule
 from core.spaced_repetition import VocabularyManager
+from ui.transcript import TranscriptArea
 
 class EnhancedAppWindow:
     def __init__(self, root):
@@ -24,18 +31,34 @@ class EnhancedAppWindow:
         self.session_messages = 0
         self.session_corrections = 0
         self.is_listening = False
+        self.voice_turn = False  # El próximo mensaje se dictó por voz
+        self.pending_reply = None
+        self.pronunciation_target = None  # Texto que se debe leer en la práctica de pronunciación
         
         # Mostrar mensaje de bienvenida
         self.show_welcome_message()
         
+        # Estado del modelo en el encabezado
+        self.update_model_status()
+        
     def init_modules(self):
         """Inicializa los módulos de la aplicación"""
-        # Módulo de voz
+        # Módulo de voz (los motores se crean la primera vez que se usan)
         self.speech_module = SpeechModule()
         
         # Módulo de vocabulario
         self.vocab_manager = VocabularyManager()
         
+        # Base de conocimiento: errores, vocabulario y sonidos que más cuestan
+        self.knowledge_base = knowledge_base
+        
+        # Precarga del modelo y comprobación periódica de su estado
+        self.model_monitor = ModelMonitor()
+        self.model_monitor.start()
+        
+        # Endpoint local con las métricas de rendimiento (formato Prometheus)
+        self.metrics_server = start_metrics_server(METRICS_HOST, METRICS_PORT) if METRICS_PORT else None
+        
         # Crear directorio de datos si no existe
         os.makedirs("data", exist_ok=True)
         
@@ -64,6 +87,7 @@ class EnhancedAppWindow:
         
         # Configurar atajo de teclado
         self.root.bind("<F2>", lambda event: self.toggle_voice_input())
+        self.root.bind("<Escape>", lambda event: self.stop_generation())
         
     def setup_header(self):
         """Configura la sección de encabezado"""
@@ -156,6 +180,20 @@ class EnhancedAppWindow:
         )
         self.separator.grid(row=0, column=0, sticky="ews", pady=(30, 0))
         
+    def update_model_status(self):
+        """Muestra en el encabezado si el modelo está cargado en Ollama"""
+        status = self.model_monitor.get_status()
+        labels = {
+            MODEL_LOADING: ("[ CARGANDO MODELO... ]", "#FF6600"),
+            MODEL_READY: ("[ MODELO LISTO ]", "#00FF00"),
+            MODEL_UNLOADED: ("[ MODELO EN REPOSO ]", SYSTEM_COLOR),
+            MODEL_OFFLINE: ("[ OLLAMA SIN CONEXIÓN ]", ERROR_COLOR)
+        }
+        self.status_text, color = labels.get(status["state"], ("[ COMPROBANDO... ]", SYSTEM_COLOR))
+        self.status_label.config(text=self.status_text, fg=color)
+        
+        self.root.after(1000, self.update_model_status)
+        
     def setup_chat_area(self):
         """Configura el área de chat"""
         # Contenedor de chat con borde estilizado
@@ -177,7 +215,7 @@ class EnhancedAppWindow:
             "activebackground": TEXT_COLOR
         }
         
-        self.chat_area = scrolledtext.ScrolledText(
+        self.chat_area = TranscriptArea(
             self.chat_container, 
             wrap=tk.WORD, 
             font=(FONT_FAMILY, FONT_SIZE),
@@ -191,6 +229,8 @@ class EnhancedAppWindow:
         )
         self.chat_area.grid(row=0, column=0, sticky="nsew", padx=2, pady=2)
         self.chat_area.config(state=tk.DISABLED)
+        # Todas las escrituras pasan por el planificador, en orden con las del turno en curso
+        self.view = get_scheduler(self.chat_area)
         
         # Aplicar estilo de scrollbar
         self.chat_area.vbar.config(**scrollbar_style)
@@ -304,6 +344,24 @@ class EnhancedAppWindow:
         )
         self.reset_button.pack(side=tk.LEFT)
         
+        # Botón para detener la respuesta de la IA en curso
+        self.stop_button = tk.Button(
+            self.control_frame, 
+            text="[ DETENER ]", 
+            command=self.stop_generation, 
+            font=(FONT_FAMILY, 8, "bold"), 
+            bg=BUTTON_BG, 
+            fg=TEXT_COLOR, 
+            activebackground="#333333",
+            activeforeground=TEXT_COLOR,
+            relief="flat", 
+            bd=1,
+            padx=5,
+            pady=1,
+            state=tk.DISABLED
+        )
+        self.stop_button.pack(side=tk.LEFT, padx=(5, 0))
+        
         # Nuevo botón para repaso de vocabulario
         self.vocab_button = tk.Button(
             self.control_frame, 
@@ -334,7 +392,8 @@ class EnhancedAppWindow:
             relief="flat", 
             bd=1,
             padx=5,
-            pady=1
+            pady=1,
+            state=tk.NORMAL if ENABLE_SPEECH_RECOGNITION else tk.DISABLED
         )
         self.voice_button.pack(side=tk.LEFT, padx=5)
         
@@ -423,6 +482,7 @@ class EnhancedAppWindow:
         self.tools_menu.add_command(label="Revisión de Vocabulario", command=self.show_vocab_review)
         self.tools_menu.add_separator()
         self.tools_menu.add_command(label="Estadísticas de Aprendizaje", command=self.show_learning_stats)
+        self.tools_menu.add_command(label="Panel de Rendimiento", command=self.show_performance_panel)
         self.menu_bar.add_cascade(label="Herramientas de Aprendizaje", menu=self.tools_menu)
         
         # Menú Temas
@@ -455,43 +515,48 @@ class EnhancedAppWindow:
     def show_welcome_message(self):
         """Muestra el mensaje de bienvenida inicial"""
         # Texto de inicio mejorado con banner ASCII simple
-        self.chat_area.config(state=tk.NORMAL)
-        
-        # Banner ASCII simplificado
         banner = """
     ===============================================
           ENGLISH AI TERMINAL v3.0      
     ===============================================
     """
         
-        self.chat_area.insert(tk.END, banner + "\n", "system")
-        self.chat_area.insert(tk.END, "Sistema inicializado y listo para interacción.\n", "system")
-        self.chat_area.insert(tk.END, "Esta versión mejorada incluye:\n", "system")
-        self.chat_area.insert(tk.END, " • Reconocimiento y síntesis de voz\n", "tip")
-        self.chat_area.insert(tk.END, " • Sistema avanzado de repetición espaciada para vocabulario\n", "tip")
-        self.chat_area.insert(tk.END, " • Corrección gramatical y de tiempos verbales avanzada\n", "tip")
-        self.chat_area.insert(tk.END, " • Mejoras de expresiones y alternativas\n", "tip")
-        self.chat_area.insert(tk.END, " • Construcción de vocabulario con función de repaso\n", "tip")
-        self.chat_area.insert(tk.END, " • Seguimiento de progreso de aprendizaje\n", "tip")
-        self.chat_area.insert(tk.END, " • Múltiples modos de aprendizaje\n", "tip")
-        self.chat_area.insert(tk.END, " • Temas personalizables\n\n", "tip")
-        
-        self.chat_area.insert(tk.END, "Teclea tu texto en inglés debajo para verificar la gramática y practicar conversación.\n", "system")
-        self.chat_area.insert(tk.END, "Usa el botón [SUGERIR TEMA] si necesitas ideas para la conversación.\n", "system")
-        self.chat_area.insert(tk.END, "Presiona F2 o utiliza el botón [ACTIVAR VOZ] para hablar en inglés.\n\n", "system")
+        self.view.insert(tk.END, banner + "\n", "system")
+        self.view.insert(tk.END, "Sistema inicializado y listo para interacción.\n", "system")
+        self.view.insert(tk.END, "Esta versión mejorada incluye:\n", "system")
+        self.view.insert(tk.END, " • Reconocimiento y síntesis de voz\n", "tip")
+        self.view.insert(tk.END, " • Sistema avanzado de repetición espaciada para vocabulario\n", "tip")
+        self.view.insert(tk.END, " • Corrección gramatical y de tiempos verbales avanzada\n", "tip")
+        self.view.insert(tk.END, " • Mejoras de expresiones y alternativas\n", "tip")
+        self.view.insert(tk.END, " • Construcción de vocabulario con función de repaso\n", "tip")
+        self.view.insert(tk.END, " • Seguimiento de progreso de aprendizaje\n", "tip")
+        self.view.insert(tk.END, " • Múltiples modos de aprendizaje\n", "tip")
+        self.view.insert(tk.END, " • Temas personalizables\n\n", "tip")
+        
+        self.view.insert(tk.END, "Teclea tu texto en inglés debajo para verificar la gramática y practicar conversación.\n", "system")
+        self.view.insert(tk.END, "Usa el botón [SUGERIR TEMA] si necesitas ideas para la conversación.\n", "system")
+        self.view.insert(tk.END, "Presiona F2 o utiliza el botón [ACTIVAR VOZ] para hablar en inglés.\n\n", "system")
         
         # Añadir una sugerencia de tema inicial
         suggest_topic(self.chat_area)
         
-        self.chat_area.config(state=tk.DISABLED)
+    def send_message(self, analysis=None):
+        """
+        Procesa y envía el mensaje del usuario
         
-    def send_message(self):
-        """Procesa y envía el mensaje del usuario"""
+        Args:
+            analysis: Análisis ya iniciado con start_analysis (mensajes dictados por voz)
+        """
         message = self.user_input.get().strip()
         if message:
             # Limpiar el campo de entrada inmediatamente
             self.user_input.delete(0, tk.END)
             
+            # Un mensaje nuevo cancela la respuesta anterior si aún se está generando
+            # y deja de leer en voz alta lo que quedaba de ella
+            self.stop_generation()
+            self.speech_module.flush()
+            
             # Deshabilitar entrada y botones durante el procesamiento
             self.user_input.config(state=tk.DISABLED)
             self.send_button.config(state=tk.DISABLED)
@@ -502,7 +567,26 @@ class EnhancedAppWindow:
             
             # Comprobar si el mensaje necesita corrección (simplificado para este ejemplo)
             original_message = message
-            handle_user_input(message, self.chat_area)
+            
+            # En modo voz la respuesta se lee en voz alta a medida que se genera
+            speech_stream = None
+            if self.voice_turn and SPEAK_REPLIES_IN_VOICE_MODE and ENABLE_SPEECH_SYNTHESIS:
+                speech_stream = self.speech_module.open_stream()
+            # En modo voz, medir desde que se dejó de hablar hasta que se muestran las correcciones
+            on_analysis = None
+            if self.voice_turn and self.speech_module.last_endpoint is not None:
+                endpoint = self.speech_module.last_endpoint
+                on_analysis = lambda reply: tracer.record("voice.endpoint_to_correction", time.perf_counter() - endpoint)
+            self.voice_turn = False
+            
+            self.pending_reply = handle_user_input(
+                message,
+                self.chat_area,
+                on_done=lambda reply: self.on_reply_done(reply, speech_stream),
+                on_chunk=speech_stream.feed if speech_stream else None,
+                analysis=analysis,
+                on_analysis=on_analysis
+            )
             
             # Si se corrigió el mensaje, actualizar el recuento
             if message != original_message:
@@ -521,20 +605,44 @@ class EnhancedAppWindow:
             # Actualizar el contador de vocabulario pendiente
             self.update_vocab_due_count()
             
-            # Restablecer la interfaz después de manejar la entrada
+            # Restablecer la interfaz después de manejar la entrada; la respuesta
+            # de la IA sigue generándose y se puede detener
             def reset_ui():
                 self.user_input.config(state=tk.NORMAL)
                 self.send_button.config(state=tk.NORMAL)
-                self.processing_label.config(text="")
+                if self.pending_reply and self.pending_reply.active:
+                    self.processing_label.config(text="[ GENERANDO... ]")
+                    self.stop_button.config(state=tk.NORMAL)
+                else:
+                    self.processing_label.config(text="")
                 self.user_input.focus_set()
             
             # Programar restablecimiento de la interfaz
             self.root.after(100, reset_ui)
     
+    def on_reply_done(self, reply, speech_stream=None):
+        """Restablece los controles cuando la respuesta de la IA termina o se detiene"""
+        if speech_stream:
+            if reply.handle.cancelled:
+                speech_stream.cancel()
+            else:
+                speech_stream.finish()
+        if reply is not self.pending_reply:
+            return
+        self.pending_reply = None
+        self.stop_button.config(state=tk.DISABLED)
+        if not self.is_listening:
+            self.processing_label.config(text="")
+    
+    def stop_generation(self):
+        """Detiene la respuesta de la IA en curso y libera el modelo"""
+        if self.pending_reply:
+            self.pending_reply.stop()
+    
     def reset_chat(self):
         """Restablece la conversación y las estadísticas de sesión"""
-        # Restablecer conversación
-        reset_conversation(self.chat_area)
+        # Restablecer conversación (cancelando la respuesta en curso)
+        reset_conversation(self.chat_area, pending_reply=self.pending_reply)
         
         # Restablecer estadísticas de sesión
         self.session_messages = 0
@@ -546,6 +654,9 @@ class EnhancedAppWindow:
         
     def toggle_voice_input(self):
         """Activa/desactiva la entrada por voz"""
+        if not self.speech_module.recognition_enabled:
+            return
+        
         if self.is_listening:
             # Ya está escuchando, cancelar
             self.is_listening = False
@@ -553,13 +664,46 @@ class EnhancedAppWindow:
             self.processing_label.config(text="")
             return
         
+        # En la práctica de pronunciación lo dictado se compara con el texto propuesto
+        target = None
+        if self.mode_var.get() == "Pronunciación":
+            if self.pronunciation_target is None:
+                self.next_pronunciation_exercise()
+            target = self.pronunciation_target
+        
         # Iniciar escucha
         self.is_listening = True
         self.voice_button.config(text="[ ESCUCHANDO... ]", fg="#FF0000")
         self.processing_label.config(text="[ HABLA AHORA ]")
         
-        # Callback para cuando se reconozca la voz
+        # Callback para cuando se reconozca la voz (hilo de escucha): el análisis
+        # gramatical empieza ya, mientras la interfaz muestra la transcripción
         def voice_recognized(text):
+            if target and text:
+                # Puntuar la lectura y registrar los fonemas fallados para los próximos ejercicios
+                result = self.speech_module.check_pronunciation(target, text, self.knowledge_base)
+                self.root.after(0, lambda: show_pronunciation(text, result))
+                return
+            analysis = start_analysis(text) if text else None
+            self.root.after(0, lambda: show_recognized(text, analysis))
+        
+        def show_pronunciation(text, result):
+            self.is_listening = False
+            self.voice_button.config(text="[ ACTIVAR VOZ ]", fg=TEXT_COLOR)
+            self.processing_label.config(text="")
+            
+            self.view.insert(tk.END, "[Voz reconocida]: ", "system")
+            self.view.insert(tk.END, f"{text}\n", "pronunciation")
+            self.view.insert(tk.END, f"Puntuación: {result['score']}/100\n", "system")
+            if result["mispronounced"]:
+                words = ", ".join(f"{original} → {spoken}" for original, spoken in result["mispronounced"])
+                self.view.insert(tk.END, f"Revisa: {words}\n", "correction")
+            if result["challenges"]:
+                sounds = ", ".join(sorted({phoneme for phoneme, _ in result["challenges"]}))
+                self.view.insert(tk.END, f"Sonidos a practicar: {sounds}\n", "tip")
+            self.next_pronunciation_exercise()
+        
+        def show_recognized(text, analysis):
             self.is_listening = False
             self.voice_button.config(text="[ ACTIVAR VOZ ]", fg=TEXT_COLOR)
             self.processing_label.config(text="")
@@ -570,29 +714,40 @@ class EnhancedAppWindow:
                 self.user_input.insert(0, text)
                 
                 # Mostrar lo que se entendió
-                self.chat_area.config(state=tk.NORMAL)
-                self.chat_area.insert(tk.END, "[Voz reconocida]: ", "system")
-                self.chat_area.insert(tk.END, f"{text}\n", "pronunciation")
-                self.chat_area.config(state=tk.DISABLED)
-                self.chat_area.yview(tk.END)
+                self.view.insert(tk.END, "[Voz reconocida]: ", "system")
+                self.view.insert(tk.END, f"{text}\n", "pronunciation")
+                self.view.scroll_to_end()
                 
-                # Enviar el mensaje después de un breve retraso
-                self.root.after(500, self.send_message)
+                # Enviar el mensaje sin esperar
+                self.voice_turn = True
+                self.send_message(analysis=analysis)
+        
+        # Transcripción provisional mientras se sigue hablando
+        def voice_partial(text):
+            self.root.after(0, lambda: show_partial(text))
+        
+        def show_partial(text):
+            if not self.is_listening:
+                return
+            self.user_input.delete(0, tk.END)
+            self.user_input.insert(0, text)
+            self.processing_label.config(text="[ TRANSCRIBIENDO... ]")
         
         # Callback para errores
         def voice_error(error_msg):
+            self.root.after(0, lambda: show_error(error_msg))
+        
+        def show_error(error_msg):
             self.is_listening = False
             self.voice_button.config(text="[ ACTIVAR VOZ ]", fg=TEXT_COLOR)
             self.processing_label.config(text="")
             
             # Mostrar error
-            self.chat_area.config(state=tk.NORMAL)
-            self.chat_area.insert(tk.END, f"[Error de voz]: {error_msg}\n", "error")
-            self.chat_area.config(state=tk.DISABLED)
-            self.chat_area.yview(tk.END)
+            self.view.insert(tk.END, f"[Error de voz]: {error_msg}\n", "error")
+            self.view.scroll_to_end()
         
         # Iniciar reconocimiento
-        success = self.speech_module.listen(voice_recognized, voice_error)
+        success = self.speech_module.listen(voice_recognized, voice_error, partial_callback=voice_partial)
         
         if not success:
             self.is_listening = False
@@ -600,14 +755,12 @@ class EnhancedAppWindow:
             self.processing_label.config(text="")
             
             # Mostrar error
-            self.chat_area.config(state=tk.NORMAL)
-            self.chat_area.insert(tk.END, "[Error: Ya está escuchando o no se pudo iniciar el reconocimiento]\n", "error")
-            self.chat_area.config(state=tk.DISABLED)
-            self.chat_area.yview(tk.END)
+            self.view.insert(tk.END, "[Error: Ya está escuchando o no se pudo iniciar el reconocimiento]\n", "error")
+            self.view.scroll_to_end()
     
     def text_to_speech(self, text):
-        """Convierte texto a voz"""
-        self.speech_module.speak(text)
+        """Convierte texto a voz, cortando lo que se estuviera pronunciando"""
+        self.speech_module.speak(text, interrupt=True)
     
     def show_vocab_review(self):
         """Muestra la ventana de repaso de vocabulario"""
@@ -616,10 +769,8 @@ class EnhancedAppWindow:
         
         if not review_items:
             # Mostrar mensaje si no hay elementos de vocabulario aún
-            self.chat_area.config(state=tk.NORMAL)
-            self.chat_area.insert(tk.END, "[No hay elementos de vocabulario guardados aún. Continúa charlando para construir tu lista de vocabulario.]\n\n", "system")
-            self.chat_area.config(state=tk.DISABLED)
-            self.chat_area.yview(tk.END)
+            self.view.insert(tk.END, "[No hay elementos de vocabulario guardados aún. Continúa charlando para construir tu lista de vocabulario.]\n\n", "system")
+            self.view.scroll_to_end()
             return
             
         # Crear ventana emergente para repaso de vocabulario
@@ -765,7 +916,8 @@ class EnhancedAppWindow:
                 activebackground="#333333",
                 activeforeground=TEXT_COLOR,
                 relief="flat",
-                command=lambda w=item.word: self.text_to_speech(w)
+                command=lambda w=item.word: self.text_to_speech(w),
+                state=tk.NORMAL if ENABLE_SPEECH_SYNTHESIS else tk.DISABLED
             )
             speak_btn.pack(pady=5)
             
@@ -865,16 +1017,13 @@ class EnhancedAppWindow:
         window.destroy()
         
         # Mostrar mensaje de confirmación
-        self.chat_area.config(state=tk.NORMAL)
-        self.chat_area.insert(tk.END, "[Repaso de vocabulario completado. Programación de repaso actualizada.]\n\n", "system")
-        self.chat_area.config(state=tk.DISABLED)
-        self.chat_area.yview(tk.END)
+        self.view.insert(tk.END, "[Repaso de vocabulario completado. Programación de repaso actualizada.]\n\n", "system")
+        self.view.scroll_to_end()
     
     def save_conversation(self):
         """Guarda la conversación en un archivo"""
         # Obtener el contenido completo de la conversación
-        self.chat_area.config(state=tk.NORMAL)
-        conversation_text = self.chat_area.get(1.0, tk.END)
+        conversation_text = self.chat_area.get_transcript()
         
         # Solicitar ubicación para guardar
         file_path = filedialog.asksaveasfilename(
@@ -889,13 +1038,12 @@ class EnhancedAppWindow:
                     f.write(conversation_text)
                 
                 # Mostrar mensaje de éxito
-                self.chat_area.insert(tk.END, f"[Conversación guardada en {file_path}]\n", "system")
+                self.view.insert(tk.END, f"[Conversación guardada en {file_path}]\n", "system")
             except Exception as e:
                 # Mostrar error
-                self.chat_area.insert(tk.END, f"[Error al guardar: {e}]\n", "error")
+                self.view.insert(tk.END, f"[Error al guardar: {e}]\n", "error")
         
-        self.chat_area.config(state=tk.DISABLED)
-        self.chat_area.yview(tk.END)
+        self.view.scroll_to_end()
     
     def export_vocabulary(self):
         """Exporta la lista de vocabulario"""
@@ -904,10 +1052,8 @@ class EnhancedAppWindow:
         
         if not items:
             # Mostrar mensaje si no hay elementos
-            self.chat_area.config(state=tk.NORMAL)
-            self.chat_area.insert(tk.END, "[No hay elementos de vocabulario para exportar.]\n", "system")
-            self.chat_area.config(state=tk.DISABLED)
-            self.chat_area.yview(tk.END)
+            self.view.insert(tk.END, "[No hay elementos de vocabulario para exportar.]\n", "system")
+            self.view.scroll_to_end()
             return
         
         # Solicitar ubicación para guardar
@@ -936,10 +1082,8 @@ class EnhancedAppWindow:
             elif ext == "xlsx":
                 # Aquí se implementaría la exportación a Excel
                 # Requiere la biblioteca openpyxl o similar
-                self.chat_area.config(state=tk.NORMAL)
-                self.chat_area.insert(tk.END, "[Exportación a Excel: Función no implementada aún.]\n", "system")
-                self.chat_area.config(state=tk.DISABLED)
-                self.chat_area.yview(tk.END)
+                self.view.insert(tk.END, "[Exportación a Excel: Función no implementada aún.]\n", "system")
+                self.view.scroll_to_end()
                 return
             
             else:
@@ -955,58 +1099,55 @@ class EnhancedAppWindow:
                         f.write("-" * 50 + "\n\n")
             
             # Mostrar mensaje de éxito
-            self.chat_area.config(state=tk.NORMAL)
-            self.chat_area.insert(tk.END, f"[Vocabulario exportado a {file_path}]\n", "system")
-            self.chat_area.config(state=tk.DISABLED)
-            self.chat_area.yview(tk.END)
+            self.view.insert(tk.END, f"[Vocabulario exportado a {file_path}]\n", "system")
+            self.view.scroll_to_end()
             
         except Exception as e:
             # Mostrar error
-            self.chat_area.config(state=tk.NORMAL)
-            self.chat_area.insert(tk.END, f"[Error al exportar: {e}]\n", "error")
-            self.chat_area.config(state=tk.DISABLED)
-            self.chat_area.yview(tk.END)
+            self.view.insert(tk.END, f"[Error al exportar: {e}]\n", "error")
+            self.view.scroll_to_end()
     
     def grammar_check_mode(self):
         """Activa el modo de revisión gramatical"""
         # Establecer enfoque en revisión gramatical
         self.mode_var.set("Tiempos Verbales")
         
-        self.chat_area.config(state=tk.NORMAL)
-        self.chat_area.insert(tk.END, "[Modo de revisión gramatical activado - enfoque en tiempos verbales y reglas gramaticales]\n", "system")
-        self.chat_area.config(state=tk.DISABLED)
-        self.chat_area.yview(tk.END)
+        self.view.insert(tk.END, "[Modo de revisión gramatical activado - enfoque en tiempos verbales y reglas gramaticales]\n", "system")
+        self.view.scroll_to_end()
     
     def conversation_mode(self):
         """Activa el modo de conversación libre"""
         # Establecer enfoque en conversación libre
         self.mode_var.set("General")
         
-        self.chat_area.config(state=tk.NORMAL)
-        self.chat_area.insert(tk.END, "[Modo de conversación libre activado - practica discusiones naturales]\n", "system")
-        self.chat_area.config(state=tk.DISABLED)
-        self.chat_area.yview(tk.END)
+        self.view.insert(tk.END, "[Modo de conversación libre activado - practica discusiones naturales]\n", "system")
+        self.view.scroll_to_end()
     
     def vocabulary_mode(self):
         """Activa el modo de construcción de vocabulario"""
         # Establecer enfoque en construcción de vocabulario
         self.mode_var.set("Vocabulario")
         
-        self.chat_area.config(state=tk.NORMAL)
-        self.chat_area.insert(tk.END, "[Modo de construcción de vocabulario activado - enfoque en aprender nuevas palabras y expresiones]\n", "system")
-        self.chat_area.config(state=tk.DISABLED)
-        self.chat_area.yview(tk.END)
+        self.view.insert(tk.END, "[Modo de construcción de vocabulario activado - enfoque en aprender nuevas palabras y expresiones]\n", "system")
+        self.view.scroll_to_end()
     
     def pronunciation_mode(self):
         """Activa el modo de práctica de pronunciación"""
         # Establecer enfoque en pronunciación
         self.mode_var.set("Pronunciación")
         
-        self.chat_area.config(state=tk.NORMAL)
-        self.chat_area.insert(tk.END, "[Modo de práctica de pronunciación activado - habla en inglés y recibe retroalimentación]\n", "system")
-        self.chat_area.insert(tk.END, "Presiona el botón [ACTIVAR VOZ] o F2 para comenzar a hablar.\n", "system")
-        self.chat_area.config(state=tk.DISABLED)
-        self.chat_area.yview(tk.END)
+        self.view.insert(tk.END, "[Modo de práctica de pronunciación activado - habla en inglés y recibe retroalimentación]\n", "system")
+        self.view.insert(tk.END, "Presiona el botón [ACTIVAR VOZ] o F2 para comenzar a hablar.\n", "system")
+        self.next_pronunciation_exercise()
+    
+    def next_pronunciation_exercise(self):
+        """Propone el siguiente texto a leer, empezando por los sonidos que más le cuestan al usuario"""
+        exercise = self.knowledge_base.get_pronunciation_exercises(1)[0]
+        self.pronunciation_target = " ".join(exercise["words"])
+        
+        self.view.insert(tk.END, f"[{exercise['instruction']}]\n", "system")
+        self.view.insert(tk.END, f"Lee en voz alta: {self.pronunciation_target}\n", "pronunciation")
+        self.view.scroll_to_end()
     
     def show_about(self):
         """Muestra información sobre la aplicación"""
@@ -1378,6 +1519,78 @@ class EnhancedAppWindow:
             pady=5
         ).pack(pady=10)
     
+    def show_performance_panel(self):
+        """Muestra las métricas de rendimiento, actualizadas periódicamente"""
+        # Solo una ventana abierta a la vez
+        if getattr(self, "performance_window", None) and self.performance_window.winfo_exists():
+            self.performance_window.lift()
+            return
+        
+        panel_window = tk.Toplevel(self.root)
+        panel_window.title("Panel de Rendimiento")
+        panel_window.geometry("760x560")
+        panel_window.configure(bg=BG_COLOR)
+        panel_window.transient(self.root)
+        self.performance_window = panel_window
+        
+        tk.Label(
+            panel_window,
+            text="Panel de Rendimiento",
+            font=(FONT_FAMILY, 14, "bold"),
+            fg=SYSTEM_COLOR,
+            bg=BG_COLOR
+        ).pack(pady=10)
+        
+        endpoint_text = (
+            f"Endpoint de métricas: http://{METRICS_HOST}:{METRICS_PORT}/metrics"
+            if self.metrics_server else "Endpoint de métricas desactivado"
+        )
+        tk.Label(
+            panel_window,
+            text=endpoint_text,
+            font=(FONT_FAMILY, 9),
+            fg=TEXT_COLOR,
+            bg=BG_COLOR
+        ).pack()
+        
+        report_area = scrolledtext.ScrolledText(
+            panel_window,
+            wrap=tk.NONE,
+            font=(FONT_FAMILY, 9),
+            bg=ENTRY_BG,
+            fg=HIGHLIGHT_COLOR,
+            relief="flat",
+            padx=10,
+            pady=10
+        )
+        report_area.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
+        
+        def refresh():
+            if not panel_window.winfo_exists():
+                return
+            # Conservar la posición de lectura entre actualizaciones
+            position = report_area.yview()[0]
+            report_area.config(state="normal")
+            report_area.delete("1.0", tk.END)
+            report_area.insert(tk.END, metrics.format_report())
+            report_area.config(state="disabled")
+            report_area.yview_moveto(position)
+            panel_window.after(PERFORMANCE_PANEL_REFRESH, refresh)
+        
+        refresh()
+        
+        tk.Button(
+            panel_window,
+            text="[ CERRAR ]",
+            command=panel_window.destroy,
+            font=(FONT_FAMILY, 10, "bold"),
+            bg=BUTTON_BG,
+            fg=TEXT_COLOR,
+            relief="flat",
+            padx=10,
+            pady=5
+        ).pack(pady=10)
+    
     def change_theme(self, theme_name):
         """Cambia el tema de la aplicación"""
         # Definir temas
@@ -1467,7 +1680,7 @@ class EnhancedAppWindow:
         self.user_input.configure(bg=ENTRY_BG, fg=TEXT_COLOR, insertbackground=TEXT_COLOR)
         
         # Actualizar botones
-        for btn in [self.suggest_button, self.reset_button, self.vocab_button, 
+        for btn in [self.suggest_button, self.reset_button, self.stop_button, self.vocab_button, 
                    self.voice_button, self.send_button]:
             btn.configure(bg=BUTTON_BG, fg=TEXT_COLOR, activebackground="#333333")
         
@@ -1486,10 +1699,8 @@ class EnhancedAppWindow:
         )
         
         # Mostrar mensaje
-        self.chat_area.config(state=tk.NORMAL)
-        self.chat_area.insert(tk.END, f"[Tema cambiado a: {theme_name}]\n", "system")
-        self.chat_area.config(state=tk.DISABLED)
-        self.chat_area.yview(tk.END)
+        self.view.insert(tk.END, f"[Tema cambiado a: {theme_name}]\n", "system")
+        self.view.scroll_to_end()
 
 
 def start_app():
@@ -0,0 +1,141 @@
+import tkinter as tk
+from tkinter import scrolledtext
+
+from config import TRANSCRIPT_MAX_LINES, TRANSCRIPT_PAGE_LINES
+
+
+class TranscriptArea(scrolledtext.ScrolledText):
+    """
+    Área de conversación con un número de líneas acotado.
+
+    Cuando el widget supera max_lines, las líneas más antiguas se archivan
+    por páginas (texto y etiquetas, sin los objetos de Tk) y se borran del
+    widget, así que insertar, desplazar y etiquetar cuesta lo mismo tras
+    horas de sesión. Al llegar arriba del todo con la barra o la rueda se
+    recupera la página archivada anterior, y el recorte se repite cuando se
+    vuelve al final de la conversación.
+
+    Se usa igual que un ScrolledText; get_transcript() devuelve la
+    conversación completa, incluida la parte archivada.
+    """
+
+    def __init__(self, master=None, max_lines=TRANSCRIPT_MAX_LINES, page_lines=TRANSCRIPT_PAGE_LINES, **kwargs):
+        super().__init__(master, **kwargs)
+        self.max_lines = max_lines
+        self.page_lines = page_lines
+        # Páginas archivadas, de la más antigua a la más reciente: (texto, [(longitud, etiquetas), ...])
+        self._archive = []
+        self._archived_lines = 0
+        self._paging = False
+        self.configure(yscrollcommand=self._on_scroll)
+
+    def insert(self, index, chars, *args):
+        # Solo se recorta si se estaba viendo el final, para no mover lo que se está leyendo
+        at_bottom = self._at_bottom()
+        super().insert(index, chars, *args)
+        if at_bottom and self.line_count() > self.max_lines:
+            self._trim()
+
+    def line_count(self):
+        """Líneas de texto presentes en el widget (sin contar las archivadas)"""
+        return int(self.index("end-1c").split(".")[0])
+
+    def get_transcript(self):
+        """
+        Texto de toda la conversación
+
+        Returns:
+            str: Páginas archivadas seguidas del contenido del widget
+        """
+        return "".join(text for text, _ in self._archive) + self.get("1.0", "end-1c")
+
+    def get_archive_stats(self):
+        """
+        Tamaño del archivo de la conversación
+
+        Returns:
+            dict: Páginas y líneas archivadas y líneas en el widget
+        """
+        return {
+            "archived_pages": len(self._archive),
+            "archived_lines": self._archived_lines,
+            "widget_lines": self.line_count()
+        }
+
+    def _at_bottom(self):
+        return self.yview()[1] >= 1.0
+
+    def _trim(self):
+        # Archivar páginas completas desde el principio hasta volver al límite
+        state = self.cget("state")
+        super().configure(state=tk.NORMAL)
+        try:
+            while self.line_count() > self.max_lines:
+                end = f"{self.page_lines + 1}.0"
+                self._archive.append(self._dump_page(end))
+                self._archived_lines += self.page_lines
+                self.delete("1.0", end)
+        finally:
+            super().configure(state=state)
+
+    def _dump_page(self, end):
+        # Texto y etiquetas de 1.0 a end como un solo texto y tramos (longitud, etiquetas)
+        parts = []
+        runs = []
+        active = []
+        for key, value, _ in self.dump("1.0", end, text=True, tag=True):
+            if key == "tagon":
+                if value != "sel":
+                    active.append(value)
+            elif key == "tagoff":
+                if value in active:
+                    active.remove(value)
+            elif key == "text":
+                tags = tuple(active)
+                if runs and runs[-1][1] == tags:
+                    runs[-1] = (runs[-1][0] + len(value), tags)
+                else:
+                    runs.append((len(value), tags))
+                parts.append(value)
+        return "".join(parts), runs
+
+    def _on_scroll(self, first, last):
+        self.vbar.set(first, last)
+        if self._paging:
+            return
+        if float(first) <= 0.0 and self._archive:
+            self._paging = True
+            self.after_idle(self._load_previous_page)
+        elif float(last) >= 1.0 and self.line_count() > self.max_lines:
+            self._paging = True
+            self.after_idle(self._trim_after_scroll)
+
+    def _load_previous_page(self):
+        # Recuperar la página anterior encima del contenido sin mover lo que se ve
+        try:
+            if not self._archive or self.yview()[0] > 0.0:
+                return
+            text, runs = self._archive.pop()
+            self._archived_lines -= self.page_lines
+
+            args = []
+            position = 0
+            for length, tags in runs:
+                args.extend((text[position:position + length], tags))
+                position += length
+
+            state = self.cget("state")
+            super().configure(state=tk.NORMAL)
+            super().insert("1.0", *args)
+            super().configure(state=state)
+            self.yview(f"{self.page_lines + 1}.0")
+        finally:
+            self._paging = False
+
+    def _trim_after_scroll(self):
+        try:
+            if self._at_bottom():
+                self._trim()
+                self.yview(tk.END)
+        finally:
+            self._paging = False